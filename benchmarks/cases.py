@@ -0,0 +1,246 @@
+"""
+Benchmark cases for the pipeline hot paths, with synthetic inputs.
+
+"realistic" approximates a multi-hour session with a typical campaign; "extreme"
+stresses each path well beyond that (huge campaigns, long windows, long recordings).
+"""
+
+import atexit
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import wave
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from harness import Benchmark
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+SEED = 1234
+WORDS = ("the ship drifts toward Ceres station while the captain argues with the dockmaster about "
+         "salvage rights and the crew checks the reactor readings before the boarding party moves out").split()
+
+# scale -> parameters per case
+ACCUMULATOR_SCALES = {"realistic": {"messages": 2000, "window": 8}, "extreme": {"messages": 20000, "window": 40}}
+CONTEXT_SCALES = {"realistic": {"files": 6, "kilobytes": 150}, "extreme": {"files": 60, "kilobytes": 1500}}
+AUDIO_SCALES = {"realistic": {"seconds": 60, "clients": 1}, "extreme": {"seconds": 600, "clients": 4}}
+SEGMENT_SCALES = {"realistic": {"messages": 2000, "window": 8}, "extreme": {"messages": 10000, "window": 40}}
+RESAMPLE_SCALES = {"realistic": {"seconds": 60}, "extreme": {"seconds": 900}}
+SRT_SCALES = {"realistic": {"segments": 3000}, "extreme": {"segments": 100000}}
+CHUNK_SAMPLES = 4096 # Same packet size as TranscriptionTeeClient
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_server_messages(count: int, window: int) -> List[List[Dict[str, Any]]]:
+    """Segment lists shaped like WhisperLive's: a sliding window of completed segments plus one partial."""
+    rng = random.Random(SEED)
+    completed: List[Dict[str, Any]] = []
+    messages = []
+    for index in range(count):
+        start = index * 2.0
+        completed.append({"start": f"{start:.3f}", "end": f"{start + 2.0:.3f}", "text": _sentence(rng), "completed": True})
+        partial = {"start": f"{start + 2.0:.3f}", "end": f"{start + 3.0:.3f}", "text": _sentence(rng, 5), "completed": False}
+        messages.append(completed[-window:] + [partial])
+    return messages
+
+
+class _FakeSocket:
+    """Stands in for the WebSocketApp so sends measure only client-side work."""
+
+    def send(self, data, opcode=None):
+        pass
+
+
+def _offline_client(uid: str = "bench"):
+    """A Client with no server connection (host/port omitted), ready to send and receive."""
+    from whisper_live_client.client import Client
+    client = Client(host=None, port=None)
+    client.uid = uid
+    client.client_socket = _FakeSocket()
+    client.recording = True
+    client.server_backend = "faster_whisper"
+    client.transcript = []
+    client.log_transcription = False
+    return client
+
+
+class _NoMicrophone:
+    """Stands in for pyaudio.PyAudio: no input stream, so the tee has no microphone."""
+
+    def open(self, **kwargs):
+        return None
+
+
+def _offline_tee(clients: List[Any], **kwargs):
+    """A TranscriptionTeeClient over offline clients, built by its own __init__ without opening a microphone."""
+    from unittest import mock
+    from whisper_live_client import client as client_module
+    with mock.patch.object(client_module.pyaudio, "PyAudio", _NoMicrophone):
+        return client_module.TranscriptionTeeClient(clients, mute_audio_playback=True, **kwargs)
+
+
+def _temporary_directory(prefix: str) -> Path:
+    """A scratch directory for a case's input/output files, removed when the process exits."""
+    directory = Path(tempfile.mkdtemp(prefix=prefix))
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+
+def setup_accumulator(scale: str) -> Tuple[Callable[[], None], int]:
+    from transcript_accumulator import TranscriptAccumulator
+    params = ACCUMULATOR_SCALES[scale]
+    messages = synthetic_server_messages(params["messages"], params["window"])
+
+    def run():
+        accumulator = TranscriptAccumulator(max_buffer_age_seconds=None)
+        for segments in messages:
+            accumulator.add_segments(segments)
+    return run, len(messages)
+
+
+def setup_context_loading(scale: str) -> Tuple[Callable[[], None], int]:
+    from context_loader import load_and_combine_context
+    params = CONTEXT_SCALES[scale]
+    rng = random.Random(SEED)
+    directory = _temporary_directory("bench_context_")
+    paragraph = " ".join(_sentence(rng) for _ in range(8)) + "\n\n"
+    repeats = params["kilobytes"] * 1024 // len(paragraph) + 1
+    files = []
+    for index in range(params["files"]):
+        path = directory / f"adventure_{index}.md"
+        path.write_text(f"# **Chapter {index}**\n\n" + paragraph * repeats, encoding="utf-8")
+        files.append(str(path))
+    preamble_path = directory / "preamble.md"
+    preamble_path.write_text("You are assisting a Dungeon Master.\n", encoding="utf-8")
+    config_path = directory / "campaign.json"
+    config_path.write_text(json.dumps({"preamble_file": str(preamble_path), "adventure_files": files}), encoding="utf-8")
+    total_bytes = sum(Path(path).stat().st_size for path in files)
+
+    def run():
+        load_and_combine_context(str(config_path))
+    return run, total_bytes
+
+
+def _int16_packets(seconds: int) -> List[bytes]:
+    import numpy as np
+    rng = np.random.default_rng(SEED)
+    audio = (rng.standard_normal(seconds * 16000) * 3000).astype(np.int16).tobytes()
+    packet_bytes = CHUNK_SAMPLES * 2
+    return [audio[offset:offset + packet_bytes] for offset in range(0, len(audio), packet_bytes)]
+
+
+def setup_bytes_to_float(scale: str) -> Tuple[Callable[[], None], int]:
+    from whisper_live_client.client import TranscriptionTeeClient
+    packets = _int16_packets(AUDIO_SCALES[scale]["seconds"])
+
+    def run():
+        for packet in packets:
+            TranscriptionTeeClient.bytes_to_float_array(packet)
+    return run, sum(len(packet) for packet in packets)
+
+
+def setup_multicast(scale: str) -> Tuple[Callable[[], None], int]:
+    from whisper_live_client.client import TranscriptionTeeClient
+    params = AUDIO_SCALES[scale]
+    packets = [TranscriptionTeeClient.bytes_to_float_array(packet).tobytes() for packet in _int16_packets(params["seconds"])]
+    tee = _offline_tee([_offline_client(f"bench-{index}") for index in range(params["clients"])])
+
+    def run():
+        for packet in packets:
+            tee.multicast_packet(packet)
+    return run, sum(len(packet) for packet in packets) * params["clients"]
+
+
+def setup_send_audio_int16(scale: str) -> Tuple[Callable[[], None], int]:
+    from whisper_live_client.client import TranscriptionTeeClient
+    from whisper_live_client import wire_format
+    params = AUDIO_SCALES[scale]
+    arrays = [TranscriptionTeeClient.bytes_to_float_array(packet) for packet in _int16_packets(params["seconds"])]
+    tee = _offline_tee([_offline_client(f"bench-{index}") for index in range(params["clients"])])
+    for client in tee.clients:
+        client.audio_format = wire_format.INT16
+
+    def run():
+        for samples in arrays:
+            tee.send_audio(samples)
+    return run, sum(len(samples) for samples in arrays) * params["clients"]
+
+
+def setup_process_segments(scale: str) -> Tuple[Callable[[], None], int]:
+    params = SEGMENT_SCALES[scale]
+    messages = synthetic_server_messages(params["messages"], params["window"])
+
+    def run():
+        client = _offline_client()
+        for segments in messages:
+            client.process_segments(segments)
+    return run, len(messages)
+
+
+def setup_on_message(scale: str) -> Tuple[Callable[[], None], int]:
+    params = SEGMENT_SCALES[scale]
+    encoded = [json.dumps({"uid": "bench", "segments": segments})
+               for segments in synthetic_server_messages(params["messages"], params["window"])]
+
+    def run():
+        client = _offline_client()
+        for message in encoded:
+            client.on_message(None, message)
+    return run, sum(len(message) for message in encoded)
+
+
+def setup_resample(scale: str) -> Tuple[Callable[[], None], int]:
+    import numpy as np
+    from whisper_live_client import utils
+    seconds = RESAMPLE_SCALES[scale]["seconds"]
+    directory = _temporary_directory("bench_resample_")
+    source = directory / "source_44k_stereo.wav"
+    rng = np.random.default_rng(SEED)
+    samples = (rng.standard_normal(seconds * 44100 * 2) * 3000).astype(np.int16)
+    with wave.open(str(source), "wb") as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(44100)
+        wav_file.writeframes(samples.tobytes())
+
+    def run():
+        # resample() writes its output into the working directory
+        previous_directory = os.getcwd()
+        os.chdir(directory)
+        utils.resample(str(source))
+        os.chdir(previous_directory)
+    return run, seconds
+
+
+def setup_create_srt(scale: str) -> Tuple[Callable[[], None], int]:
+    from whisper_live_client import utils
+    count = SRT_SCALES[scale]["segments"]
+    rng = random.Random(SEED)
+    segments = [{"start": index * 2.0, "end": index * 2.0 + 1.9, "text": _sentence(rng)} for index in range(count)]
+    output_path = _temporary_directory("bench_srt_") / "output.srt"
+
+    def run():
+        utils.create_srt_file(segments, str(output_path))
+    return run, count
+
+
+CLIENT_MODULES = ("numpy", "av", "websocket", "pyaudio")
+
+BENCHMARKS = [
+    Benchmark("accumulator.add_segments", setup_accumulator, "messages", ("nltk",)),
+    Benchmark("context_loader.load_and_combine_context", setup_context_loading, "bytes"),
+    Benchmark("client.bytes_to_float_array", setup_bytes_to_float, "bytes", CLIENT_MODULES),
+    Benchmark("client.multicast_packet", setup_multicast, "bytes", CLIENT_MODULES),
+    Benchmark("client.send_audio_int16", setup_send_audio_int16, "samples", CLIENT_MODULES),
+    Benchmark("client.process_segments", setup_process_segments, "messages", CLIENT_MODULES),
+    Benchmark("client.on_message", setup_on_message, "bytes", CLIENT_MODULES),
+    Benchmark("utils.resample", setup_resample, "audio_seconds", ("numpy", "scipy", "av")),
+    Benchmark("utils.create_srt_file", setup_create_srt, "segments", ("numpy", "scipy", "av")),
+]
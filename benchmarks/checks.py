@@ -0,0 +1,87 @@
+"""
+Correctness checks for client paths the benchmarks exercise, on the same offline clients.
+
+Usage (from the project root):
+    python benchmarks/checks.py
+
+Exits with status 1 if any check fails.
+"""
+
+import logging
+import queue
+import sys
+from typing import Callable, List, Tuple
+
+from cases import CHUNK_SAMPLES, _offline_client, _offline_tee
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - CHECK - %(message)s')
+logger = logging.getLogger("checks")
+
+SAMPLE_RATE = 16000
+TOLERANCE_SECONDS = 0.011 # One VAD frame
+
+
+def _speech_and_silence(spans: List[Tuple[bool, float]]):
+    """float32 audio of (is_speech, seconds) spans: speech is a loud tone, silence near-silent noise."""
+    import numpy as np
+    rng = np.random.default_rng(1234)
+    parts = []
+    for is_speech, seconds in spans:
+        count = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            parts.append(0.3 * np.sin(2 * np.pi * 220 * np.arange(count) / SAMPLE_RATE))
+        else:
+            parts.append(rng.standard_normal(count) * 1e-4)
+    return np.concatenate(parts).astype(np.float32)
+
+
+def check_vad_gate_resume_times() -> List[str]:
+    """A resumed session with the VAD gate: segment times map sent -> real audio, then add the resume offset."""
+    from whisper_live_client.vad_gate import HANGOVER_MS, PREROLL_MS, VoiceActivityGate
+    start_offset = 100.0
+    spans = [(False, 3.0), (True, 2.0), (False, 3.0), (True, 2.0), (False, 3.0), (True, 2.0)]
+    client = _offline_client()
+    client.output_queue = queue.Queue()
+    tee = _offline_tee([client], vad_gate=VoiceActivityGate(), start_offset=start_offset)
+    audio = _speech_and_silence(spans)
+    for offset in range(0, len(audio), CHUNK_SAMPLES):
+        tee.send_audio(audio[offset:offset + CHUNK_SAMPLES])
+
+    # Each speech span is sent with its pre-roll and hangover, back to back
+    preroll, hangover = PREROLL_MS / 1000, HANGOVER_MS / 1000
+    failures = []
+    real_start = 0.0
+    sent_start = 0.0
+    for is_speech, seconds in spans:
+        if is_speech:
+            segment = {"start": f"{sent_start + 0.5:.3f}", "end": f"{sent_start + 1.0:.3f}", "text": "x", "completed": False}
+            client.process_segments([segment])
+            mapped = float(client.output_queue.get_nowait()[0]["start"])
+            expected = start_offset + real_start - preroll + 0.5
+            if abs(mapped - expected) > TOLERANCE_SECONDS:
+                failures.append(f"sent {sent_start + 0.5:.1f}s mapped to {mapped:.2f}s, expected {expected:.2f}s")
+            sent_start += preroll + seconds + hangover
+        real_start += seconds
+    return failures
+
+
+CHECKS: List[Tuple[str, Callable[[], List[str]]]] = [
+    ("client.vad_gate_resume_times", check_vad_gate_resume_times),
+]
+
+
+def main() -> int:
+    failed = 0
+    for name, check in CHECKS:
+        failures = check()
+        for failure in failures:
+            logger.error(f"{name}: {failure}")
+        if failures:
+            failed += 1
+        else:
+            logger.info(f"{name}: ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Timing, baseline storage and regression comparison for the microbenchmarks.
+"""
+
+import importlib.util
+import json
+import logging
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+REGRESSION_THRESHOLD = 0.15 # Median slower than baseline by more than this fraction is a regression
+DEFAULT_REPEATS = 5
+WARMUP_RUNS = 1
+
+logger = logging.getLogger("benchmarks")
+
+
+@dataclass
+class Benchmark:
+    """
+    One benchmark case.
+
+    `setup(scale)` builds the synthetic input outside the timed region and returns
+    (run, units): `run()` is timed, and `units` (segments, bytes, ...) is how much work
+    one call does, for throughput reporting.
+    """
+    name: str
+    setup: Callable[[str], Tuple[Callable[[], None], int]]
+    unit: str
+    requires: Sequence[str] = field(default_factory=tuple)
+
+    def missing_modules(self) -> List[str]:
+        return [module for module in self.requires if importlib.util.find_spec(module) is None]
+
+
+def time_benchmark(benchmark: Benchmark, scale: str, repeats: int = DEFAULT_REPEATS) -> Dict[str, float]:
+    """Runs one benchmark and returns its timing summary."""
+    run, units = benchmark.setup(scale)
+    for _ in range(WARMUP_RUNS):
+        run()
+    durations = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - started_at)
+    median = statistics.median(durations)
+    return {
+        "median_seconds": median,
+        "min_seconds": min(durations),
+        "units": units,
+        "unit": benchmark.unit,
+        "units_per_second": units / median if median > 0 else 0.0,
+        "repeats": repeats,
+    }
+
+
+def run_benchmarks(benchmarks: List[Benchmark], scale: str, repeats: int = DEFAULT_REPEATS,
+                   name_filter: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Runs all matching benchmarks, skipping those whose dependencies are not installed."""
+    results: Dict[str, Dict[str, float]] = {}
+    for benchmark in benchmarks:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        missing = benchmark.missing_modules()
+        if missing:
+            logger.warning(f"Skipping {benchmark.name}: missing {', '.join(missing)}")
+            continue
+        result = time_benchmark(benchmark, scale, repeats)
+        results[benchmark.name] = result
+        logger.info(f"{benchmark.name:<40} median {result['median_seconds'] * 1000:9.2f}ms  "
+                    f"{result['units_per_second']:14,.0f} {benchmark.unit}/s")
+    return results
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], scale: str, path: Path):
+    """Writes results plus the machine they were measured on as a JSON baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "scale": scale,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    path.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+    logger.info(f"Baseline written to {path}")
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, float]], baseline_path: Path,
+                        threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Compares results against a saved baseline and logs a per-benchmark verdict.
+
+    Returns:
+        List[str]: Names of benchmarks whose median regressed by more than `threshold`.
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = []
+    logger.info(f"Comparing against {baseline_path} ({baseline['scale']} scale, {baseline['created']}, {baseline['machine']})")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            logger.info(f"{name:<40} new (no baseline)")
+            continue
+        ratio = result["median_seconds"] / previous["median_seconds"]
+        if ratio > 1 + threshold:
+            verdict = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            verdict = "improved"
+        else:
+            verdict = "ok"
+        logger.info(f"{name:<40} {ratio:6.2f}x baseline  {verdict}")
+    return regressions
@@ -0,0 +1,51 @@
+"""
+Runs the hot-path microbenchmarks, optionally saving or comparing against a JSON baseline.
+
+Usage (from the project root):
+    python benchmarks/run_benchmarks.py                                  # realistic scale
+    python benchmarks/run_benchmarks.py --scale extreme --filter client
+    python benchmarks/run_benchmarks.py --save benchmarks/baselines/realistic.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baselines/realistic.json
+
+Compare mode exits with status 1 if any benchmark's median regressed beyond the threshold.
+Baselines are machine-specific; record one per machine before comparing.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from harness import DEFAULT_REPEATS, REGRESSION_THRESHOLD, compare_to_baseline, logger, run_benchmarks, save_baseline
+from cases import BENCHMARKS
+
+# Only warnings from the code under test, so its INFO logs neither flood the report nor skew timings
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - BENCH - %(message)s')
+logger.setLevel(logging.INFO)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run DMS Helper hot-path microbenchmarks.")
+    parser.add_argument("--scale", choices=["realistic", "extreme"], default="realistic", help="Synthetic input size.")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Timed runs per benchmark.")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--save", type=Path, help="Write results as a JSON baseline to this path.")
+    parser.add_argument("--compare", type=Path, help="Compare results against this JSON baseline.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Fractional slowdown of the median that counts as a regression.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(BENCHMARKS, args.scale, args.repeats, args.filter)
+
+    if args.save:
+        save_baseline(results, args.scale, args.save)
+    if args.compare:
+        regressions = compare_to_baseline(results, args.compare, args.threshold)
+        if regressions:
+            logger.error(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+"""
+Corrects Whisper's misspellings of campaign proper nouns ("Jancor" -> "Jankor").
+
+A campaign lexicon of proper nouns is built from the campaign config's files and
+indexed SymSpell-style: every lexicon word is stored under all of its deletion
+variants, so looking up a token only needs the token's own (few) deletions
+instead of a comparison against the whole lexicon.
+
+The campaign files alone can't tell a name from an ordinary word that happens to be
+capitalized ("the Forge", "King"), so a general English wordlist (NLTK `words`) keeps
+English words out of the lexicon and stops English tokens from being corrected. Common
+words are only corrected as part of a multi-word entity name that also contains a word
+English doesn't have ("Horn of Balmytra" -> "Horn of Balmytria"), word for word.
+Sentence-initial tokens and phrases are never corrected: their capital letter says nothing.
+"""
+
+import logging
+import re
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from context_loader import load_campaign_config, get_context_file_paths
+from entity_gazetteer import HEADING_ENTITY_KEYS, extract_entities
+
+# --- Correction Settings ---
+MAX_EDIT_DISTANCE = 2
+MIN_CORRECTION_LENGTH = 4      # Shorter tokens are too ambiguous to correct
+LONG_TOKEN_LENGTH = 7          # Tokens this long may be corrected at distance 2; shorter only at 1
+# Whisper almost always capitalizes the names it mangles; lowercase tokens are left alone
+CORRECT_LOWERCASE_TOKENS = False
+STATS_LOG_INTERVAL_SEGMENTS = 500
+
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'\-]*[A-Za-z]|[A-Za-z]")
+POSSESSIVE_SUFFIX = "'s"
+# Characters skipped when deciding whether a word starts a sentence (Markdown markup, quotes)
+MARKUP_CHARS = " \t*_#>-[(\"'"
+SENTENCE_END_CHARS = ".!?:"
+# Inflections stripped when checking a token against the English wordlist ("kings" -> "king")
+INFLECTION_SUFFIXES = (("ies", "y"), ("es", ""), ("s", ""), ("ed", ""), ("ed", "e"), ("ing", ""), ("ing", "e"))
+SYSTEM_WORDLIST = Path("/usr/share/dict/words") # Used when the NLTK corpus can't be downloaded
+
+
+def _is_sentence_initial(text: str, start: int) -> bool:
+    """True if the word starting at `start` begins a line or sentence, where capitals prove nothing."""
+    index = start - 1
+    while index >= 0 and text[index] in MARKUP_CHARS:
+        index -= 1
+    return index < 0 or text[index] == "\n" or text[index] in SENTENCE_END_CHARS
+
+
+def _nltk_words_available(nltk: Any) -> bool:
+    return any((Path(directory) / "corpora" / "words").is_dir() or (Path(directory) / "corpora" / "words.zip").is_file()
+               for directory in nltk.data.path)
+
+
+def load_english_words() -> Optional[Set[str]]:
+    """
+    Loads a general English wordlist (lowercase entries only; capitalized entries are names).
+
+    Returns:
+        Optional[Set[str]]: The words, or None if neither the NLTK `words` corpus (downloaded if
+            missing) nor the system wordlist is available.
+    """
+    import nltk
+    if not _nltk_words_available(nltk):
+        logging.info("NLTK 'words' corpus not found. Downloading...")
+        nltk.download("words", quiet=True)
+    if _nltk_words_available(nltk):
+        from nltk.corpus import words
+        return {word for word in words.words() if word.islower()}
+    if SYSTEM_WORDLIST.is_file():
+        return {word for word in SYSTEM_WORDLIST.read_text(encoding="utf-8", errors="ignore").split() if word.islower()}
+    return None
+
+
+def is_english_word(lowered: str, english_words: Set[str]) -> bool:
+    """True if a lowercase token, or its stem without a regular inflection, is in the wordlist."""
+    if lowered in english_words:
+        return True
+    for suffix, replacement in INFLECTION_SUFFIXES:
+        if lowered.endswith(suffix) and lowered[:-len(suffix)] + replacement in english_words:
+            return True
+    return False
+
+
+def _deletions(word: str, max_distance: int) -> Set[str]:
+    """Returns all strings obtained by deleting up to max_distance characters from word."""
+    variants = {word}
+    for distance in range(1, min(max_distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), distance):
+            variants.add("".join(char for index, char in enumerate(word) if index not in positions))
+    return variants
+
+
+def _edit_distance(first: str, second: str) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    previous_previous: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SymSpellIndex:
+    """Deletion index answering "closest lexicon word within distance k" lookups."""
+
+    def __init__(self, words: Dict[str, int], max_edit_distance: int = MAX_EDIT_DISTANCE):
+        """
+        Args:
+            words (Dict[str, int]): Lexicon word (canonical casing) -> corpus frequency, used to break ties.
+            max_edit_distance (int): The largest edit distance lookups may use.
+        """
+        self.max_edit_distance = max_edit_distance
+        self.words: Dict[str, str] = {word.lower(): word for word in words}
+        self.frequencies: Dict[str, int] = {word.lower(): count for word, count in words.items()}
+        self._deletes: Dict[str, List[str]] = {}
+        for word in self.words:
+            for variant in _deletions(word, max_edit_distance):
+                self._deletes.setdefault(variant, []).append(word)
+
+    def lookup(self, token: str, max_distance: int) -> Optional[Tuple[str, int]]:
+        """
+        Finds the closest lexicon word.
+
+        Args:
+            token (str): The (lowercase) token to look up.
+            max_distance (int): The largest accepted edit distance.
+
+        Returns:
+            Optional[Tuple[str, int]]: (canonical word, distance), or None if nothing is close enough.
+        """
+        best: Optional[Tuple[str, int]] = None
+        best_frequency = -1
+        checked: Set[str] = set()
+        for variant in _deletions(token, max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in checked or abs(len(candidate) - len(token)) > max_distance:
+                    continue
+                checked.add(candidate)
+                distance = _edit_distance(token, candidate)
+                if distance > max_distance:
+                    continue
+                frequency = self.frequencies[candidate]
+                if best is None or distance < best[1] or (distance == best[1] and frequency > best_frequency):
+                    best = (self.words[candidate], distance)
+                    best_frequency = frequency
+        return best
+
+
+class ASRCorrector:
+    """Replaces out-of-vocabulary transcript tokens with the nearest campaign proper noun."""
+
+    def __init__(self, proper_nouns: Dict[str, int], vocabulary: Set[str], english_words: Set[str],
+                 entity_phrases: Optional[Dict[str, int]] = None, max_edit_distance: int = MAX_EDIT_DISTANCE):
+        """
+        Args:
+            proper_nouns (Dict[str, int]): Campaign proper nouns (canonical casing) -> frequency.
+            vocabulary (Set[str]): Lowercase words known to be ordinary vocabulary; never corrected.
+            english_words (Set[str]): General English wordlist (lowercase); never corrected either.
+            entity_phrases (Dict[str, int], optional): Multi-word entity names -> frequency, corrected as a whole.
+            max_edit_distance (int): The largest edit distance for a correction.
+        """
+        self.index = SymSpellIndex(proper_nouns, max_edit_distance)
+        self.phrase_index = SymSpellIndex(entity_phrases or {}, max_edit_distance)
+        self.max_phrase_words = max((len(phrase.split()) for phrase in entity_phrases or {}), default=0)
+        self.vocabulary = vocabulary
+        self.english_words = english_words
+        self._cache: Dict[str, Optional[str]] = {}
+        self._phrase_cache: Dict[str, Optional[str]] = {}
+        self.segments_processed = 0
+        self.tokens_checked = 0
+        self.oov_tokens = 0
+        self.corrections: Counter = Counter()
+        logging.info(f"ASRCorrector initialized ({len(proper_nouns)} proper nouns, {len(entity_phrases or {})} entity phrases, "
+                     f"{len(vocabulary)} vocabulary words).")
+
+    def _correct_token(self, token: str) -> Optional[str]:
+        """Returns the corrected spelling of a token, or None if it should stay as is."""
+        if token in self._cache:
+            return self._cache[token]
+
+        correction: Optional[str] = None
+        stem = token[:-len(POSSESSIVE_SUFFIX)] if token.endswith(POSSESSIVE_SUFFIX) else token
+        lowered = stem.lower()
+        is_candidate = (
+            len(stem) >= MIN_CORRECTION_LENGTH
+            and (CORRECT_LOWERCASE_TOKENS or stem[0].isupper())
+            and lowered not in self.vocabulary
+            and lowered not in self.index.words
+            and not is_english_word(lowered, self.english_words)
+        )
+        if is_candidate:
+            self.oov_tokens += 1
+            max_distance = self.index.max_edit_distance if len(stem) >= LONG_TOKEN_LENGTH else 1
+            found = self.index.lookup(lowered, max_distance)
+            if found:
+                correction = found[0] + token[len(stem):]
+        self._cache[token] = correction
+        return correction
+
+    def _is_known_word(self, token: str) -> bool:
+        """True if a token is ordinary vocabulary or English (possessive and inflections ignored)."""
+        lowered = token.lower()
+        if lowered.endswith(POSSESSIVE_SUFFIX):
+            lowered = lowered[:-len(POSSESSIVE_SUFFIX)]
+        return lowered in self.vocabulary or is_english_word(lowered, self.english_words)
+
+    def _correct_phrase(self, phrase: str) -> Optional[str]:
+        """Returns the entity name a capitalized multi-word phrase is a misspelling of, or None.
+
+        Only phrases with a word that is not English are corrected ("She walked the Path of
+        Peace" stays), and only into a name with as many words ("Fire is land" stays).
+        """
+        if phrase in self._phrase_cache:
+            return self._phrase_cache[phrase]
+        correction: Optional[str] = None
+        lowered = phrase.lower()
+        words = phrase.split()
+        if (phrase[0].isupper() and lowered not in self.phrase_index.words
+                and not all(self._is_known_word(word) for word in words)):
+            max_distance = self.phrase_index.max_edit_distance if len(phrase) >= LONG_TOKEN_LENGTH else 1
+            found = self.phrase_index.lookup(lowered, max_distance)
+            if found and len(found[0].split()) == len(words):
+                correction = found[0]
+        self._phrase_cache[phrase] = correction
+        return correction
+
+    def _correct_phrases(self, text: str) -> str:
+        """Replaces misspelled multi-word entity names, longest first, left to right."""
+        words = list(WORD_PATTERN.finditer(text))
+        pieces: List[str] = []
+        copied_until = 0
+        index = 0
+        while index < len(words):
+            step = 1
+            for length in range(min(self.max_phrase_words, len(words) - index), 1, -1):
+                window = words[index:index + length]
+                phrase = text[window[0].start():window[-1].end()]
+                if phrase != " ".join(word_match.group(0) for word_match in window):
+                    continue # Names don't span punctuation or line breaks
+                if _is_sentence_initial(text, window[0].start()):
+                    break # Every window from here starts the sentence
+                correction = self._correct_phrase(phrase)
+                if correction:
+                    self.corrections[(phrase, correction)] += 1
+                    pieces += [text[copied_until:window[0].start()], correction]
+                    copied_until = window[-1].end()
+                    step = length
+                    break
+            index += step
+        return "".join(pieces) + text[copied_until:]
+
+    def correct_text(self, text: str) -> str:
+        """Returns the text with misspelled entity names and out-of-vocabulary tokens corrected."""
+        if self.max_phrase_words:
+            text = self._correct_phrases(text)
+
+        def replace(word_match: "re.Match[str]") -> str:
+            self.tokens_checked += 1
+            token = word_match.group(0)
+            if _is_sentence_initial(text, word_match.start()):
+                return token
+            correction = self._correct_token(token)
+            if correction is None:
+                return token
+            self.corrections[(token, correction)] += 1
+            return correction
+
+        return WORD_PATTERN.sub(replace, text)
+
+    def correct_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Corrects the text of each segment.
+
+        Segments are copied rather than modified, since the transcription client keeps
+        references to them for its own SRT output.
+
+        Args:
+            segments (List[Dict[str, Any]]): Segment dicts as produced by Client.process_segments.
+
+        Returns:
+            List[Dict[str, Any]]: The segments with corrected text.
+        """
+        corrected_segments = []
+        for seg in segments:
+            text = seg.get("text", "")
+            corrected_text = self.correct_text(text)
+            corrected_segments.append(seg if corrected_text == text else dict(seg, text=corrected_text))
+        self.segments_processed += 1
+        if self.segments_processed % STATS_LOG_INTERVAL_SEGMENTS == 0:
+            self.log_statistics()
+        return corrected_segments
+
+    def log_statistics(self):
+        """Logs how many tokens were checked and which corrections were made."""
+        total_corrections = sum(self.corrections.values())
+        logging.info(
+            f"ASRCorrector: {self.segments_processed} segment lists, {self.tokens_checked} tokens checked, "
+            f"{self.oov_tokens} unique OOV candidates, {total_corrections} corrections."
+        )
+        for (token, correction), count in self.corrections.most_common(10):
+            logging.info(f"ASRCorrector:   '{token}' -> '{correction}' x{count}")
+
+
+def build_campaign_lexicon(campaign_config_path: str,
+                           english_words: Set[str]) -> Optional[Tuple[Dict[str, int], Set[str], Dict[str, int]]]:
+    """
+    Builds the proper-noun lexicon, ordinary vocabulary and entity phrases from a campaign's files.
+
+    A word counts as ordinary vocabulary if it ever appears in lowercase; a word that is
+    capitalized mid-sentence, never appears in lowercase and is not an English word is
+    taken to be a proper noun. Multi-word entity names (bold, italic or heading spans, as
+    in the gazetteer) are kept whole.
+
+    Args:
+        campaign_config_path (str): Path to the campaign JSON configuration file.
+        english_words (Set[str]): General English wordlist (see `load_english_words`).
+
+    Returns:
+        Optional[Tuple[Dict[str, int], Set[str], Dict[str, int]]]: (proper noun -> frequency,
+        vocabulary, entity phrase -> frequency), or None if the config could not be loaded.
+    """
+    config_data = load_campaign_config(campaign_config_path)
+    if config_data is None:
+        return None
+
+    source_paths = [(None, config_data["preamble_file"])] if config_data.get("preamble_file") else []
+    source_paths += get_context_file_paths(config_data)
+
+    capitalized: Counter = Counter()
+    phrases: Counter = Counter()
+    vocabulary: Set[str] = set()
+    for key, file_path_str in source_paths:
+        file_path = Path(file_path_str)
+        if not file_path.is_file():
+            logging.warning(f"Lexicon source not found, skipping: {file_path}")
+            continue
+        text = file_path.read_text(encoding="utf-8")
+        for name in extract_entities(text, file_path.name, use_headings=key in HEADING_ENTITY_KEYS):
+            if len(name.split()) > 1:
+                phrases[name] += 1
+        for word_match in WORD_PATTERN.finditer(text):
+            word = word_match.group(0)
+            if word.endswith(POSSESSIVE_SUFFIX):
+                word = word[:-len(POSSESSIVE_SUFFIX)]
+            if word[0].islower():
+                vocabulary.add(word.lower())
+            elif len(word) >= MIN_CORRECTION_LENGTH and not word.isupper() and not _is_sentence_initial(text, word_match.start()):
+                capitalized[word] += 1
+
+    proper_nouns = {word: count for word, count in capitalized.items()
+                    if word.lower() not in vocabulary and not is_english_word(word.lower(), english_words)}
+    return proper_nouns, vocabulary, dict(phrases)
+
+
+def build_asr_corrector(campaign_config_path: str) -> Optional[ASRCorrector]:
+    """
+    Builds an ASRCorrector from a campaign config.
+
+    Returns None if the config could not be loaded, or if no English wordlist is available:
+    without one, ordinary words would be "corrected" into campaign names.
+    """
+    english_words = load_english_words()
+    if english_words is None:
+        logging.warning("No English wordlist available (NLTK 'words' corpus); ASR correction disabled.")
+        return None
+    lexicon = build_campaign_lexicon(campaign_config_path, english_words)
+    if lexicon is None:
+        return None
+    proper_nouns, vocabulary, entity_phrases = lexicon
+    return ASRCorrector(proper_nouns, vocabulary, english_words, entity_phrases)
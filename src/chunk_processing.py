@@ -0,0 +1,151 @@
+"""
+Turning accumulated transcript chunks into LLM prompts, and showing the answers.
+
+Shared by the single-session loop (dms_assistant.py) and the per-table loops (table_session.py).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from chunk_size_controller import ChunkSizeController
+from entity_gazetteer import EntityGazetteer, format_entity_grounding
+from llm_worker import LLMRequestWorker
+from pipeline_tracing import PipelineTracer
+from prompt_fanout import PromptFanOut
+from session_journal import SessionJournal
+from speculative_prompt import SpeculativePreparer
+from transcript_store import TranscriptStore
+
+ASSISTANT_NEEDS_MORE_CONTEXT = "ASSISTANT_NEEDS_MORE_CONTEXT"
+
+
+def prompt_fields(chunk: str, gazetteer: Optional[EntityGazetteer],
+                  transcript_store: Optional[TranscriptStore] = None) -> Tuple[Dict[str, str], List[str]]:
+    """Values of the prompt template placeholders for a chunk, and the names of the referenced entities.
+
+    If a transcript store is given, snippets from earlier sessions mentioning those entities
+    are added after the entity block.
+    """
+    entity_matches = gazetteer.match(chunk) if gazetteer else []
+    entity_names = [entity_match.name for entity_match in entity_matches]
+    grounding = format_entity_grounding(entity_matches)
+    if transcript_store and entity_names:
+        grounding += transcript_store.format_past_mentions(entity_names)
+    return {"accumulated_transcript_chunk": chunk, "referenced_entities": grounding}, entity_names
+
+
+def display_llm_response(response: Any, latency: float, journal: SessionJournal, category: Optional[str] = None):
+    """Journals an LLM response and prints it unless the assistant asked for more context.
+
+    Answers to a specialized prompt are headed with their category.
+    """
+    response_text = response.text
+    journal.log("RESPONSE_RECEIVED", logging.DEBUG, latency_seconds=round(latency, 3), text=response_text,
+                category=category)
+    if response_text.strip() == ASSISTANT_NEEDS_MORE_CONTEXT:
+        logging.info(f"Assistant needs more context; no {category or 'suggestions'} for this chunk.")
+        return
+    title = f" {category.replace('_', ' ').upper()} ({latency:.1f}s) " if category else " ASSISTANT SUGGESTIONS "
+    print("-"*20 + title + "-"*20)
+    print(response_text)
+    print("-"*(40 + len(title)))
+
+
+def process_accumulated_chunk(accumulated_chunk: str, prompt_template: str, gazetteer: Optional[EntityGazetteer],
+                              journal: SessionJournal,
+                              llm_worker: Optional[LLMRequestWorker] = None,
+                              chunk_controller: Optional[ChunkSizeController] = None,
+                              tracer: Optional[PipelineTracer] = None,
+                              segment_received_at: Optional[float] = None,
+                              transcript_store: Optional[TranscriptStore] = None,
+                              prompt_fanout: Optional[PromptFanOut] = None,
+                              speculator: Optional[SpeculativePreparer] = None):
+    """Journals (and stores) an accumulated chunk, prepares its prompt and hands it to the LLM worker (if enabled).
+
+    With a prompt fan-out, the chunk goes to all specialized prompts instead of the single template.
+    If a speculation on this chunk matches, its retrieval results (and speculative answer) are used.
+    """
+    chunk_emitted_at = tracer.now() if tracer else None
+    if tracer and segment_received_at is not None:
+        tracer.record("receipt_to_chunk", chunk_emitted_at - segment_received_at)
+    # Process the accumulated chunk (KEEP THIS)
+    logging.info("Processing accumulated chunk...")
+    journal.log("ACCUMULATED_CHUNK", logging.DEBUG, chunk=accumulated_chunk)
+    if transcript_store:
+        transcript_store.add_chunk(accumulated_chunk)
+    # --- PRINT FOR DEBUG ---
+    print("-"*20 + " ACCUMULATED CHUNK " + "-"*20)
+    print(accumulated_chunk)
+    print("-"*59)
+    # ---------------------
+
+    # Format Prompt (KEEP THIS)
+    format_started_at = tracer.now() if tracer else None
+    speculation = speculator.resolve(accumulated_chunk) if speculator else None
+    if speculation:
+        fields, entity_names = speculation.prepared.result()
+        fields = dict(fields, accumulated_transcript_chunk=accumulated_chunk)
+    else:
+        fields, entity_names = prompt_fields(accumulated_chunk, gazetteer, transcript_store)
+    formatted_prompt = None if prompt_fanout else prompt_template.format(**fields)
+    if tracer:
+        tracer.record_since("prompt_format", format_started_at)
+
+    if speculation and speculation.answer and llm_worker:
+        # Already sent while the chunk was being spoken; the worker commits it to the chat in order
+        journal.log("PROMPT_SENT", logging.DEBUG, blobs={"template": prompt_template, "grounding": fields["referenced_entities"]},
+                    chunk=speculation.chunk, referenced_entities=entity_names, speculative=True)
+        llm_worker.submit_prepared(speculation.prompt, speculation.answer, chunk_emitted_at)
+    elif prompt_fanout:
+        journal.log("PROMPT_SENT", logging.DEBUG, blobs={"grounding": fields["referenced_entities"]},
+                    chunk=accumulated_chunk, referenced_entities=entity_names, categories=prompt_fanout.categories)
+        prompt_fanout.submit(fields, chunk_emitted_at)
+    else:
+        # Template and grounding (entity sections, past-session mentions) are journaled once by hash;
+        # with the chunk they rebuild the exact prompt
+        journal.log("PROMPT_SENT", logging.DEBUG, blobs={"template": prompt_template, "grounding": fields["referenced_entities"]},
+                    chunk=accumulated_chunk, referenced_entities=entity_names)
+        if llm_worker:
+            llm_worker.submit(formatted_prompt, chunk_emitted_at)
+        else:
+            # LLM Call Skipped (KEEP THIS)
+            logging.info("[TESTING] LLM Call Skipped.")
+
+    # Adapt chunk size to LLM latency and backlog
+    if chunk_controller:
+        chunk_controller.observe_chunk()
+        backlog_source = prompt_fanout or llm_worker
+        if chunk_controller.update(backlog_source.pending_count if backlog_source else 0):
+            journal.log("CHUNK_SETPOINTS", **chunk_controller.setpoints())
+
+
+def process_final_chunk(final_chunk: str, prompt_template: str, gazetteer: Optional[EntityGazetteer],
+                        journal: SessionJournal, tracer: PipelineTracer,
+                        llm_worker: Optional[LLMRequestWorker] = None,
+                        transcript_store: Optional[TranscriptStore] = None,
+                        prompt_fanout: Optional[PromptFanOut] = None):
+    """Journals (and stores) the chunk left in the buffer when the transcript ends and sends its prompt."""
+    logging.info("Processing final chunk from buffer...")
+    journal.log("FINAL_CHUNK", logging.DEBUG, chunk=final_chunk)
+    if transcript_store:
+        transcript_store.add_chunk(final_chunk)
+    # --- PRINT FOR DEBUG ---
+    print("-"*20 + " FINAL CHUNK " + "-"*20)
+    print(final_chunk)
+    print("-"*53)
+    # ---------------------
+
+    # Format Prompt (KEEP THIS)
+    fields, entity_names = prompt_fields(final_chunk, gazetteer, transcript_store)
+    formatted_prompt = prompt_template.format(**fields)
+    journal.log("PROMPT_SENT_FINAL", logging.DEBUG,
+                blobs={"template": prompt_template, "grounding": fields["referenced_entities"]},
+                chunk=final_chunk, referenced_entities=entity_names)
+
+    if prompt_fanout:
+        prompt_fanout.submit(fields, tracer.now())
+    elif llm_worker:
+        llm_worker.submit(formatted_prompt, tracer.now())
+    else:
+        # LLM Call Skipped (KEEP THIS)
+        logging.info("[TESTING] Final LLM Call Skipped.")
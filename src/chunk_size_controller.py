@@ -0,0 +1,135 @@
+"""
+Feedback controller that adapts the TranscriptAccumulator's chunk thresholds at runtime.
+
+If LLM responses take longer than the time between chunks, requests pile up; the
+controller then grows the chunks so fewer, larger prompts are sent. When the LLM is
+idle and fast, it shrinks them again so suggestions arrive sooner.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# --- Controller Settings ---
+MIN_SENTENCES_BOUNDS = (1, 10)
+MIN_WORDS_BOUNDS = (15, 200)
+# LLM latency / chunk interval above which chunks grow, and below which they shrink
+HIGH_UTILIZATION = 0.8
+LOW_UTILIZATION = 0.4
+GROWTH_FACTOR = 1.25   # Grow quickly when falling behind...
+SHRINK_FACTOR = 0.9    # ...and shrink gently when idle
+EWMA_ALPHA = 0.3       # Weight of the newest latency / interval sample
+MIN_UPDATE_INTERVAL_SECONDS = 5.0 # Avoid reacting to every single sample
+
+
+class ChunkSizeController:
+    """Scales an accumulator's `min_sentences` / `min_words` from LLM latency and backlog."""
+
+    def __init__(self, accumulator: Any,
+                 min_sentences_bounds: Tuple[int, int] = MIN_SENTENCES_BOUNDS,
+                 min_words_bounds: Tuple[int, int] = MIN_WORDS_BOUNDS):
+        """
+        Args:
+            accumulator (TranscriptAccumulator): The accumulator whose thresholds are adjusted.
+                Its current thresholds are the baseline (scale 1.0).
+            min_sentences_bounds (Tuple[int, int]): Inclusive (lower, upper) bounds for `min_sentences`.
+            min_words_bounds (Tuple[int, int]): Inclusive (lower, upper) bounds for `min_words`.
+        """
+        self.accumulator = accumulator
+        self.min_sentences_bounds = min_sentences_bounds
+        self.min_words_bounds = min_words_bounds
+        self.base_min_sentences = accumulator.min_sentences
+        self.base_min_words = accumulator.min_words
+        self.scale = 1.0
+        self.latency_ewma: Optional[float] = None
+        self.chunk_interval_ewma: Optional[float] = None
+        self.pending_requests = 0
+        self.adjustments = 0
+        self._last_chunk_at: Optional[float] = None
+        self._last_update_at = 0.0
+        self._lock = threading.Lock()
+        logging.info(f"ChunkSizeController initialized (base {self.base_min_sentences} sentences / {self.base_min_words} words).")
+
+    @staticmethod
+    def _ewma(previous: Optional[float], sample: float) -> float:
+        return sample if previous is None else EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * previous
+
+    def observe_latency(self, latency_seconds: float):
+        """Records one LLM round-trip time. Safe to call from the LLM worker thread."""
+        with self._lock:
+            self.latency_ewma = self._ewma(self.latency_ewma, latency_seconds)
+
+    def observe_chunk(self, now: Optional[float] = None):
+        """Records that the accumulator emitted a chunk."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._last_chunk_at is not None:
+                self.chunk_interval_ewma = self._ewma(self.chunk_interval_ewma, now - self._last_chunk_at)
+            self._last_chunk_at = now
+
+    def utilization(self) -> Optional[float]:
+        """LLM latency relative to the time between chunks; above 1.0 the LLM cannot keep up."""
+        if self.latency_ewma is None or not self.chunk_interval_ewma:
+            return None
+        return self.latency_ewma / self.chunk_interval_ewma
+
+    def update(self, pending_requests: int, now: Optional[float] = None) -> bool:
+        """
+        Re-evaluates the thresholds and applies them to the accumulator.
+
+        Args:
+            pending_requests (int): LLM requests queued or in flight.
+            now (float, optional): Current `time.monotonic()` value.
+
+        Returns:
+            bool: True if the thresholds changed.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.pending_requests = pending_requests
+            if now - self._last_update_at < MIN_UPDATE_INTERVAL_SECONDS:
+                return False
+            utilization = self.utilization()
+            if utilization is None:
+                return False  # No LLM latency observed yet; keep the configured thresholds
+            self._last_update_at = now
+
+            previous = (self.accumulator.min_sentences, self.accumulator.min_words)
+            if pending_requests > 1 or utilization > HIGH_UTILIZATION:
+                self.scale *= GROWTH_FACTOR
+            elif pending_requests == 0 and utilization < LOW_UTILIZATION:
+                self.scale *= SHRINK_FACTOR
+            self._apply()
+            changed = (self.accumulator.min_sentences, self.accumulator.min_words) != previous
+        if changed:
+            self.adjustments += 1
+            logging.info(f"ChunkSizeController: thresholds now {self.accumulator.min_sentences} sentences / "
+                         f"{self.accumulator.min_words} words (utilization {utilization:.2f}, {pending_requests} pending).")
+        return changed
+
+    def _apply(self):
+        """Writes the scaled thresholds to the accumulator, clamping the scale to what the bounds allow."""
+        lowest_scale = max(self.min_sentences_bounds[0] / self.base_min_sentences, self.min_words_bounds[0] / self.base_min_words)
+        highest_scale = min(self.min_sentences_bounds[1] / self.base_min_sentences, self.min_words_bounds[1] / self.base_min_words)
+        self.scale = min(max(self.scale, lowest_scale), highest_scale)
+        self.accumulator.min_sentences = _clamp(round(self.base_min_sentences * self.scale), self.min_sentences_bounds)
+        self.accumulator.min_words = _clamp(round(self.base_min_words * self.scale), self.min_words_bounds)
+
+    def setpoints(self) -> Dict[str, Any]:
+        """Returns the current thresholds and the signals they were derived from."""
+        utilization = self.utilization()
+        return {
+            "min_sentences": self.accumulator.min_sentences,
+            "min_words": self.accumulator.min_words,
+            "scale": round(self.scale, 3),
+            "latency_ewma_seconds": None if self.latency_ewma is None else round(self.latency_ewma, 3),
+            "chunk_interval_ewma_seconds": None if self.chunk_interval_ewma is None else round(self.chunk_interval_ewma, 3),
+            "utilization": None if utilization is None else round(utilization, 3),
+            "pending_requests": self.pending_requests,
+            "adjustments": self.adjustments,
+        }
+
+
+def _clamp(value: int, bounds: Tuple[int, int]) -> int:
+    return min(max(value, bounds[0]), bounds[1])
@@ -5,7 +5,7 @@ Handles loading and combining context files based on a campaign config file.
 import logging
 import json
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,6 +15,10 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 # Define the footer for the LLM context (preamble comes from config file)
 CONTEXT_FOOTER = "\n--- END CONTEXT ---"
+
+# Config keys naming context files, in the order they are combined
+SINGLE_FILE_KEYS = ["pc_description_file", "current_state_file"]
+LIST_FILE_KEYS = ["adventure_files", "extra_lore_files"]
 # --------------------------
 
 def load_preamble(preamble_file_path: Optional[str]) -> Optional[str]:
@@ -44,6 +48,41 @@ def _load_single_file_content(file_path_str: Optional[str]) -> Optional[str]:
         logging.warning(f"Context file not found, skipping: {file_path}")
         return None
 
+def load_campaign_config(campaign_config_path: str) -> Optional[Dict[str, Any]]:
+    """Loads the campaign JSON configuration. Returns None if the file does not exist."""
+    config_path = Path(campaign_config_path)
+    if not config_path.is_file():
+        logging.error(f"Campaign configuration file not found: {config_path}")
+        return None
+
+    logging.info(f"Loading campaign configuration from: {config_path}")
+    # No try block as per rules
+    return json.loads(config_path.read_text(encoding="utf-8"))
+
+def get_context_file_paths(config_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Lists the context files named in a campaign config, in combination order.
+
+    Args:
+        config_data (Dict[str, Any]): The parsed campaign configuration.
+
+    Returns:
+        List[Tuple[str, str]]: (config key, file path) pairs. Missing files are not filtered out here.
+    """
+    file_paths: List[Tuple[str, str]] = []
+    for key in SINGLE_FILE_KEYS:
+        if config_data.get(key):
+            file_paths.append((key, config_data[key]))
+
+    for key in LIST_FILE_KEYS:
+        file_list = config_data.get(key, [])
+        if not isinstance(file_list, list):
+            logging.warning(f"Config key '{key}' is not a list, skipping.")
+            continue
+        for file_path_str in file_list:
+            file_paths.append((key, file_path_str))
+    return file_paths
+
 def load_and_combine_context(campaign_config_path: str) -> Optional[str]:
     """
     Loads campaign config, reads specified context files, and combines them.
@@ -55,15 +94,10 @@ def load_and_combine_context(campaign_config_path: str) -> Optional[str]:
         Optional[str]: The combined context string (preamble + file contents + footer),
                        or None if config/preamble loading fails or no files are found.
     """
-    config_path = Path(campaign_config_path)
-    if not config_path.is_file():
-        logging.error(f"Campaign configuration file not found: {config_path}")
+    config_data = load_campaign_config(campaign_config_path)
+    if config_data is None:
         return None
 
-    logging.info(f"Loading campaign configuration from: {config_path}")
-    # No try block as per rules
-    config_data: Dict[str, Any] = json.loads(config_path.read_text(encoding="utf-8"))
-
     preamble = load_preamble(config_data.get("preamble_file"))
     if preamble is None:
         # load_preamble logs error if file specified but not found
@@ -77,29 +111,13 @@ def load_and_combine_context(campaign_config_path: str) -> Optional[str]:
     combined_content = [preamble]
     files_loaded_successfully = False
 
-    # Load individual files specified directly
-    file_keys_to_load = ["pc_description_file", "current_state_file"]
-    for key in file_keys_to_load:
-        content = _load_single_file_content(config_data.get(key))
+    for key, file_path_str in get_context_file_paths(config_data):
+        content = _load_single_file_content(file_path_str)
         if content:
-            combined_content.append(f"\n\n--- Context Section: {key} ({config_data.get(key)}) ---\n\n")
+            combined_content.append(f"\n\n--- Context Section: {key} ({file_path_str}) ---\n\n")
             combined_content.append(content)
             files_loaded_successfully = True
 
-    # Load files from lists
-    list_keys_to_load = ["adventure_files", "extra_lore_files"]
-    for key in list_keys_to_load:
-        file_list = config_data.get(key, [])
-        if not isinstance(file_list, list):
-            logging.warning(f"Config key '{key}' is not a list, skipping.")
-            continue
-        for file_path_str in file_list:
-            content = _load_single_file_content(file_path_str)
-            if content:
-                combined_content.append(f"\n\n--- Context Section: {key} ({file_path_str}) ---\n\n")
-                combined_content.append(content)
-                files_loaded_successfully = True
-
     # If preamble loaded but no other files were found/specified, that's still okay
     if not files_loaded_successfully and preamble == "":
         logging.error("Failed to load preamble and no other context files were found or specified.")
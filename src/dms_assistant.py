@@ -8,7 +8,7 @@ and displays results.
 import logging
 import time
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import datetime # Added for timestamping logs
 import sys # Added to potentially access client methods
 import queue       # Added for transcript queue
@@ -18,23 +18,30 @@ import re # Added for sentence splitting
 
 # Project imports (ensure these paths are correct relative to src/)
 from context_loader import load_and_combine_context
-# Make sure whisper_live_client path is correct
-# Assumes client is in a sibling directory or installed
-try:
-    from whisper_live_client.client import TranscriptionClient
-except ImportError:
-    logging.error("Failed to import TranscriptionClient. Make sure whisper_live_client is installed or accessible.")
-    # Depending on structure, might need sys.path manipulation if it's local
-    # import sys
-    # sys.path.append(str(Path(__file__).parent.parent)) # Example if client is in project root
-    # from whisper_live_client.client import TranscriptionClient
-    # For now, exit if import fails after trying default path
-    sys.exit(1)
-
-import google.generativeai as genai
+# Heavy modules are imported where they are first used, so startup can overlap them:
+# google.generativeai in initialize_llm, whisper_live_client.client (pyaudio, av, scipy) in
+# initialize_transcription_client, and nltk in ensure_sentence_tokenizer
+
 from dotenv import load_dotenv
 import os
-from transcript_accumulator import TranscriptAccumulator # Added import
+from transcript_accumulator import TranscriptAccumulator, ensure_sentence_tokenizer # Added import
+from entity_gazetteer import build_gazetteer
+from asr_corrector import build_asr_corrector
+from segment_filter import HallucinationFilter
+from llm_worker import LLMRequestWorker
+from prompt_fanout import PromptFanOut, load_specialized_templates
+from speculative_prompt import SpeculativePreparer, branch_chat_sender
+from chunk_processing import display_llm_response, process_accumulated_chunk, process_final_chunk, prompt_fields
+from chunk_size_controller import ChunkSizeController
+from transcript_store import TranscriptStore
+from session_checkpoint import SessionCheckpointer, restore_history
+from session_journal import setup_session_journal
+from session_teardown import (close_transcription_client, journal_pipeline_statistics, journal_transcription_statistics,
+                              stop_llm_pipeline, stop_transcription)
+from pipeline_tracing import PipelineTracer
+from session_profiler import start_session_profiler
+from metrics_server import MetricsRegistry, MetricsServer, build_pipeline_metrics
+from startup import StartupTimer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - CONSOLE - %(message)s')
@@ -43,10 +50,53 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - CO
 LLM_MODEL_NAME = 'gemini-1.5-flash' # Or the preview model we tested
 TRANSCRIPTION_SERVER_HOST = "localhost"
 TRANSCRIPTION_SERVER_PORT = 9090
+# Offer Opus-compressed audio to the server (remote servers over slow links); int16 is always offered
+TRANSCRIPTION_ALLOW_OPUS = False
+# Reconnect to the transcription server if the websocket drops, replaying up to 30s of unacknowledged audio
+TRANSCRIPTION_RECONNECT = True
+# Further (host, port) servers; with any listed, audio is routed to the fastest healthy server with failover
+TRANSCRIPTION_FALLBACK_SERVERS = []
+# Append completed segments to logs/transcript_<timestamp>.{srt,vtt,jsonl} as they arrive
+TRANSCRIPT_EXPORT_ENABLED = True
+# Full-text store of segments and chunks across sessions; past mentions of referenced entities go into prompts
+TRANSCRIPT_STORE_ENABLED = True
+# Checkpoint the session every 30s and resume from it after a crash/restart with the same campaign
+SESSION_CHECKPOINTS_ENABLED = True
 # Add constants for transcript accumulation strategy?
 PROMPT_TEMPLATE_FILE = Path(__file__).parent.parent / "prompts/dm_assistant_prompt.md" # Path relative to this script
+# Instead of the single template, send each chunk to the category templates in prompts/specialized/ concurrently,
+# showing each category's suggestions as soon as they arrive; answers slower than the category's timeout are dropped
+SPECIALIZED_PROMPTS_ENABLED = False
+SPECIALIZED_PROMPT_DIRECTORY = Path(__file__).parent.parent / "prompts/specialized"
+SPECIALIZED_PROMPT_TIMEOUTS = {"npc_dialogue": 8.0, "descriptions": 10.0, "items": 12.0, "loot": 12.0} # Seconds
+# Start retrieval and prompt assembly for the chunk being spoken once its partial text is stable, and use the
+# result if the completed chunk matches within the tolerance (word-level similarity)
+SPECULATIVE_PREPARATION_ENABLED = False
+# Also send the speculative prompt (on a branch of the chat); answers to mismatched chunks are discarded
+SPECULATIVE_LLM_REQUESTS_ENABLED = False
+SPECULATION_MATCH_TOLERANCE = 0.9
 LOG_DIRECTORY = Path(__file__).parent.parent / "logs"
-ASSISTANT_NEEDS_MORE_CONTEXT = "ASSISTANT_NEEDS_MORE_CONTEXT"
+TRANSCRIPT_STORE_FILE = LOG_DIRECTORY / "transcripts.sqlite3"
+# Set to True to send chunks to the LLM; while False prompts are only logged ("[TESTING] LLM Call Skipped.")
+LLM_CALLS_ENABLED = False
+# Live microphone mode (instead of file playback): callback capture sending small packets
+LIVE_MICROPHONE_ENABLED = False
+LIVE_PACKET_MS = 30 # 20-60 ms; smaller packets reach the server sooner
+LIVE_FAKE_INPUT_FILE = None # 16 kHz mono WAV fed through a fake input device to test live mode without a mic
+# Live mode: capture and send audio from a separate process (shared-memory ring, transcript deltas over a pipe),
+# so work in this process can't delay capture
+CAPTURE_PROCESS_ENABLED = False
+# Drop silence on the client before sending (less bandwidth and server GPU time per table)
+CLIENT_VAD_GATE_ENABLED = False
+# Per-stage latency tracing (cheap; summaries are logged and written to logs/ at shutdown)
+TRACING_ENABLED = True
+# How often the main loop wakes up without new segments, so time-based chunk flushes fire promptly
+ACCUMULATOR_POLL_INTERVAL_SECONDS = 0.5
+# Set this environment variable to a port to serve Prometheus metrics at http://127.0.0.1:<port>/metrics (unset = off)
+METRICS_PORT_ENV_VAR = "DMS_METRICS_PORT"
+# (campaign config, input audio file or None for live) per table; with any listed, all of them are hosted in
+# this one process sharing context, lexicons and the LLM model (see table_host.py) instead of the single session
+MULTI_TABLE_SESSIONS = []
 
 # --- Global Shutdown Flag ---
 # Using threading.Event for thread-safe signaling
@@ -58,49 +108,6 @@ def sigint_handler(signum, frame):
     logging.info("SIGINT received, requesting shutdown...")
     shutdown_requested.set()
 
-def setup_file_loggers(timestamp: str):
-    """Sets up file handlers for detailed logging."""
-    LOG_DIRECTORY.mkdir(exist_ok=True)
-
-    log_formatter = logging.Formatter('%(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-
-    # Logger for raw transcript
-    raw_transcript_logger = logging.getLogger('raw_transcript')
-    raw_transcript_logger.setLevel(logging.DEBUG) # Log everything passed to it
-    raw_handler = logging.FileHandler(LOG_DIRECTORY / f"raw_transcript_{timestamp}.log", encoding='utf-8')
-    raw_handler.setFormatter(log_formatter)
-    raw_transcript_logger.addHandler(raw_handler)
-    raw_transcript_logger.propagate = False # Don't send to root logger/console
-
-    # Logger for prompts sent
-    prompts_logger = logging.getLogger('prompts_sent')
-    prompts_logger.setLevel(logging.DEBUG)
-    prompts_handler = logging.FileHandler(LOG_DIRECTORY / f"prompts_sent_{timestamp}.log", encoding='utf-8')
-    prompts_handler.setFormatter(log_formatter)
-    prompts_logger.addHandler(prompts_handler)
-    prompts_logger.propagate = False
-
-    # Logger for responses received
-    responses_logger = logging.getLogger('responses_received')
-    responses_logger.setLevel(logging.DEBUG)
-    responses_handler = logging.FileHandler(LOG_DIRECTORY / f"responses_received_{timestamp}.log", encoding='utf-8')
-    responses_handler.setFormatter(log_formatter)
-    responses_logger.addHandler(responses_handler)
-    responses_logger.propagate = False
-
-    # Logger for combined session log
-    combined_logger = logging.getLogger('combined_session')
-    combined_logger.setLevel(logging.DEBUG)
-    combined_handler = logging.FileHandler(LOG_DIRECTORY / f"combined_session_{timestamp}.log", encoding='utf-8')
-    # Slightly different format for combined log to show source
-    combined_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-    combined_handler.setFormatter(combined_formatter)
-    combined_logger.addHandler(combined_handler)
-    combined_logger.propagate = False # Keep separate from console
-
-    logging.info(f"Detailed logs will be saved in: {LOG_DIRECTORY}")
-    return raw_transcript_logger, prompts_logger, responses_logger, combined_logger
-
 def load_prompt_template(file_path: Path) -> Optional[str]:
     """Loads the prompt template from a file."""
     if not file_path.is_file():
@@ -118,11 +125,30 @@ def load_prompt_template(file_path: Path) -> Optional[str]:
         logging.error(f"Failed to read prompt template file {file_path}: {e}")
         return None
 
-def initialize_llm(api_key: str) -> Optional[genai.GenerativeModel]:
-    """Configures the Gemini API and initializes the generative model."""
+def load_context(campaign_config_path: str, checkpoint: Optional[Dict[str, Any]],
+                 checkpointer: Optional[SessionCheckpointer]) -> Optional[str]:
+    """Loads the combined campaign context, from the checkpoint's cache when resuming."""
+    if checkpoint:
+        logging.info(f"Resuming session {checkpoint['session_id']} from a checkpoint "
+                     f"{checkpoint['age_seconds']:.0f}s old at {checkpoint['transcript_offset']:.1f}s of audio.")
+        initial_context = checkpoint["context"]
+    else:
+        logging.info("Loading context...")
+        initial_context = load_and_combine_context(campaign_config_path)
+        if not initial_context:
+            logging.error("Failed to load initial context. Exiting.")
+            return None
+        if checkpointer:
+            checkpointer.save_context(initial_context)
+    logging.info(f"Context loaded ({len(initial_context)} characters).")
+    return initial_context
+
+def initialize_llm(api_key: str) -> Optional[Any]:
+    """Configures the Gemini API and initializes the generative model (genai.GenerativeModel)."""
     if not api_key:
         logging.error("Google API Key is missing.")
         return None
+    import google.generativeai as genai # Imported here: the SDK is slow to import and only needed once
     genai.configure(api_key=api_key)
     logging.info("Gemini API configured.")
     logging.info(f"Initializing LLM model: {LLM_MODEL_NAME}")
@@ -130,12 +156,27 @@ def initialize_llm(api_key: str) -> Optional[genai.GenerativeModel]:
     logging.info("LLM model initialized.")
     return model
 
-def initialize_transcription_client(output_queue: Optional[queue.Queue] = None, input_audio_path: Optional[str] = None) -> Optional[TranscriptionClient]:
+def initialize_llm_from_env() -> Optional[Any]:
+    """Reads the API key from the environment (.env) and initializes the LLM."""
+    logging.info("Initializing LLM...")
+    load_dotenv()
+    return initialize_llm(os.getenv("GOOGLE_API_KEY"))
+
+def initialize_transcription_client(output_queue: Optional[queue.Queue] = None, input_audio_path: Optional[str] = None,
+                                    tracer: Optional[PipelineTracer] = None,
+                                    live_input_file: Optional[str] = None,
+                                    transcript_export_path: Optional[Path] = None,
+                                    start_offset: float = 0.0) -> Optional[Any]:
     """
     Initializes the WhisperLive transcription client.
     Always connects to the server, audio source handled later.
     Passes the output_queue to the underlying Client instance.
+    If transcript_export_path (an .srt path) is given, the transcript is exported incrementally there.
+    A start_offset (seconds) resumes a checkpointed session: file input skips that much audio;
+    live input is never skipped, its segment times just continue from the offset.
+    Returns a TranscriptionClient, or None if it could not be created.
     """
+    from whisper_live_client.vad_gate import VoiceActivityGate
     # Always use the configured host and port for the WebSocket connection
     host = TRANSCRIPTION_SERVER_HOST
     port = TRANSCRIPTION_SERVER_PORT
@@ -147,20 +188,40 @@ def initialize_transcription_client(output_queue: Optional[queue.Queue] = None,
         "model": "large-v3", # Changed to largest model
         "use_vad": True,
         "output_queue": output_queue,
-        "log_transcription": False # Disable internal console logging
+        "log_transcription": False, # Disable internal console logging
+        "tracer": tracer,
+        "allow_compressed_audio": TRANSCRIPTION_ALLOW_OPUS,
+        "reconnect": TRANSCRIPTION_RECONNECT,
     }
     # Arguments specific to TranscriptionClient wrapper (not passed to Client directly)
     wrapper_args = {
-        "mute_audio_playback": True # Mute playback for file mode by default
+        "mute_audio_playback": True, # Mute playback for file mode by default
+        "vad_gate": VoiceActivityGate() if CLIENT_VAD_GATE_ENABLED else None,
+        "fallback_servers": TRANSCRIPTION_FALLBACK_SERVERS,
+        "export_transcript": transcript_export_path is not None,
         # Add other TranscriptionClient __init__ specific args (save_output_recording etc.)
     }
+    if transcript_export_path is not None:
+        wrapper_args["output_transcription_path"] = str(transcript_export_path)
+    if start_offset:
+        wrapper_args["start_offset"] = start_offset
 
     if input_audio_path:
         logging.info(f"Initializing transcription client for file playback: {input_audio_path}")
     else:
         logging.info(f"Initializing transcription client for live input at ws://{host}:{port}")
         wrapper_args["mute_audio_playback"] = False # Ensure playback is NOT muted for live mic
-
+        wrapper_args["live_packet_ms"] = LIVE_PACKET_MS
+        wrapper_args["live_input_file"] = live_input_file
+        if CAPTURE_PROCESS_ENABLED:
+            from whisper_live_client.capture_process import CaptureProcess
+            # The tracer and queue can't cross the process boundary; segments come back through a pipe
+            child_args = {name: value for name, value in client_args.items() if name not in ("output_queue", "tracer")}
+            logging.info("Starting the audio capture process.")
+            return CaptureProcess(host, port, output_queue, **child_args, **wrapper_args)
+
+    # Imported here: pulls in pyaudio, av, scipy and numpy
+    from whisper_live_client.client import TranscriptionClient
     try:
         client = TranscriptionClient(
             host=host,
@@ -177,7 +238,8 @@ def initialize_transcription_client(output_queue: Optional[queue.Queue] = None,
 def run_assistant():
     """Main loop for the DMS Assistant."""
     run_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    raw_transcript_logger, prompts_logger, responses_logger, combined_logger = setup_file_loggers(run_timestamp)
+    journal = setup_session_journal(LOG_DIRECTORY, run_timestamp)
+    tracer = PipelineTracer(enabled=TRACING_ENABLED)
 
     # Register signal handler for graceful shutdown
     signal.signal(signal.SIGINT, sigint_handler)
@@ -185,56 +247,103 @@ def run_assistant():
     # --- Use Hardcoded Paths --- (Instead of parameters)
     campaign_config_path = str(Path("source_materials/ceres_group/ceres_odyssey.json").resolve())
     input_audio_file = str(Path("source_materials/recording_of_dm_resampled.wav").resolve())
+    if LIVE_MICROPHONE_ENABLED:
+        input_audio_file = None
 
     logging.info(f"Starting DMS Assistant Run: {run_timestamp}")
     # Log the hardcoded paths being used
     logging.info(f"Using Campaign Config: {campaign_config_path}")
-    logging.info(f"Using Input Audio File: {input_audio_file}")
+    logging.info(f"Using Input Audio File: {input_audio_file or 'live microphone'}")
+
+    startup_timer = StartupTimer()
 
     # 0. Load Prompt Template
     logging.info("Loading prompt template...")
     prompt_template = load_prompt_template(PROMPT_TEMPLATE_FILE)
     if not prompt_template:
         # Error logged in load_prompt_template
+        journal.log("STARTUP_FAILED", logging.ERROR, failed=["prompt_template"])
+        journal.close()
         return
 
-    # 1. Load Context
-    logging.info("Loading context...")
-    initial_context = load_and_combine_context(campaign_config_path)
-    if not initial_context:
-        logging.error("Failed to load initial context. Exiting.")
-        return
-    logging.info(f"Context loaded ({len(initial_context)} characters).")
-    # Log initial context only to combined log for reference if needed
-    combined_logger.info(f"INITIAL_CONTEXT_LOADED: {len(initial_context)} chars")
-
-    # 2. Initialize LLM
-    logging.info("Initializing LLM...")
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    llm_model = initialize_llm(api_key)
-    if not llm_model:
-        # Error logged in initialize_llm
+    # 0b. Look for a checkpoint of an interrupted session of this campaign
+    checkpointer = None
+    checkpoint = None
+    if SESSION_CHECKPOINTS_ENABLED:
+        restore_started_at = time.monotonic()
+        with startup_timer.phase("checkpoint"):
+            checkpointer = SessionCheckpointer(LOG_DIRECTORY, campaign_config_path, input_audio_file)
+            checkpoint = checkpointer.load()
+
+    # Opt-in sampling/memory profiling of startup, the client and the main loop (DMS_PROFILE=1)
+    profiler = start_session_profiler(LOG_DIRECTORY, run_timestamp)
+
+    # 1-4. Independent startup steps run concurrently: context (from the checkpoint's cache when
+    # resuming), gazetteer, ASR lexicon, transcript store, LLM setup, tokenizer warm-up and the
+    # transcription server connection
+    logging.info("Loading context, LLM, tokenizer and transcription connection concurrently...")
+    transcript_queue = queue.Queue()
+    startup_tasks = {
+        "context": lambda: load_context(campaign_config_path, checkpoint, checkpointer),
+        "gazetteer": lambda: build_gazetteer(campaign_config_path),
+        "asr_corrector": lambda: build_asr_corrector(campaign_config_path),
+        "llm": initialize_llm_from_env,
+        "tokenizer": ensure_sentence_tokenizer,
+        "transcription_connect": lambda: initialize_transcription_client(
+            output_queue=transcript_queue, input_audio_path=input_audio_file, tracer=tracer,
+            live_input_file=LIVE_FAKE_INPUT_FILE,
+            transcript_export_path=LOG_DIRECTORY / f"transcript_{run_timestamp}.srt" if TRANSCRIPT_EXPORT_ENABLED else None,
+            start_offset=checkpoint["transcript_offset"] if checkpoint else 0.0),
+    }
+    if TRANSCRIPT_STORE_ENABLED:
+        startup_tasks["transcript_store"] = lambda: TranscriptStore(
+            TRANSCRIPT_STORE_FILE, campaign_config_path, run_timestamp, input_audio_file)
+    startup_results, startup_failures = startup_timer.run_concurrently(startup_tasks)
+    initial_context = startup_results["context"]
+    gazetteer = startup_results["gazetteer"]
+    asr_corrector = startup_results["asr_corrector"]
+    llm_model = startup_results["llm"]
+    transcription_client = startup_results["transcription_connect"]
+    transcript_store = startup_results.get("transcript_store")
+
+    if startup_failures or not initial_context or not llm_model or not transcription_client:
+        # Errors already logged by the failing step (or by run_concurrently, for steps that raised)
+        if not transcription_client:
+            logging.error("Failed to initialize transcription client. Exiting.")
+        else:
+            transcription_client.close_all_clients()
+        if transcript_store:
+            transcript_store.close()
+        if profiler:
+            profiler.stop()
+        failed = [name for name, result in (("context", initial_context), ("llm", llm_model),
+                                            ("transcription_connect", transcription_client))
+                  if not result and name not in startup_failures]
+        journal.log("STARTUP_FAILED", logging.ERROR, failed=failed + list(startup_failures),
+                    errors={name: repr(error) for name, error in startup_failures.items()})
+        journal.close()
         return
-
-    # 3. Start LLM Chat Session
+    # Journal the initial context once (by hash) for reference
+    journal.log("INITIAL_CONTEXT_LOADED", blobs={"context": initial_context}, chars=len(initial_context))
+    journal.log("GAZETTEER_BUILT", entities=len(gazetteer) if gazetteer else 0)
+    if transcript_store:
+        logging.info(f"Transcript store: {TRANSCRIPT_STORE_FILE} ({len(transcript_store.sessions(campaign_config_path))} sessions of this campaign)")
+    journal.log("TRANSCRIPTION_CLIENT_INITIALIZED")
+
+    # Start LLM Chat Session (needs both the context and the model)
     logging.info("Starting LLM chat session with context...")
-    initial_history = [
-        {'role': 'user', 'parts': [initial_context]},
-        {'role': 'model', 'parts': ["Okay, I have loaded the context. I am ready to assist based on the DM's narration."]}
-    ]
-    chat_session = llm_model.start_chat(history=initial_history)
+    with startup_timer.phase("chat_session"):
+        initial_history = [
+            {'role': 'user', 'parts': [initial_context]},
+            {'role': 'model', 'parts': ["Okay, I have loaded the context. I am ready to assist based on the DM's narration."]}
+        ]
+        if checkpoint:
+            initial_history += restore_history(checkpoint["chat_history"])
+        chat_session = llm_model.start_chat(history=initial_history)
     logging.info("LLM chat session started.")
-    combined_logger.info("LLM_SESSION_STARTED")
-
-    # 4. Initialize Transcription Client & Queue
-    logging.info("Initializing transcription client...")
-    transcript_queue = queue.Queue()
-    transcription_client = initialize_transcription_client(output_queue=transcript_queue, input_audio_path=input_audio_file)
-    if not transcription_client:
-        logging.error("Failed to initialize transcription client. Exiting.")
-        return
-    combined_logger.info("TRANSCRIPTION_CLIENT_INITIALIZED")
+    journal.log("LLM_SESSION_STARTED")
+    startup_timer.log()
+    journal.log("STARTUP_TIMINGS", **startup_timer.summary())
 
     # 5. Start Transcription Thread
     transcription_thread = None
@@ -243,60 +352,144 @@ def run_assistant():
         transcription_thread = threading.Thread(
             target=transcription_client,
             args=(input_audio_file,),
+            name="transcription",
             daemon=True
         )
         transcription_thread.start()
-        combined_logger.info(f"TRANSCRIPTION_THREAD_STARTED: {input_audio_file}")
+        journal.log("TRANSCRIPTION_THREAD_STARTED", input_audio_file=input_audio_file)
     else:
-        # TODO: Implement live microphone handling here later
-        logging.error("Live microphone input not yet implemented. Please provide --input-audio-file.")
-        combined_logger.error("LIVE_MODE_NOT_IMPLEMENTED")
-        return # Exit if no file and live not ready
+        logging.info(f"Starting live transcription thread ({LIVE_PACKET_MS} ms packets)")
+        transcription_thread = threading.Thread(target=transcription_client, name="transcription", daemon=True)
+        transcription_thread.start()
+        journal.log("TRANSCRIPTION_THREAD_STARTED", live_packet_ms=LIVE_PACKET_MS, fake_input_file=LIVE_FAKE_INPUT_FILE)
 
     # --- 6. Main Processing Loop ---
     logging.info("Starting main processing loop...")
     accumulator = TranscriptAccumulator() # Instantiate the accumulator (KEEP THIS)
+    if checkpoint:
+        accumulator.restore_state(checkpoint["accumulator"])
+        journal.log("SESSION_RESUMED", resumed_session=checkpoint["session_id"],
+                    checkpoint_age_seconds=round(checkpoint["age_seconds"], 1),
+                    transcript_offset=checkpoint["transcript_offset"],
+                    restored_chat_turns=len(checkpoint["chat_history"]),
+                    restore_seconds=round(time.monotonic() - restore_started_at, 3))
+    chunk_controller = ChunkSizeController(accumulator)
+    hallucination_filter = HallucinationFilter()
+    journal.log("CHUNK_SETPOINTS", **chunk_controller.setpoints())
+    llm_worker = None
+    prompt_fanout = None
+    specialized_templates = {}
+    if LLM_CALLS_ENABLED and SPECIALIZED_PROMPTS_ENABLED:
+        specialized_templates = load_specialized_templates(SPECIALIZED_PROMPT_DIRECTORY)
+    if specialized_templates:
+        # Each category gets its own chat primed with the context only, so histories stay in order per category
+        prompt_fanout = PromptFanOut(
+            specialized_templates,
+            start_chat=lambda: llm_model.start_chat(history=initial_history[:2]),
+            on_response=lambda category, response, latency: display_llm_response(response, latency, journal, category),
+            timeouts=SPECIALIZED_PROMPT_TIMEOUTS,
+            on_latency=chunk_controller.observe_latency,
+            tracer=tracer,
+        )
+        prompt_fanout.start()
+    elif LLM_CALLS_ENABLED:
+        llm_worker = LLMRequestWorker(
+            chat_session.send_message,
+            on_response=lambda prompt, response, latency: display_llm_response(response, latency, journal),
+            on_latency=chunk_controller.observe_latency,
+            tracer=tracer,
+            on_failure=lambda failures, queued, error: journal.log("LLM_REQUEST_FAILED", logging.ERROR,
+                                                                   failures=failures, queued_prompts=queued, error=repr(error)),
+        )
+        llm_worker.start()
+    speculator = None
+    if SPECULATIVE_PREPARATION_ENABLED:
+        speculator = SpeculativePreparer(
+            lambda chunk: prompt_fields(chunk, gazetteer, transcript_store),
+            lambda fields: prompt_template.format(**fields),
+            # The fan-out has one chat per category, so only single-prompt answers are speculated
+            send_speculative=branch_chat_sender(llm_model, chat_session)
+            if llm_worker and SPECULATIVE_LLM_REQUESTS_ENABLED else None,
+            tolerance=SPECULATION_MATCH_TOLERANCE,
+        )
+    metrics_registry = MetricsRegistry()
+    segments_received, chunks_emitted = build_pipeline_metrics(
+        metrics_registry, transcript_queue, accumulator, transcription_client.clients, tracer, llm_worker or prompt_fanout)
+    metrics_server = None
+    metrics_port = os.getenv(METRICS_PORT_ENV_VAR)
+    if metrics_port:
+        if transcription_client.vad_gate:
+            metrics_registry.gauge("dms_vad_suppressed_fraction", "Fraction of captured audio not sent (client VAD).",
+                                   lambda: transcription_client.vad_gate.suppressed_fraction)
+        if getattr(transcription_client, "ring", None):
+            metrics_registry.counter_reader("dms_capture_ring_overflows", "Capture ring overflows in the capture process.",
+                                   lambda: transcription_client.ring.statistics()["ring_overflows"])
+        if speculator:
+            metrics_registry.gauge("dms_speculation_hit_rate", "Share of speculative prompts that were used.",
+                                   lambda: speculator.hit_rate or 0.0)
+            metrics_registry.counter_reader("dms_speculation_wasted_tokens", "LLM tokens spent on discarded speculative answers.",
+                                   lambda: speculator.wasted_tokens)
+        metrics_server = MetricsServer(metrics_registry, int(metrics_port))
+        metrics_server.start()
+        journal.log("METRICS_SERVER_STARTED", port=int(metrics_port))
     processed_final_chunk = False # Flag to track if final chunk was processed (KEEP THIS)
+    session_completed = False # True once the transcript stream ended normally (the checkpoint is then dropped)
+    segment_received_at = None # Tracer time the most recent segment list arrived from the client
 
     try: # Use finally for guaranteed cleanup
         while not shutdown_requested.is_set():
+            if checkpointer and checkpointer.due():
+                checkpointer.save(run_timestamp, accumulator.checkpoint_state(), chat_session.history,
+                                  accumulator.last_processed_end_time)
             try:
-                segment = transcript_queue.get(block=True, timeout=0.5)
+                segment = transcript_queue.get(block=True, timeout=ACCUMULATOR_POLL_INTERVAL_SECONDS)
                 if segment is None:
                     logging.info("Received sentinel, ending transcription processing.")
-                    combined_logger.info("TRANSCRIPT_SENTINEL_RECEIVED")
+                    journal.log("TRANSCRIPT_SENTINEL_RECEIVED")
                     break
 
                 # Process Transcript Segment
-                raw_transcript_logger.debug(segment)
-                combined_logger.debug(f"TRANSCRIPT_SEGMENT: {segment}")
+                segments_received.inc()
+                journal.log("TRANSCRIPT_SEGMENT", logging.DEBUG, segments=segment)
+                stamped_at = tracer.take_stamp(segment)
+                if stamped_at is not None:
+                    segment_received_at = stamped_at
+                    tracer.record_since("queue_wait", stamped_at)
+                accumulate_started_at = tracer.now()
+
+                # Drop hallucinated filler/repetitions so they can't trigger LLM calls
+                segment = hallucination_filter.filter_segments(segment, accumulator.min_words)
+
+                # Correct misheard proper nouns before they reach the buffer
+                if asr_corrector:
+                    segment = asr_corrector.correct_segments(segment)
+                if transcript_store:
+                    transcript_store.add_segments(segment)
 
                 # Accumulate & Check for Chunk
                 accumulated_chunk = accumulator.add_segments(segment) # Use accumulator. Renamed method call.
+                tracer.record_since("accumulate", accumulate_started_at)
+                if speculator and not accumulated_chunk:
+                    speculator.observe(accumulator)
 
                 if accumulated_chunk:
-                    # Process the accumulated chunk (KEEP THIS)
-                    logging.info("Processing accumulated chunk...")
-                    combined_logger.debug(f"ACCUMULATED_CHUNK: {accumulated_chunk}")
-                    # --- PRINT FOR DEBUG ---
-                    print("-"*20 + " ACCUMULATED CHUNK " + "-"*20)
-                    print(accumulated_chunk)
-                    print("-"*59)
-                    # ---------------------
-
-                    # Format Prompt (KEEP THIS)
-                    formatted_prompt = prompt_template.format(accumulated_transcript_chunk=accumulated_chunk)
-                    prompts_logger.debug(formatted_prompt)
-                    combined_logger.debug(f"PROMPT_SENT: {formatted_prompt}")
-
-                    # LLM Call Skipped (KEEP THIS)
-                    logging.info("[TESTING] LLM Call Skipped.")
+                    chunks_emitted.inc()
+                    process_accumulated_chunk(accumulated_chunk, prompt_template, gazetteer, journal,
+                                              llm_worker, chunk_controller, tracer, segment_received_at, transcript_store,
+                                              prompt_fanout, speculator)
 
             except queue.Empty:
-                # Timeout occurred, check if transcription thread is done
+                # Timeout occurred: the DM may have paused, so apply the time-based flush policy
+                timed_chunk = accumulator.check_timeouts()
+                if timed_chunk:
+                    chunks_emitted.inc()
+                    process_accumulated_chunk(timed_chunk, prompt_template, gazetteer, journal,
+                                              llm_worker, chunk_controller, tracer, segment_received_at, transcript_store,
+                                              prompt_fanout, speculator)
+                # Check if transcription thread is done
                 if transcription_thread and not transcription_thread.is_alive() and transcript_queue.empty():
                     logging.info("Transcription thread finished and queue is empty. Exiting loop.")
-                    combined_logger.info("TRANSCRIPTION_THREAD_DONE_QUEUE_EMPTY")
+                    journal.log("TRANSCRIPTION_THREAD_DONE_QUEUE_EMPTY")
                     break
                 # Otherwise, just loop again to wait for more segments or shutdown signal
                 continue
@@ -306,77 +499,61 @@ def run_assistant():
             final_chunk = accumulator.flush()
             if final_chunk:
                 processed_final_chunk = True
-                logging.info("Processing final chunk from buffer...")
-                combined_logger.debug(f"FINAL_CHUNK: {final_chunk}")
-                # --- PRINT FOR DEBUG ---
-                print("-"*20 + " FINAL CHUNK " + "-"*20)
-                print(final_chunk)
-                print("-"*53)
-                # ---------------------
-
-                # Format Prompt (KEEP THIS)
-                formatted_prompt = prompt_template.format(accumulated_transcript_chunk=final_chunk)
-                prompts_logger.debug(formatted_prompt)
-                combined_logger.debug(f"PROMPT_SENT_FINAL: {formatted_prompt}")
-
-                # LLM Call Skipped (KEEP THIS)
-                logging.info("[TESTING] Final LLM Call Skipped.")
+                chunks_emitted.inc()
+                process_final_chunk(final_chunk, prompt_template, gazetteer, journal, tracer, llm_worker,
+                                    transcript_store, prompt_fanout)
             else:
                 logging.info("No final chunk to process from buffer.")
 
         # Loop End logging (KEEP THIS)
         if shutdown_requested.is_set():
             logging.info("Shutdown requested, exiting main loop.")
-            combined_logger.info("SHUTDOWN_REQUESTED_EXITING_LOOP")
+            journal.log("SHUTDOWN_REQUESTED_EXITING_LOOP")
         else:
             logging.info("Finished processing transcript stream normally.")
-            combined_logger.info("TRANSCRIPT_STREAM_ENDED_NORMALLY")
+            journal.log("TRANSCRIPT_STREAM_ENDED_NORMALLY")
+            session_completed = True
 
     finally:
         # --- 7. Cleanup ---
         logging.info("Initiating cleanup...")
-        combined_logger.info("CLEANUP_STARTED")
-
-        # Ensure transcription thread is finished
-        if transcription_thread and transcription_thread.is_alive():
-            logging.info("Waiting for transcription thread to complete...")
-            # Signal the client thread to stop? (Might need modification in client)
-            # For now, just join with timeout
-            transcription_thread.join(timeout=5.0)
-            if transcription_thread.is_alive():
-                logging.warning("Transcription thread did not exit cleanly after join timeout.")
-                combined_logger.warning("TRANSCRIPTION_THREAD_JOIN_TIMEOUT")
-            else:
-                 logging.info("Transcription thread joined.")
-                 combined_logger.info("TRANSCRIPTION_THREAD_JOINED")
-
-        # Close client connection (if method exists and is safe)
-        if transcription_client:
-            logging.info("Attempting to close transcription client...")
-            try:
-                # Check if close method exists, call it if safe
-                # Assuming transcription_client wraps a single client instance accessible via .client
-                if hasattr(transcription_client, 'client') and hasattr(transcription_client.client, 'close_websocket'):
-                     transcription_client.client.close_websocket()
-                     logging.info("Transcription client websocket closed.")
-                     combined_logger.info("TRANSCRIPTION_CLIENT_WEBSOCKET_CLOSED")
-                elif hasattr(transcription_client, 'close_all_clients'): # Fallback if structure changed
-                     transcription_client.close_all_clients()
-                     logging.info("Transcription client (via close_all_clients) closed.")
-                     combined_logger.info("TRANSCRIPTION_CLIENT_ALL_CLOSED")
-                else:
-                     logging.warning("Could not find appropriate method to close transcription client.")
-            except Exception as e:
-                logging.warning(f"Error during transcription client cleanup: {e}")
-                combined_logger.warning(f"TRANSCRIPTION_CLIENT_CLEANUP_ERROR: {e}")
+        journal.log("CLEANUP_STARTED")
+        stop_llm_pipeline(journal, llm_worker, speculator, prompt_fanout)
+        journal_pipeline_statistics(journal, hallucination_filter, asr_corrector, chunk_controller, tracer,
+                                    LOG_DIRECTORY / f"trace_{run_timestamp}.json")
+        if metrics_server:
+            metrics_server.stop()
+        if profiler:
+            profiler.stop()
+            journal.log("PROFILE_WRITTEN", directory=str(profiler.output_directory), samples=profiler.sample_count)
+        stop_transcription(transcription_client, transcription_thread, journal, live=not input_audio_file)
+        journal_transcription_statistics(transcription_client, journal)
+        close_transcription_client(transcription_client, journal)
+
+        if checkpointer and session_completed:
+            checkpointer.clear()
+        elif checkpointer:
+            # Interrupted (Ctrl+C or an exception): leave a fresh checkpoint to resume from
+            checkpointer.save(run_timestamp, accumulator.checkpoint_state(), chat_session.history,
+                              accumulator.last_processed_end_time)
+            journal.log("SESSION_CHECKPOINT_SAVED", path=str(checkpointer.path), saves=checkpointer.saves)
+        if transcript_store:
+            transcript_store.close()
+            journal.log("TRANSCRIPT_STORE_CLOSED", path=str(TRANSCRIPT_STORE_FILE), rows_written=transcript_store.rows_written)
 
         logging.info("DMS Assistant finished.")
-        combined_logger.info("ASSISTANT_RUN_FINISHED")
+        journal.log("ASSISTANT_RUN_FINISHED")
+        journal.close()
 
 
 if __name__ == "__main__":
     # Removed argparse setup
 
+    if MULTI_TABLE_SESSIONS:
+        from table_host import run_tables # Imported here: table_host imports this module
+        run_tables(MULTI_TABLE_SESSIONS)
+        sys.exit(0)
+
     # --- Basic File Checks (Optional but good practice) ---
     campaign_path_obj = Path("source_materials/ceres_group/ceres_odyssey.json")
     audio_path_obj = Path("source_materials/recording_of_dm_resampled.wav")
@@ -385,7 +562,7 @@ if __name__ == "__main__":
         logging.error(f"Error: Hardcoded campaign configuration file not found at {campaign_path_obj}")
         sys.exit(1)
 
-    if not audio_path_obj.is_file():
+    if not LIVE_MICROPHONE_ENABLED and not audio_path_obj.is_file():
         logging.error(f"Error: Hardcoded input audio file not found at {audio_path_obj}")
         sys.exit(1)
 
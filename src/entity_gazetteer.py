@@ -0,0 +1,300 @@
+"""
+Builds a gazetteer of named campaign entities (NPCs, ships, places, items)
+from the campaign context files and matches them against transcript chunks.
+
+Entity names are compiled into an Aho-Corasick automaton, so each chunk is
+scanned once in time linear in its length regardless of the number of entities.
+"""
+
+import logging
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from context_loader import load_campaign_config, get_context_file_paths
+
+# --- Extraction Settings ---
+MAX_ENTITY_WORDS = 5
+MIN_ENTITY_CHARS = 3
+# Only these files use headings as entity names; elsewhere headings are structural ("Player Characters")
+HEADING_ENTITY_KEYS = {"adventure_files", "extra_lore_files"}
+# Titles stripped to form a short alias ("King Jankor" is also matched as "Jankor")
+TITLE_WORDS = {"king", "queen", "lord", "lady", "captain", "prince", "princess", "oracle", "god", "goddess", "the"}
+# Connector words allowed in lowercase inside an entity name ("Horn of Balmytria")
+NAME_CONNECTORS = {"of", "the", "and", "&", "de", "du", "in", "on"}
+MAX_GROUNDING_ENTITIES = 10
+# Entities listed under a heading containing this are PCs ("Player Characters")
+PC_SECTION_MARKER = "character"
+
+BOLD_PATTERN = re.compile(r"\*\*([^*\n]+?)\*\*")
+ITALIC_PATTERN = re.compile(r"(?<![*\w])\*([^*\n]+?)\*(?![*\w])")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+class EntityMatch(NamedTuple):
+    """A gazetteer entity referenced in a piece of text."""
+    name: str
+    matched_text: List[str]
+    sections: List[str]
+    count: int
+
+
+class AhoCorasickAutomaton:
+    """Case-insensitive multi-pattern matcher returning whole-word matches only."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Compiles the automaton.
+
+        Args:
+            patterns (Iterable[str]): The strings to match. Matching is case-insensitive.
+        """
+        self.patterns: List[str] = [_normalize(p) for p in patterns]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern_index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(pattern_index)
+
+        # Breadth-first pass to compute failure links, merging outputs along them
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Finds non-overlapping whole-word matches, preferring the longest at each position.
+        The text is normalized like the patterns, so "Fire\nIsland" matches "fire island".
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            List[Tuple[int, int, int]]: (start, end, pattern index) triples in text order; end is exclusive.
+        """
+        lowered, offsets = _normalize_with_offsets(text)
+        candidates: List[Tuple[int, int, int]] = []
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_index in self._output[state]:
+                end = position + 1
+                start = end - len(self.patterns[pattern_index])
+                if _is_word_boundary(lowered, start - 1) and _is_word_boundary(lowered, end):
+                    candidates.append((start, end, pattern_index))
+
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected: List[Tuple[int, int, int]] = []
+        covered_until = 0
+        for start, end, pattern_index in candidates:
+            if start >= covered_until:
+                selected.append((offsets[start], offsets[end - 1] + 1, pattern_index))
+                covered_until = end
+        return selected
+
+
+class EntityGazetteer:
+    """Maps entity names and aliases to the context sections that mention them."""
+
+    def __init__(self, entity_sections: Dict[str, List[str]], aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            entity_sections (Dict[str, List[str]]): Canonical entity name -> source section labels.
+            aliases (Dict[str, str], optional): Alternative surface form -> canonical entity name.
+        """
+        self.entity_sections = entity_sections
+        surface_forms: Dict[str, str] = {_normalize(name): name for name in entity_sections}
+        for alias, name in (aliases or {}).items():
+            # A canonical name always wins over an alias with the same spelling
+            surface_forms.setdefault(_normalize(alias), name)
+        self._surface_names: List[str] = list(surface_forms.values())
+        self._automaton = AhoCorasickAutomaton(surface_forms.keys())
+        logging.info(f"EntityGazetteer initialized ({len(entity_sections)} entities, {len(surface_forms)} surface forms).")
+
+    def __len__(self) -> int:
+        return len(self.entity_sections)
+
+    def entity_names(self) -> List[str]:
+        """Returns the canonical entity names."""
+        return list(self.entity_sections)
+
+    def match(self, text: str) -> List[EntityMatch]:
+        """
+        Returns the entities referenced in the text, in order of first mention.
+
+        Args:
+            text (str): A transcript chunk or any other text.
+        """
+        found: Dict[str, EntityMatch] = {}
+        for start, end, pattern_index in self._automaton.find_all(text):
+            name = self._surface_names[pattern_index]
+            surface = text[start:end]
+            previous = found.get(name)
+            if previous is None:
+                found[name] = EntityMatch(name, [surface], self.entity_sections[name], 1)
+            else:
+                matched_text = previous.matched_text if surface in previous.matched_text else previous.matched_text + [surface]
+                found[name] = previous._replace(matched_text=matched_text, count=previous.count + 1)
+        return list(found.values())
+
+
+def _normalize(text: str) -> str:
+    """Lowercases and collapses whitespace so patterns and transcripts compare equal."""
+    return " ".join(text.lower().split())
+
+
+def _normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """Normalizes like `_normalize` and returns, per normalized character, its index in `text`."""
+    chars: List[str] = []
+    offsets: List[int] = []
+    for index, char in enumerate(text):
+        if char.isspace():
+            if not chars or chars[-1] != " ":
+                chars.append(" ")
+                offsets.append(index)
+        else:
+            chars.extend(char.lower())  # May be longer than one character ("İ")
+            offsets.extend([index] * len(char.lower()))
+    return "".join(chars), offsets
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """True if the character at index is outside the text or not part of a word."""
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+def _clean_entity_name(raw_name: str) -> Optional[str]:
+    """Returns a normalized entity name, or None if the span does not look like a proper noun."""
+    name = " ".join(raw_name.strip().strip(",.;!?\"'()").split())
+    if raw_name.strip().endswith(":") or len(name) < MIN_ENTITY_CHARS:
+        return None  # "**Voyage:**" style labels are structure, not entities
+    if any(char.isdigit() for char in name) or ":" in name:
+        return None
+    words = name.split()
+    if len(words) > MAX_ENTITY_WORDS or not words[0][0].isupper():
+        return None
+    if not all(word[0].isupper() or word.lower() in NAME_CONNECTORS for word in words):
+        return None
+    return name
+
+
+def _entity_aliases(name: str, is_player_character: bool) -> List[str]:
+    """Derives short surface forms people actually say ("Jankor" for "King Jankor")."""
+    words = name.split()
+    aliases: List[str] = []
+    if len(words) > 1 and words[0].lower() in TITLE_WORDS:
+        aliases.append(" ".join(words[1:]))
+    if is_player_character and len(words) > 1:
+        aliases.append(words[0])  # PCs are addressed by first name ("Delphi")
+    return [alias for alias in aliases if len(alias) >= MIN_ENTITY_CHARS]
+
+
+def extract_entities(text: str, section_prefix: str, use_headings: bool) -> Dict[str, Set[str]]:
+    """
+    Extracts entity names from one Markdown/text file.
+
+    Entities are bold (`**Name**`) and italic (`*Name*`) proper-noun spans, plus headings
+    when use_headings is set. Each entity is labelled with the heading it appears under.
+
+    Args:
+        text (str): The file content.
+        section_prefix (str): Label for the file, prepended to heading names.
+        use_headings (bool): Whether headings themselves name entities.
+
+    Returns:
+        Dict[str, Set[str]]: Entity name -> section labels within this file.
+    """
+    entities: Dict[str, Set[str]] = {}
+    current_section = section_prefix
+    for line in text.splitlines():
+        heading_match = HEADING_PATTERN.match(line)
+        if heading_match:
+            heading = heading_match.group(2).strip("*_ ")
+            current_section = f"{section_prefix} > {heading}"
+            if use_headings:
+                heading_name = _clean_entity_name(heading)
+                if heading_name:
+                    entities.setdefault(heading_name, set()).add(current_section)
+            continue
+
+        for pattern in (BOLD_PATTERN, ITALIC_PATTERN):
+            for span_match in pattern.finditer(line):
+                name = _clean_entity_name(span_match.group(1))
+                if name:
+                    entities.setdefault(name, set()).add(current_section)
+    return entities
+
+
+def build_gazetteer(campaign_config_path: str) -> Optional[EntityGazetteer]:
+    """
+    Builds the entity gazetteer from the files named in a campaign config.
+
+    Args:
+        campaign_config_path (str): Path to the campaign JSON configuration file.
+
+    Returns:
+        Optional[EntityGazetteer]: The gazetteer, or None if the config could not be loaded.
+    """
+    config_data = load_campaign_config(campaign_config_path)
+    if config_data is None:
+        return None
+
+    entity_sections: Dict[str, Set[str]] = {}
+    aliases: Dict[str, str] = {}
+    for key, file_path_str in get_context_file_paths(config_data):
+        file_path = Path(file_path_str)
+        if not file_path.is_file():
+            logging.warning(f"Gazetteer source not found, skipping: {file_path}")
+            continue
+        file_entities = extract_entities(
+            file_path.read_text(encoding="utf-8"),
+            section_prefix=f"{key} ({file_path.name})",
+            use_headings=key in HEADING_ENTITY_KEYS,
+        )
+        for name, sections in file_entities.items():
+            entity_sections.setdefault(name, set()).update(sections)
+            is_player_character = any(PC_SECTION_MARKER in section.lower() for section in sections)
+            for alias in _entity_aliases(name, is_player_character):
+                aliases.setdefault(alias, name)
+
+    # An alias that is itself a full entity name refers to that entity, not the longer one
+    aliases = {alias: name for alias, name in aliases.items() if alias not in entity_sections}
+    return EntityGazetteer({name: sorted(sections) for name, sections in entity_sections.items()}, aliases)
+
+
+def format_entity_grounding(matches: List[EntityMatch]) -> str:
+    """
+    Formats matched entities as a Markdown block for the prompt.
+
+    Returns:
+        str: The block, or an empty string if nothing matched.
+    """
+    if not matches:
+        return ""
+    lines = ["**Referenced Campaign Entities:**"]
+    for entity_match in matches[:MAX_GROUNDING_ENTITIES]:
+        lines.append(f"*   {entity_match.name} (see: {'; '.join(entity_match.sections)})")
+    return "\n".join(lines) + "\n"
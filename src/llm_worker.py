@@ -0,0 +1,157 @@
+"""
+Background worker that sends prompts to the LLM without blocking the transcript loop.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class LLMRequestWorker:
+    """
+    Sends prompts to the LLM one at a time on a background thread.
+
+    Requests are serialized because a chat session's history must stay in order.
+    The number of queued plus in-flight requests is exposed as `pending_count`.
+    With a timeout, a prompt still queued when it expires is not sent, and a response
+    arriving after it is reported to `on_timeout` instead of `on_response`.
+
+    Each prompt is sent through a one-thread executor, so an exception from sending (network
+    error, blocked response) comes back as that request's result: it is logged and reported
+    to `on_failure`, and the worker goes on with the next prompt.
+    """
+
+    def __init__(self, send_fn: Callable[[str], Any], on_response: Callable[[str, Any, float], None],
+                 on_latency: Optional[Callable[[float], None]] = None, tracer: Optional[Any] = None,
+                 timeout: Optional[float] = None, on_timeout: Optional[Callable[[str, float, bool], None]] = None,
+                 name: str = "llm-worker", on_failure: Optional[Callable[[int, int, BaseException], None]] = None):
+        """
+        Args:
+            send_fn (Callable[[str], Any]): Sends one prompt and returns the response (e.g. `chat_session.send_message`).
+            on_response (Callable[[str, Any, float], None]): Called with (prompt, response, latency seconds) on the worker thread.
+            on_latency (Callable[[float], None], optional): Called with each request's round-trip time in seconds.
+            tracer (PipelineTracer, optional): Records the "llm" and "chunk_to_response" stages.
+            timeout (float, optional): Seconds from submission after which a prompt's answer is no longer wanted.
+            on_timeout (Callable[[str, float, bool], None], optional): Called with (prompt, age seconds, whether it
+                was sent) for each expired prompt.
+            name (str): Worker thread name.
+            on_failure (Callable[[int, int, BaseException], None], optional): Called on the worker thread with
+                (failures so far, prompts still queued, the exception) when a request fails.
+        """
+        self.send_fn = send_fn
+        self.on_response = on_response
+        self.on_latency = on_latency
+        self.tracer = tracer
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.on_failure = on_failure
+        self.name = name
+        self._requests: queue.Queue = queue.Queue()
+        self._in_flight = 0
+        self.requests_completed = 0
+        self.requests_expired = 0
+        self.failures = 0
+        self._sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-send")
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of prompts queued or currently being answered."""
+        return self._requests.qsize() + self._in_flight
+
+    @property
+    def in_flight(self) -> int:
+        """Number of prompts currently being answered."""
+        return self._in_flight
+
+    def start(self):
+        """Starts the worker thread."""
+        self.thread.start()
+        logging.info("LLM request worker started.")
+
+    def submit(self, prompt: str, chunk_emitted_at: Optional[float] = None):
+        """
+        Queues a prompt to be sent.
+
+        Args:
+            prompt (str): The formatted prompt.
+            chunk_emitted_at (float, optional): Tracer time the chunk was emitted, for end-to-end tracing.
+        """
+        self._requests.put((prompt, chunk_emitted_at, time.monotonic(), None))
+        logging.debug(f"LLM request queued ({self.pending_count} pending).")
+
+    def submit_prepared(self, prompt: str, answer: Future, chunk_emitted_at: Optional[float] = None):
+        """
+        Queues a prompt that was already sent ahead of time (speculatively).
+
+        Its answer is awaited in queue order instead of sending the prompt again, so
+        responses and chat history keep the order of the chunks.
+
+        Args:
+            prompt (str): The prompt that was sent.
+            answer (Future): Resolves to (response, commit), where commit() adds the exchange
+                to the chat history; it is called on the worker thread before `on_response`.
+            chunk_emitted_at (float, optional): Tracer time the chunk was emitted, for end-to-end tracing.
+        """
+        self._requests.put((prompt, chunk_emitted_at, time.monotonic(), answer))
+        logging.debug(f"Speculative LLM request queued ({self.pending_count} pending).")
+
+    def stop(self, timeout: float = 30.0):
+        """Lets queued prompts finish, then stops the worker thread."""
+        self._requests.put(None)
+        self.thread.join(timeout=timeout)
+        if self.thread.is_alive():
+            logging.warning(f"LLM request worker did not finish within {timeout}s ({self.pending_count} pending).")
+        self._sender.shutdown(wait=False)
+
+    def _expired(self, prompt: str, submitted_at: float, sent: bool) -> bool:
+        age = time.monotonic() - submitted_at
+        if self.timeout is None or age < self.timeout:
+            return False
+        self.requests_expired += 1
+        if self.on_timeout:
+            self.on_timeout(prompt, age, sent)
+        return True
+
+    def _run(self):
+        """Worker loop: send each queued prompt and report the response."""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            prompt, chunk_emitted_at, submitted_at, answer = request
+            if self._expired(prompt, submitted_at, sent=answer is not None):
+                continue
+            self._in_flight = 1
+            started_at = time.monotonic()
+            # A prepared answer is usually ready already: that is the latency saved
+            outcome = self._sender.submit(self.send_fn, prompt) if answer is None else answer
+            error = outcome.exception()
+            if error is not None:
+                self._in_flight = 0
+                self.failures += 1
+                logging.error(f"LLM request failed ({self.failures} failures, {self._requests.qsize()} queued): {error!r}",
+                              exc_info=error)
+                if self.on_failure:
+                    self.on_failure(self.failures, self._requests.qsize(), error)
+                continue
+            if answer is None:
+                response = outcome.result()
+            else:
+                response, commit = outcome.result()
+                commit()
+            latency = time.monotonic() - started_at
+            self._in_flight = 0
+            self.requests_completed += 1
+            logging.info(f"LLM response received in {latency:.2f}s ({self.pending_count} pending).")
+            if self.on_latency:
+                self.on_latency(latency)
+            if not self._expired(prompt, submitted_at, sent=True):
+                self.on_response(prompt, response, latency)
+            if self.tracer:
+                self.tracer.record("llm", latency)
+                if chunk_emitted_at is not None:
+                    self.tracer.record_since("chunk_to_response", chunk_emitted_at)
@@ -0,0 +1,214 @@
+"""
+Opt-in local HTTP endpoint exposing live pipeline health in Prometheus text format.
+
+Metrics are read when scraped: counters are incremented by the pipeline (or, for totals
+kept elsewhere, read from a callable like gauges), gauges are callables evaluated at
+scrape time, so nothing is computed when nobody is watching.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+
+METRICS_HOST = "127.0.0.1" # Local only
+METRICS_PATH = "/metrics"
+RATE_WINDOW_SECONDS = 10.0
+
+Labels = Tuple[Tuple[str, str], ...]
+GaugeValue = Union[float, Dict[Labels, float]]
+
+
+def _escape_label_value(value: str) -> str:
+    """Escapes a label value as the exposition format requires (backslash, quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_samples(name: str, value: GaugeValue) -> List[str]:
+    if not isinstance(value, dict):
+        return [f"{name} {float(value)}"]
+    lines = []
+    for labels, sample in value.items():
+        label_text = ",".join(f'{key}="{_escape_label_value(label_value)}"' for key, label_value in labels)
+        lines.append(f"{name}{{{label_text}}} {float(sample)}")
+    return lines
+
+
+class CounterMetric:
+    """Monotonic counter that also tracks its recent rate."""
+
+    def __init__(self):
+        self.value = 0
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        now = time.monotonic()
+        with self._lock:
+            self.value += amount
+            self._events.append((now, amount))
+            while self._events and now - self._events[0][0] > RATE_WINDOW_SECONDS:
+                self._events.popleft()
+
+    def rate(self) -> float:
+        """Increments per second over the last RATE_WINDOW_SECONDS."""
+        now = time.monotonic()
+        with self._lock:
+            return sum(amount for at, amount in self._events if now - at <= RATE_WINDOW_SECONDS) / RATE_WINDOW_SECONDS
+
+
+class MetricsRegistry:
+    """Named counters and gauges rendered in Prometheus exposition format."""
+
+    def __init__(self):
+        self._counters: Dict[str, Tuple[str, CounterMetric]] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], GaugeValue]]] = {}
+        self._counter_readers: Dict[str, Tuple[str, Callable[[], GaugeValue]]] = {}
+
+    def counter(self, name: str, help_text: str) -> CounterMetric:
+        """Creates (or returns) a counter. Exposed as `<name>_total`."""
+        if name not in self._counters:
+            self._counters[name] = (help_text, CounterMetric())
+        return self._counters[name][1]
+
+    def counter_reader(self, name: str, help_text: str, read_fn: Callable[[], GaugeValue]):
+        """
+        Registers a counter whose total is kept elsewhere and read at scrape time. Exposed as `<name>_total`.
+
+        Args:
+            name (str): Metric name, without the `_total` suffix.
+            help_text (str): HELP line.
+            read_fn (Callable): Returns a monotonically increasing number, or a dict of label tuples -> number.
+        """
+        self._counter_readers[name] = (help_text, read_fn)
+
+    def gauge(self, name: str, help_text: str, read_fn: Callable[[], GaugeValue]):
+        """
+        Registers a gauge read at scrape time.
+
+        Args:
+            name (str): Metric name.
+            help_text (str): HELP line.
+            read_fn (Callable): Returns a number, or a dict of label tuples -> number.
+        """
+        self._gauges[name] = (help_text, read_fn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, (help_text, counter) in self._counters.items():
+            lines += [f"# HELP {name}_total {help_text}", f"# TYPE {name}_total counter", f"{name}_total {counter.value}"]
+        for name, (help_text, read_fn) in self._counter_readers.items():
+            lines += [f"# HELP {name}_total {help_text}", f"# TYPE {name}_total counter"]
+            lines += _render_samples(f"{name}_total", read_fn())
+        for name, (help_text, read_fn) in self._gauges.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += _render_samples(name, read_fn())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves a MetricsRegistry over HTTP on a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = METRICS_HOST):
+        self.registry = registry
+        self.address = (host, port)
+        registry_ref = registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != METRICS_PATH:
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Scrapes would otherwise flood the console
+
+        self._server = ThreadingHTTPServer(self.address, MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logging.info(f"Metrics endpoint serving at http://{self.address[0]}:{self.address[1]}{METRICS_PATH}")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def stage_latency_gauge(tracer) -> Callable[[], Dict[Labels, float]]:
+    """Gauge reading every traced stage's latency percentiles from a PipelineTracer.
+
+    The label is `percentile` ("50", "95", ...), not `quantile`, which Prometheus reserves for summaries.
+    """
+    def read() -> Dict[Labels, float]:
+        samples: Dict[Labels, float] = {}
+        for stage, summary in tracer.snapshot().items():
+            for key, value in summary.items():
+                if key.startswith("p"):
+                    samples[(("stage", stage), ("percentile", key[1:]))] = value
+        return samples
+    return read
+
+
+def per_client_gauge(clients: List, read_fn: Callable) -> Callable[[], Dict[Labels, float]]:
+    """Gauge reading one value per transcription Client, labelled by server and uid."""
+    def read() -> Dict[Labels, float]:
+        return {(("server", client.server_url), ("uid", client.uid)): read_fn(client) for client in clients}
+    return read
+
+
+def build_pipeline_metrics(registry: MetricsRegistry, transcript_queue, accumulator, clients: List,
+                           tracer, llm_worker: Optional[object] = None) -> Tuple[CounterMetric, CounterMetric]:
+    """
+    Registers the standard pipeline counters and gauges.
+
+    Args:
+        registry (MetricsRegistry): Registry to add to.
+        transcript_queue (queue.Queue): Client -> main loop segment queue.
+        accumulator (TranscriptAccumulator): The session's accumulator.
+        clients (List[Client]): Transcription clients.
+        tracer (PipelineTracer): Source of stage latency percentiles.
+        llm_worker (LLMRequestWorker, optional): Source of LLM in-flight/pending counts.
+
+    Returns:
+        Tuple[CounterMetric, CounterMetric]: The (segment updates received, chunks emitted) counters,
+            incremented by the main loop.
+    """
+    segments_received = registry.counter("dms_segment_updates", "Segment lists received from the transcription client.")
+    chunks_emitted = registry.counter("dms_chunks_emitted", "Transcript chunks emitted by the accumulator.")
+    registry.gauge("dms_segment_updates_per_second", f"Segment lists received per second over the last {RATE_WINDOW_SECONDS:.0f}s.",
+                   segments_received.rate)
+    registry.gauge("dms_transcript_queue_depth", "Segment lists waiting for the main loop.", transcript_queue.qsize)
+    registry.gauge("dms_accumulator_buffer_words", "Words buffered in the transcript accumulator.",
+                   lambda: len(accumulator.buffer.split()))
+    registry.gauge("dms_accumulator_min_words", "Current min_words chunk threshold.", lambda: accumulator.min_words)
+    registry.gauge("dms_llm_requests_in_flight", "LLM requests currently awaiting a response.",
+                   lambda: llm_worker.in_flight if llm_worker else 0)
+    registry.gauge("dms_llm_requests_pending", "LLM requests queued or in flight.",
+                   lambda: llm_worker.pending_count if llm_worker else 0)
+    registry.gauge("dms_stage_latency_seconds", "Per-stage latency percentiles.", stage_latency_gauge(tracer))
+    registry.counter_reader("dms_client_sent_bytes", "Audio bytes sent per transcription client.",
+                   per_client_gauge(clients, lambda client: client.bytes_sent))
+    registry.gauge("dms_client_send_bytes_per_second", "Average audio bytes sent per second per transcription client.",
+                   per_client_gauge(clients, lambda client: client.send_bytes_per_second))
+    registry.counter_reader("dms_client_send_errors", "Websocket send errors per transcription client.",
+                   per_client_gauge(clients, lambda client: client.send_errors))
+    registry.gauge("dms_client_connected", "1 while the transcription client's websocket is connected.",
+                   per_client_gauge(clients, lambda client: int(client.connected)))
+    registry.gauge("dms_client_server_latency_seconds", "Smoothed segment latency per transcription server.",
+                   per_client_gauge(clients, lambda client: client.server_latency or 0.0))
+    registry.counter_reader("dms_client_reconnects", "Successful reconnections per transcription client.",
+                   per_client_gauge(clients, lambda client: client.reconnect_stats.reconnects))
+    registry.gauge("dms_client_transcription_lag_seconds",
+                   "Audio sent minus audio transcribed; grows when the server falls behind real time.",
+                   per_client_gauge(clients, lambda client: client.audio_seconds_sent - client.last_segment_end))
+    return segments_received, chunks_emitted
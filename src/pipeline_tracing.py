@@ -0,0 +1,137 @@
+"""
+Lightweight per-stage latency tracing for the audio-to-suggestion pipeline.
+
+Durations are recorded with monotonic clocks into fixed log-scale histograms, so
+recording is a bucket increment under a lock and cheap enough to leave on.
+Stages:
+
+    audio_send      time to hand one audio packet to all websockets (client)
+    server          packet send -> segment covering that audio received (client)
+    decode          JSON decoding of one server message (client)
+    queue_wait      segment list put on the output queue -> taken by the main loop
+    accumulate      filtering, correction and TranscriptAccumulator.add_segments
+    receipt_to_chunk  segment receipt -> chunk emitted containing it
+    prompt_format   gazetteer match and prompt formatting
+    llm             LLM round trip
+    chunk_to_response chunk emitted -> LLM response handled
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# Bucket upper bounds in seconds: 100us .. ~100s, 4 buckets per decade
+HISTOGRAM_BOUNDS = [1e-4 * 10 ** (i / 4) for i in range(25)]
+REPORTED_PERCENTILES = (50, 90, 99)
+MAX_PENDING_STAMPS = 1024 # Unmatched queue stamps kept before the oldest are discarded
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Approximate percentile: the upper bound of the bucket containing it."""
+        if not self.count:
+            return 0.0
+        target = self.count * percent / 100.0
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return HISTOGRAM_BOUNDS[index] if index < len(HISTOGRAM_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        summary = {"count": self.count, "mean": self.total / self.count if self.count else 0.0, "max": self.max}
+        for percent in REPORTED_PERCENTILES:
+            summary[f"p{percent}"] = self.percentile(percent)
+        return summary
+
+
+class PipelineTracer:
+    """Collects stage durations from all pipeline threads."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._stamps: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> float:
+        """The clock all spans use."""
+        return time.perf_counter()
+
+    def record(self, stage: str, seconds: float):
+        """Records one duration for a stage."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def record_since(self, stage: str, started_at: float):
+        """Records the time elapsed since `started_at` (a `now()` value)."""
+        self.record(stage, self.now() - started_at)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Times the enclosed block as one sample of `stage`."""
+        started_at = self.now()
+        yield
+        self.record_since(stage, started_at)
+
+    def stamp(self, item: Any):
+        """Marks the time an object (e.g. a segment list) was handed to another thread."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._stamps) >= MAX_PENDING_STAMPS:
+                self._stamps.pop(next(iter(self._stamps)))
+            self._stamps[id(item)] = self.now()
+
+    def take_stamp(self, item: Any) -> Optional[float]:
+        """Returns and forgets the time `item` was stamped, or None if it wasn't."""
+        with self._lock:
+            return self._stamps.pop(id(item), None)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage summaries (count, mean, max, percentiles) in seconds, for live queries."""
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def log_summary(self):
+        """Logs one line per stage with count and latency percentiles in milliseconds."""
+        for stage, summary in sorted(self.snapshot().items()):
+            percentiles = " ".join(f"p{p}={summary[f'p{p}'] * 1000:.1f}ms" for p in REPORTED_PERCENTILES)
+            logging.info(f"Trace [{stage}]: n={summary['count']} mean={summary['mean'] * 1000:.1f}ms {percentiles} max={summary['max'] * 1000:.1f}ms")
+
+    def dump(self, path: Path):
+        """Writes the per-stage summaries and raw bucket counts as JSON."""
+        with self._lock:
+            data = {
+                "bucket_bounds_seconds": HISTOGRAM_BOUNDS,
+                "stages": {stage: dict(histogram.summary(), buckets=histogram.counts) for stage, histogram in self.histograms.items()},
+            }
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        logging.info(f"Pipeline trace summary written to {path}")
@@ -0,0 +1,169 @@
+"""
+Fan-out of each chunk to several specialized prompts, answered concurrently.
+
+The single assistant prompt asks for descriptions, items, loot and NPC dialogue in one
+long generation, so nothing is shown until all of it is done. Here each category has a
+short template of its own (prompts/specialized/<category>.md), its own chat session
+primed with the campaign context (so each history stays in order) and its own
+`LLMRequestWorker`. The categories run in parallel and each answer is rendered as soon
+as it arrives. Each category has a timeout: a prompt still queued when it expires is not
+sent, and an answer arriving after it is dropped rather than shown out of date.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from llm_worker import LLMRequestWorker
+
+DEFAULT_CATEGORY_TIMEOUT_SECONDS = 15.0
+
+
+def load_specialized_templates(directory: Path) -> Dict[str, str]:
+    """
+    Loads the specialized prompt templates.
+
+    Args:
+        directory (Path): Directory of `<category>.md` templates using the same
+            placeholders as the main template.
+
+    Returns:
+        Dict[str, str]: Category (file stem) -> template, in file name order; empty if none were found.
+    """
+    templates = {path.stem: path.read_text(encoding="utf-8") for path in sorted(directory.glob("*.md"))}
+    if not templates:
+        logging.error(f"No specialized prompt templates found in {directory}")
+    else:
+        logging.info(f"Specialized prompts loaded: {', '.join(templates)}")
+    return templates
+
+
+class PromptFanOut:
+    """Sends every chunk to all specialized prompts in parallel and reports each answer as it arrives."""
+
+    def __init__(self, templates: Dict[str, str], start_chat: Callable[[], Any],
+                 on_response: Callable[[str, Any, float], None], timeouts: Dict[str, float],
+                 default_timeout: float = DEFAULT_CATEGORY_TIMEOUT_SECONDS,
+                 on_latency: Optional[Callable[[float], None]] = None, tracer: Optional[Any] = None):
+        """
+        Args:
+            templates (Dict[str, str]): Category -> prompt template (see `load_specialized_templates`).
+            start_chat (Callable[[], Any]): Starts a chat session primed with the campaign context; called once per category.
+            on_response (Callable[[str, Any, float], None]): Called with (category, response, latency seconds)
+                for each answer that arrives in time, on that category's worker thread.
+            timeouts (Dict[str, float]): Seconds per category; categories not listed use `default_timeout`.
+            default_timeout (float): Timeout of unlisted categories.
+            on_latency (Callable[[float], None], optional): Called with the time from submission to the
+                first answer of each chunk (what the DM waits for).
+            tracer (PipelineTracer, optional): Records per-request stages and "first_suggestion".
+        """
+        self.templates = templates
+        self.on_response = on_response
+        self.on_latency = on_latency
+        self.tracer = tracer
+        self.timeouts = {category: timeouts.get(category, default_timeout) for category in templates}
+        self.workers = {
+            category: LLMRequestWorker(
+                start_chat().send_message,
+                on_response=partial(self._handle_response, category),
+                tracer=tracer,
+                timeout=self.timeouts[category],
+                on_timeout=partial(self._handle_timeout, category),
+                name=f"llm-{category}",
+            )
+            for category in templates
+        }
+        self.answered = {category: 0 for category in templates}
+        self.timed_out = {category: 0 for category in templates}
+        self.latencies: Dict[str, List[float]] = {category: [] for category in templates}
+        self.first_response_latencies: List[float] = []
+        self.chunks_submitted = 0
+        self._submissions: Dict[str, Tuple[int, float]] = {} # Prompt -> (chunk number, submitted at)
+        self._answered_chunks = set()
+        self._lock = threading.Lock()
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self.templates)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of prompts currently being answered, over all categories."""
+        return sum(worker.in_flight for worker in self.workers.values())
+
+    @property
+    def pending_count(self) -> int:
+        """Backlog of the slowest category (each category answers every chunk)."""
+        return max(worker.pending_count for worker in self.workers.values())
+
+    def start(self):
+        for worker in self.workers.values():
+            worker.start()
+
+    def submit(self, fields: Dict[str, str], chunk_emitted_at: Optional[float] = None):
+        """
+        Formats every specialized template with `fields` and queues it on its category's worker.
+
+        Args:
+            fields (Dict[str, str]): Template placeholders (chunk, referenced entities).
+            chunk_emitted_at (float, optional): Tracer time the chunk was emitted, for end-to-end tracing.
+        """
+        with self._lock:
+            self.chunks_submitted += 1
+            chunk_number = self.chunks_submitted
+        for category, template in self.templates.items():
+            prompt = template.format(**fields)
+            with self._lock:
+                self._submissions[prompt] = (chunk_number, time.monotonic())
+            self.workers[category].submit(prompt, chunk_emitted_at)
+
+    def _handle_response(self, category: str, prompt: str, response: Any, latency: float):
+        with self._lock:
+            chunk_number, submitted_at = self._submissions.pop(prompt, (None, None))
+            first = chunk_number is not None and chunk_number not in self._answered_chunks
+            if first:
+                self._answered_chunks.add(chunk_number)
+            self.answered[category] += 1
+            self.latencies[category].append(latency)
+        if first:
+            waited = time.monotonic() - submitted_at
+            self.first_response_latencies.append(waited)
+            if self.on_latency:
+                self.on_latency(waited)
+            if self.tracer:
+                self.tracer.record("first_suggestion", waited)
+        self.on_response(category, response, latency)
+
+    def _handle_timeout(self, category: str, prompt: str, age: float, sent: bool):
+        with self._lock:
+            self._submissions.pop(prompt, None)
+            self.timed_out[category] += 1
+        outcome = "answer dropped" if sent else "not sent"
+        logging.info(f"{category} suggestion timed out after {age:.1f}s "
+                     f"(limit {self.timeouts[category]:.0f}s, {outcome}).")
+
+    def stop(self, timeout: float = 30.0):
+        """Lets queued prompts finish (or expire), then stops all workers."""
+        for worker in self.workers.values():
+            worker.stop(timeout)
+
+    def statistics(self) -> Dict[str, Any]:
+        """Answers, timeouts and median latency per category, and the median wait for a chunk's first answer."""
+        return {
+            "chunks": self.chunks_submitted,
+            "first_suggestion_median_seconds": round(statistics.median(self.first_response_latencies), 2)
+            if self.first_response_latencies else None,
+            "categories": {
+                category: {
+                    "answered": self.answered[category],
+                    "timed_out": self.timed_out[category],
+                    "median_seconds": round(statistics.median(self.latencies[category]), 2)
+                    if self.latencies[category] else None,
+                }
+                for category in self.templates
+            },
+        }
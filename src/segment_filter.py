@@ -0,0 +1,168 @@
+"""
+Drops Whisper hallucinations (filler on silence or music, looped repetitions) from
+transcript segments before they reach the TranscriptAccumulator.
+"""
+
+import logging
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+# --- Filter Settings ---
+# Known Whisper artifacts from silence/music; nobody at the table says these (compared after normalization)
+HALLUCINATION_BLOCKLIST = {
+    "thanks for watching", "thank you for watching", "please subscribe", "like and subscribe",
+    "subtitles by the amara org community", "music", "applause",
+}
+# Short lines Whisper also invents on silence, but that a DM or NPC says too: dropped only when the
+# segment looks like silence (see FILLER_NO_SPEECH_PROB_THRESHOLD and FILLER_MIN_SECONDS_PER_WORD)
+SILENCE_FILLER_PHRASES = {
+    "you", "thank you", "thank you very much", "thanks", "bye", "so", "okay", "oh", "hmm", "um", "uh",
+}
+FILLER_NO_SPEECH_PROB_THRESHOLD = 0.3 # A filler phrase with at least this `no_speech_prob` is dropped
+FILLER_MIN_SECONDS_PER_WORD = 1.0     # ...as is one stretched over silence (a spoken "Okay." takes well under 1s)
+NGRAM_SIZE = 3
+REPETITION_WINDOW_SEGMENTS = 8   # Recent accepted segments compared against
+MAX_NGRAM_OVERLAP = 0.6          # Drop a segment if this fraction of its n-grams appeared in the window
+MIN_UNIQUE_NGRAM_RATIO = 0.5     # Drop a segment repeating itself ("the same sentence five times")
+MIN_NGRAMS_FOR_SELF_REPETITION = 6
+MIN_LETTERS = 2                  # Segments with fewer letters carry no information
+NO_SPEECH_PROB_THRESHOLD: Optional[float] = 0.6 # Used only if the server sends `no_speech_prob`; None disables
+MAX_REMEMBERED_DROPS = 256       # Dropped segment keys kept so server re-sends stay dropped
+
+NORMALIZE_PATTERN = re.compile(r"[^a-z0-9' ]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercases and strips punctuation so "Thank you." and "thank you" compare equal."""
+    return " ".join(NORMALIZE_PATTERN.sub(" ", text.lower()).split())
+
+
+def _ngrams(words: List[str], size: int) -> List[Tuple[str, ...]]:
+    return [tuple(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class HallucinationFilter:
+    """
+    Filters low-information and repeated completed segments.
+
+    The server re-sends its recent segment list with every update, so each completed
+    segment is judged once (by end time) and the verdict is remembered.
+    """
+
+    def __init__(self, blocklist: Optional[Set[str]] = None, no_speech_prob_threshold: Optional[float] = NO_SPEECH_PROB_THRESHOLD,
+                 silence_fillers: Optional[Set[str]] = None):
+        """
+        Args:
+            blocklist (Set[str], optional): Known hallucinated phrases, always dropped. Defaults to HALLUCINATION_BLOCKLIST.
+            no_speech_prob_threshold (float, optional): Drop segments whose `no_speech_prob` exceeds this.
+            silence_fillers (Set[str], optional): Phrases dropped only when their segment looks like
+                silence. Defaults to SILENCE_FILLER_PHRASES.
+        """
+        self.blocklist = {_normalize(phrase) for phrase in (blocklist or HALLUCINATION_BLOCKLIST)}
+        self.silence_fillers = {_normalize(phrase) for phrase in (silence_fillers or SILENCE_FILLER_PHRASES)}
+        self.no_speech_prob_threshold = no_speech_prob_threshold
+        self._recent_texts: Deque[str] = deque(maxlen=REPETITION_WINDOW_SEGMENTS)
+        self._recent_ngrams: Deque[Set[Tuple[str, ...]]] = deque(maxlen=REPETITION_WINDOW_SEGMENTS)
+        self._dropped_keys: Set[Tuple[str, str]] = set()
+        self._dropped_order: Deque[Tuple[str, str]] = deque()
+        self._last_judged_end = 0.0
+        self._dropped_words_pending = 0
+        self.segments_judged = 0
+        self.dropped_by_reason: Dict[str, int] = {}
+        self.dropped_words = 0
+        self.prevented_llm_calls = 0
+
+    def _drop_reason(self, seg: Dict[str, Any]) -> Optional[str]:
+        """Returns why a completed segment should be dropped, or None to keep it."""
+        text = _normalize(seg.get("text", ""))
+        if sum(char.isalpha() for char in text) < MIN_LETTERS:
+            return "low_information"
+        if text in self.blocklist:
+            return "blocklist"
+        if text in self.silence_fillers and self._looks_like_silence(seg, len(text.split())):
+            return "silence_filler"
+        no_speech_prob = seg.get("no_speech_prob")
+        if self.no_speech_prob_threshold is not None and no_speech_prob is not None and float(no_speech_prob) > self.no_speech_prob_threshold:
+            return "no_speech_prob"
+        if text in self._recent_texts:
+            return "repeated_segment"
+
+        ngrams = _ngrams(text.split(), NGRAM_SIZE)
+        if len(ngrams) >= MIN_NGRAMS_FOR_SELF_REPETITION and len(set(ngrams)) / len(ngrams) < MIN_UNIQUE_NGRAM_RATIO:
+            return "self_repetition"
+        if ngrams:
+            seen = set().union(*self._recent_ngrams) if self._recent_ngrams else set()
+            if sum(ngram in seen for ngram in ngrams) / len(ngrams) > MAX_NGRAM_OVERLAP:
+                return "repeated_ngrams"
+        return None
+
+    def _looks_like_silence(self, seg: Dict[str, Any], word_count: int) -> bool:
+        """True if the server thinks a segment may be silence, or its few words are spread over silence."""
+        no_speech_prob = seg.get("no_speech_prob")
+        if no_speech_prob is not None and float(no_speech_prob) >= FILLER_NO_SPEECH_PROB_THRESHOLD:
+            return True
+        duration = float(seg.get("end", 0.0)) - float(seg.get("start", 0.0))
+        return duration >= FILLER_MIN_SECONDS_PER_WORD * max(word_count, 1)
+
+    def _remember_drop(self, key: Tuple[str, str]):
+        self._dropped_keys.add(key)
+        self._dropped_order.append(key)
+        if len(self._dropped_order) > MAX_REMEMBERED_DROPS:
+            self._dropped_keys.discard(self._dropped_order.popleft())
+
+    def filter_segments(self, segments: List[Dict[str, Any]], words_per_chunk: int) -> List[Dict[str, Any]]:
+        """
+        Removes hallucinated completed segments from a segment list.
+
+        Non-completed segments pass through untouched; they are re-judged once completed.
+
+        Args:
+            segments (List[Dict[str, Any]]): Segment dicts as produced by Client.process_segments.
+            words_per_chunk (int): The accumulator's current `min_words`, used to estimate
+                how many LLM calls the dropped text would have triggered.
+
+        Returns:
+            List[Dict[str, Any]]: The segments to pass on.
+        """
+        kept = []
+        for seg in segments:
+            if not seg.get("completed", False):
+                kept.append(seg)
+                continue
+            key = (str(seg.get("start")), str(seg.get("end")))
+            end_time = float(seg.get("end", 0.0))
+            if end_time <= self._last_judged_end:
+                if key not in self._dropped_keys:
+                    kept.append(seg)
+                continue
+
+            self._last_judged_end = end_time
+            self.segments_judged += 1
+            reason = self._drop_reason(seg)
+            if reason is None:
+                text = _normalize(seg.get("text", ""))
+                self._recent_texts.append(text)
+                self._recent_ngrams.append(set(_ngrams(text.split(), NGRAM_SIZE)))
+                kept.append(seg)
+                continue
+
+            self._remember_drop(key)
+            self.dropped_by_reason[reason] = self.dropped_by_reason.get(reason, 0) + 1
+            word_count = len(seg.get("text", "").split())
+            self.dropped_words += word_count
+            self._dropped_words_pending += word_count
+            # Shadow accounting: each min_words of dropped text would have filled one chunk / LLM call
+            while words_per_chunk > 0 and self._dropped_words_pending >= words_per_chunk:
+                self._dropped_words_pending -= words_per_chunk
+                self.prevented_llm_calls += 1
+            logging.debug(f"HallucinationFilter: Dropped segment ({reason}): '{seg.get('text', '')[:50]}'")
+        return kept
+
+    def log_statistics(self):
+        """Logs how many segments were dropped, why, and the LLM calls this saved."""
+        total_dropped = sum(self.dropped_by_reason.values())
+        logging.info(
+            f"HallucinationFilter: {total_dropped}/{self.segments_judged} completed segments dropped "
+            f"({self.dropped_words} words, ~{self.prevented_llm_calls} LLM calls prevented). Reasons: {self.dropped_by_reason}"
+        )
@@ -0,0 +1,166 @@
+"""
+Periodic session checkpoints, so a crashed or restarted session resumes in well under a second.
+
+A checkpoint holds what is slow or impossible to rebuild: the accumulator state, the
+chat history after the context priming turns (compacted to the most recent turns), the
+transcript offset reached, a fingerprint of the campaign context and the audio source
+(the input file, or live capture). A checkpoint is only resumed by a session with the
+same campaign context and audio source, so a different recording never inherits another
+session's buffer, chat or seek offset. The combined
+context text is cached next to it, so a resume with an unchanged campaign skips reading
+and combining the context files. Checkpoints are written atomically and removed when a
+session ends normally.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from context_loader import get_context_file_paths, load_campaign_config
+
+CHECKPOINT_INTERVAL_SECONDS = 30.0
+CHECKPOINT_MAX_AGE_SECONDS = 6 * 3600 # Older checkpoints belong to a finished game night, not a restart
+MAX_CHECKPOINT_HISTORY_TURNS = 20     # Chat turns kept after the priming turns (10 exchanges)
+PRIMING_TURNS = 2                     # Context turn + acknowledgement at the start of every chat
+LIVE_AUDIO_SOURCE = "live"
+
+
+def context_fingerprint(campaign_config_path: str) -> str:
+    """
+    Fingerprints the campaign context by the size and modification time of its files.
+
+    Stat calls only, so it is cheap enough to run on every start.
+    """
+    config_data = load_campaign_config(campaign_config_path) or {}
+    paths = [campaign_config_path, config_data.get("preamble_file")]
+    paths += [file_path for _, file_path in get_context_file_paths(config_data)]
+    digest = hashlib.sha256()
+    for file_path in paths:
+        if not file_path:
+            continue
+        path = Path(file_path)
+        if path.is_file():
+            stat = path.stat()
+            digest.update(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+        else:
+            digest.update(f"{file_path}:missing\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def audio_source_fingerprint(input_audio_file: Optional[str]) -> str:
+    """Identifies a session's audio: "live", or the input file by path, size and modification time."""
+    if not input_audio_file:
+        return LIVE_AUDIO_SOURCE
+    path = Path(input_audio_file)
+    if not path.is_file():
+        return f"{path.resolve()}:missing"
+    stat = path.stat()
+    return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def compact_history(history: List[Any], max_turns: int = MAX_CHECKPOINT_HISTORY_TURNS) -> List[Dict[str, str]]:
+    """Chat history after the priming turns, newest `max_turns` only, as plain role/text pairs."""
+    turns = history[PRIMING_TURNS:]
+    turns = turns[len(turns) - max_turns:] if len(turns) > max_turns else turns
+    return [{"role": content.role, "text": "".join(part.text for part in content.parts)} for content in turns]
+
+
+def restore_history(turns: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Turns saved by `compact_history` in the form `start_chat(history=...)` accepts."""
+    return [{"role": turn["role"], "parts": [turn["text"]]} for turn in turns]
+
+
+def _write_atomically(path: Path, text: str):
+    temporary_path = path.with_name(path.name + ".tmp")
+    temporary_path.write_text(text, encoding="utf-8")
+    os.replace(temporary_path, path)
+
+
+class SessionCheckpointer:
+    """Saves and loads the checkpoint of one campaign's running session."""
+
+    def __init__(self, log_directory: Path, campaign_config_path: str, input_audio_file: Optional[str] = None,
+                 interval: float = CHECKPOINT_INTERVAL_SECONDS):
+        """
+        Args:
+            log_directory (Path): Directory the checkpoint files are written to.
+            campaign_config_path (str): Campaign config; one checkpoint is kept per campaign.
+            input_audio_file (str, optional): The session's input file; None for live capture.
+            interval (float): Seconds between periodic checkpoints.
+        """
+        log_directory.mkdir(exist_ok=True)
+        stem = Path(campaign_config_path).stem
+        self.path = log_directory / f"checkpoint_{stem}.json"
+        self.context_path = log_directory / f"checkpoint_{stem}.context.txt"
+        self.fingerprint = context_fingerprint(campaign_config_path)
+        self.audio_source = audio_source_fingerprint(input_audio_file)
+        self.interval = interval
+        self.saves = 0
+        self._last_saved_at = time.monotonic()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads the checkpoint if it can be resumed.
+
+        Returns:
+            Optional[Dict[str, Any]]: The checkpoint (with the cached context under "context"), or None
+                if there is none, it is too old, the campaign context has changed since, or it was
+                written for a different audio source.
+        """
+        if not self.path.is_file() or not self.context_path.is_file():
+            return None
+        checkpoint = json.loads(self.path.read_text(encoding="utf-8"))
+        age = time.time() - checkpoint["saved_at"]
+        if checkpoint["fingerprint"] != self.fingerprint:
+            logging.info("Checkpoint ignored: campaign context changed since it was written.")
+            return None
+        if checkpoint.get("audio_source") != self.audio_source:
+            logging.info(f"Checkpoint ignored: written for audio source {checkpoint.get('audio_source')}, "
+                         f"not {self.audio_source}.")
+            return None
+        if age > CHECKPOINT_MAX_AGE_SECONDS:
+            logging.info(f"Checkpoint ignored: {age / 3600:.1f} hours old.")
+            return None
+        checkpoint["context"] = self.context_path.read_text(encoding="utf-8")
+        checkpoint["age_seconds"] = age
+        return checkpoint
+
+    def save_context(self, context: str):
+        """Caches the combined context for resumes (once per session)."""
+        _write_atomically(self.context_path, context)
+
+    def due(self) -> bool:
+        """Whether the next periodic checkpoint should be written."""
+        return time.monotonic() - self._last_saved_at >= self.interval
+
+    def save(self, session_id: str, accumulator_state: Dict[str, Any], chat_history: List[Any], transcript_offset: float):
+        """
+        Writes a checkpoint.
+
+        Args:
+            session_id (str): Id of the session that wrote it (the run timestamp).
+            accumulator_state (Dict[str, Any]): From `TranscriptAccumulator.checkpoint_state`.
+            chat_history (List[Any]): The chat session's full history (compacted here).
+            transcript_offset (float): Seconds of audio whose transcript has been accumulated.
+        """
+        checkpoint = {
+            "session_id": session_id,
+            "saved_at": time.time(),
+            "fingerprint": self.fingerprint,
+            "audio_source": self.audio_source,
+            "transcript_offset": transcript_offset,
+            "accumulator": accumulator_state,
+            "chat_history": compact_history(chat_history),
+        }
+        _write_atomically(self.path, json.dumps(checkpoint, ensure_ascii=False))
+        self.saves += 1
+        self._last_saved_at = time.monotonic()
+
+    def clear(self):
+        """Removes the checkpoint once a session has ended normally."""
+        self.path.unlink(missing_ok=True)
+        self.context_path.unlink(missing_ok=True)
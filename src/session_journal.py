@@ -0,0 +1,105 @@
+"""
+Append-only structured session journal (JSON Lines) written by a background thread.
+
+Callers enqueue records through a `logging.handlers.QueueHandler`, so the processing
+loop never waits on file I/O or JSON encoding. Large payloads that repeat across
+records (the prompt template, the campaign context) are passed as "blobs": each
+distinct blob is written once as a BLOB record and later records refer to it by hash.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+JOURNAL_COMPRESS = False # Write .jsonl.gz instead of .jsonl
+BLOB_HASH_LENGTH = 16    # Hex digits of the SHA-256 kept as the blob reference
+
+
+class JournalFileHandler(logging.Handler):
+    """Serializes journal records to a JSONL file. Runs on the QueueListener thread."""
+
+    def __init__(self, path: Path, compress: bool = JOURNAL_COMPRESS):
+        super().__init__(level=logging.DEBUG)
+        self.path = path
+        if compress:
+            self._file = gzip.open(path, "at", encoding="utf-8")
+        else:
+            self._file = open(path, "a", encoding="utf-8")
+        self._stored_blobs = set()
+
+    def _write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def emit(self, record: logging.LogRecord):
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "event": getattr(record, "event", record.getMessage()),
+        }
+        for field, text in getattr(record, "blobs", {}).items():
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:BLOB_HASH_LENGTH]
+            if digest not in self._stored_blobs:
+                self._stored_blobs.add(digest)
+                self._write({"ts": entry["ts"], "level": "INFO", "event": "BLOB", "hash": digest, "field": field, "text": text})
+            entry[f"{field}_ref"] = digest
+        entry.update(getattr(record, "fields", {}))
+        self._write(entry)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class SessionJournal:
+    """Non-blocking writer for one session's structured journal."""
+
+    def __init__(self, path: Path, compress: bool = JOURNAL_COMPRESS):
+        """
+        Args:
+            path (Path): Journal file to append to.
+            compress (bool): Whether the file is gzip-compressed.
+        """
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._logger = logging.getLogger(f"session_journal.{path.name}")
+        self._logger.setLevel(logging.DEBUG)
+        self._logger.propagate = False # Keep separate from console
+        self._logger.addHandler(QueueHandler(self._queue))
+        self._handler = JournalFileHandler(path, compress)
+        self._listener = QueueListener(self._queue, self._handler)
+        self._listener.start()
+
+    def log(self, event: str, level: int = logging.INFO, blobs: Optional[Dict[str, str]] = None, **fields: Any):
+        """
+        Queues one journal record.
+
+        Args:
+            event (str): Event name, e.g. "TRANSCRIPT_SEGMENT".
+            level (int): Logging level recorded with the event.
+            blobs (Dict[str, str], optional): Large repeated text fields, stored once and referenced by hash.
+            **fields: JSON-serializable event data. Serialized later on the writer thread, so
+                values must not be mutated after logging.
+        """
+        self._logger.log(level, event, extra={"event": event, "fields": fields, "blobs": blobs or {}})
+
+    def close(self):
+        """Writes all queued records and closes the file."""
+        self._listener.stop()
+        self._handler.close()
+
+
+def setup_session_journal(log_directory: Path, timestamp: str, compress: bool = JOURNAL_COMPRESS) -> SessionJournal:
+    """Creates the journal for a run under `log_directory`."""
+    log_directory.mkdir(exist_ok=True)
+    suffix = ".jsonl.gz" if compress else ".jsonl"
+    journal = SessionJournal(log_directory / f"session_{timestamp}{suffix}", compress)
+    logging.info(f"Session journal will be saved to: {journal.path}")
+    return journal
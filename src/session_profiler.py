@@ -0,0 +1,136 @@
+"""
+Opt-in sampling profiler for a whole assistant session.
+
+A background thread samples the stacks of every other thread (main loop, audio
+sender, websocket receiver, LLM worker) at a fixed interval, so nothing in the
+pipeline has to be instrumented and overhead stays flat. `tracemalloc` snapshots
+are taken periodically. Output goes to logs/profile_<timestamp>/:
+
+    stacks.collapsed      one "thread;outer;...;inner count" line per stack (flamegraph.pl / speedscope)
+    memory_<n>.snapshot   tracemalloc snapshots (load with tracemalloc.Snapshot.load)
+    summary.txt           top-N functions by self and total samples, and top allocation sites
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+PROFILE_ENV_VAR = "DMS_PROFILE" # Set to 1 to profile the session
+SAMPLE_INTERVAL_SECONDS = 0.01
+MEMORY_SNAPSHOT_INTERVAL_SECONDS = 60.0
+TRACEMALLOC_FRAMES = 5
+TOP_N = 20
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SessionProfiler:
+    """Samples all thread stacks and takes periodic memory snapshots until stopped."""
+
+    def __init__(self, output_directory: Path, sample_interval: float = SAMPLE_INTERVAL_SECONDS,
+                 memory_interval: float = MEMORY_SNAPSHOT_INTERVAL_SECONDS, top_n: int = TOP_N):
+        """
+        Args:
+            output_directory (Path): Directory profiles are written to (created if missing).
+            sample_interval (float): Seconds between stack samples.
+            memory_interval (float): Seconds between tracemalloc snapshots.
+            top_n (int): Entries per table in the shutdown summary.
+        """
+        self.output_directory = output_directory
+        self.sample_interval = sample_interval
+        self.memory_interval = memory_interval
+        self.top_n = top_n
+        self.stacks: Counter = Counter()
+        self.self_samples: Counter = Counter()
+        self.total_samples: Counter = Counter()
+        self.sample_count = 0
+        self.snapshot_count = 0
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-profiler", daemon=True)
+
+    def start(self):
+        self.output_directory.mkdir(parents=True, exist_ok=True)
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._started_at = time.monotonic()
+        self._thread.start()
+        logging.info(f"Session profiling enabled; writing to {self.output_directory}")
+
+    def _sample(self):
+        """Adds one sample of every thread's current stack."""
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._thread.ident:
+                continue
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.reverse()
+            thread_name = thread_names.get(thread_id, str(thread_id))
+            self.stacks[";".join([thread_name] + labels)] += 1
+            if labels:
+                self.self_samples[labels[-1]] += 1
+            for label in set(labels):
+                self.total_samples[label] += 1
+        self.sample_count += 1
+
+    def _take_memory_snapshot(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+        self.snapshot_count += 1
+        snapshot.dump(str(self.output_directory / f"memory_{self.snapshot_count:03d}.snapshot"))
+        if self._previous_snapshot is not None:
+            top_growth = snapshot.compare_to(self._previous_snapshot, "lineno")[:3]
+            for stat in top_growth:
+                logging.debug(f"Memory growth: {stat}")
+        self._previous_snapshot = snapshot
+
+    def _run(self):
+        next_snapshot_at = time.monotonic() + self.memory_interval
+        while not self._stop.wait(self.sample_interval):
+            self._sample()
+            if time.monotonic() >= next_snapshot_at:
+                self._take_memory_snapshot()
+                next_snapshot_at = time.monotonic() + self.memory_interval
+
+    def stop(self):
+        """Stops sampling, writes all profiles and logs the top-N summary."""
+        self._stop.set()
+        self._thread.join()
+        self._take_memory_snapshot()
+        tracemalloc.stop()
+
+        with open(self.output_directory / "stacks.collapsed", "w", encoding="utf-8") as stacks_file:
+            for stack, count in self.stacks.most_common():
+                stacks_file.write(f"{stack} {count}\n")
+
+        elapsed = time.monotonic() - self._started_at
+        lines = [f"Profiled {elapsed:.1f}s: {self.sample_count} samples every {self.sample_interval * 1000:.0f}ms, "
+                 f"{self.snapshot_count} memory snapshots", "", f"Top {self.top_n} functions by self samples:"]
+        lines += [f"  {count:8d}  {label}" for label, count in self.self_samples.most_common(self.top_n)]
+        lines += ["", f"Top {self.top_n} functions by total samples:"]
+        lines += [f"  {count:8d}  {label}" for label, count in self.total_samples.most_common(self.top_n)]
+        lines += ["", f"Top {self.top_n} allocation sites at shutdown:"]
+        if self._previous_snapshot is not None:
+            lines += [f"  {stat}" for stat in self._previous_snapshot.statistics("lineno")[:self.top_n]]
+        summary = "\n".join(lines)
+        (self.output_directory / "summary.txt").write_text(summary + "\n", encoding="utf-8")
+        logging.info(f"Session profile summary (full profiles in {self.output_directory}):\n{summary}")
+
+
+def start_session_profiler(log_directory: Path, timestamp: str) -> Optional[SessionProfiler]:
+    """Starts a profiler for this run if the DMS_PROFILE environment variable is set, else returns None."""
+    if os.getenv(PROFILE_ENV_VAR, "").lower() in ("", "0", "false"):
+        return None
+    profiler = SessionProfiler(log_directory / f"profile_{timestamp}")
+    profiler.start()
+    return profiler
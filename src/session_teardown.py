@@ -0,0 +1,119 @@
+"""
+End-of-session cleanup for the single-session assistant (dms_assistant.py).
+
+Stops the LLM and transcription pipelines in order, logs and journals their statistics,
+and closes the transcription client. Each step tolerates components that were never
+created, so the same functions run after a normal end, Ctrl+C or an exception.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from asr_corrector import ASRCorrector
+from chunk_size_controller import ChunkSizeController
+from llm_worker import LLMRequestWorker
+from pipeline_tracing import PipelineTracer
+from prompt_fanout import PromptFanOut
+from segment_filter import HallucinationFilter
+from session_journal import SessionJournal
+from speculative_prompt import SpeculativePreparer
+
+
+def stop_llm_pipeline(journal: SessionJournal, llm_worker: Optional[LLMRequestWorker] = None,
+                      speculator: Optional[SpeculativePreparer] = None,
+                      prompt_fanout: Optional[PromptFanOut] = None):
+    """Waits for pending LLM requests, then journals speculation and fan-out statistics."""
+    if llm_worker:
+        logging.info("Waiting for pending LLM requests...")
+        llm_worker.stop()
+    if speculator:
+        # After the worker: committed speculative answers it was waiting for must not be cancelled
+        speculator.close()
+        logging.info(f"Speculative preparation: {speculator.statistics()}")
+        journal.log("SPECULATION_STATS", **speculator.statistics())
+    if prompt_fanout:
+        logging.info("Waiting for pending specialized prompts...")
+        prompt_fanout.stop()
+        logging.info(f"Specialized prompts: {prompt_fanout.statistics()}")
+        journal.log("PROMPT_FANOUT_STATS", **prompt_fanout.statistics())
+
+
+def journal_pipeline_statistics(journal: SessionJournal, hallucination_filter: HallucinationFilter,
+                                asr_corrector: Optional[ASRCorrector], chunk_controller: ChunkSizeController,
+                                tracer: PipelineTracer, trace_path: Path):
+    """Logs and journals the transcript filtering, chunk sizing and latency statistics; writes the trace."""
+    hallucination_filter.log_statistics()
+    journal.log("HALLUCINATION_FILTER", dropped=dict(hallucination_filter.dropped_by_reason),
+                prevented_llm_calls=hallucination_filter.prevented_llm_calls)
+    if asr_corrector:
+        asr_corrector.log_statistics()
+    journal.log("CHUNK_SETPOINTS_FINAL", **chunk_controller.setpoints())
+    tracer.log_summary()
+    tracer.dump(trace_path)
+    journal.log("PIPELINE_TRACE", stages=tracer.snapshot())
+
+
+def stop_transcription(transcription_client: Any, transcription_thread: Optional[threading.Thread],
+                       journal: SessionJournal, live: bool):
+    """Stops live capture and waits (up to 5s) for the transcription thread to finish."""
+    if live:
+        transcription_client.stop_live()
+    if transcription_thread and transcription_thread.is_alive():
+        logging.info("Waiting for transcription thread to complete...")
+        # Signal the client thread to stop? (Might need modification in client)
+        # For now, just join with timeout
+        transcription_thread.join(timeout=5.0)
+        if transcription_thread.is_alive():
+            logging.warning("Transcription thread did not exit cleanly after join timeout.")
+            journal.log("TRANSCRIPTION_THREAD_JOIN_TIMEOUT", logging.WARNING)
+        else:
+             logging.info("Transcription thread joined.")
+             journal.log("TRANSCRIPTION_THREAD_JOINED")
+
+
+def journal_transcription_statistics(transcription_client: Any, journal: SessionJournal):
+    """Journals the client-side audio statistics (VAD, sending, reconnects, capture, routing) and finishes exports."""
+    if transcription_client.vad_gate:
+        logging.info(f"Client VAD gate: {transcription_client.vad_gate.statistics()}")
+        journal.log("VAD_GATE_STATS", **transcription_client.vad_gate.statistics())
+    for client in transcription_client.clients:
+        logging.info(f"Client {client.uid} sent: {client.send_statistics()}")
+        journal.log("CLIENT_SEND_STATS", uid=client.uid, **client.send_statistics())
+        if client.reconnect:
+            journal.log("RECONNECT_STATS", uid=client.uid, **client.reconnect_stats.summary(client.replay_buffer))
+    if transcription_client.playback_statistics:
+        journal.log("PLAYBACK_TIMING", **transcription_client.playback_statistics)
+    if transcription_client.live_statistics:
+        journal.log("LIVE_CAPTURE_STATS", **transcription_client.live_statistics)
+    if getattr(transcription_client, "child_statistics", None):
+        journal.log("CAPTURE_PROCESS_STATS", **transcription_client.child_statistics)
+    if transcription_client.exporter:
+        transcription_client.finish_export()
+        journal.log("TRANSCRIPT_EXPORTED", segments=transcription_client.exporter.segments_written,
+                    **transcription_client.exporter.paths)
+    if transcription_client.router:
+        logging.info(f"Server routing: {transcription_client.router.statistics()}")
+        journal.log("ROUTING_STATS", **transcription_client.router.statistics())
+
+
+def close_transcription_client(transcription_client: Any, journal: SessionJournal):
+    """Closes the transcription client's websocket(s)."""
+    logging.info("Attempting to close transcription client...")
+    try:
+        # Check if close method exists, call it if safe
+        # Assuming transcription_client wraps a single client instance accessible via .client
+        if len(transcription_client.clients) == 1 and hasattr(transcription_client.client, 'close_websocket'):
+             transcription_client.client.close_websocket()
+             logging.info("Transcription client websocket closed.")
+             journal.log("TRANSCRIPTION_CLIENT_WEBSOCKET_CLOSED")
+        elif hasattr(transcription_client, 'close_all_clients'): # Fallback if structure changed
+             transcription_client.close_all_clients()
+             logging.info("Transcription client (via close_all_clients) closed.")
+             journal.log("TRANSCRIPTION_CLIENT_ALL_CLOSED")
+        else:
+             logging.warning("Could not find appropriate method to close transcription client.")
+    except Exception as e:
+        logging.warning(f"Error during transcription client cleanup: {e}")
+        journal.log("TRANSCRIPTION_CLIENT_CLEANUP_ERROR", logging.WARNING, error=str(e))
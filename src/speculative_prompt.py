@@ -0,0 +1,229 @@
+"""
+Speculative prompt preparation from stable partial transcript text.
+
+A chunk only exists once the server marks its last segment completed, but the partial
+text of that segment is usually final well before then. Once the partial text has not
+changed for `STABLE_PARTIAL_SECONDS`, `SpeculativePreparer` predicts the chunk the
+accumulator will emit and, on a background thread, does the retrieval (gazetteer
+matches, past mentions) and prompt assembly for it. Optionally it also sends the prompt
+to the LLM on a branch of the chat session.
+
+When the real chunk arrives it is compared with the prediction word by word. If they
+match within the tolerance the speculation is committed: its retrieval results are
+reused and a speculative answer is queued on the `LLMRequestWorker` in order, adding its
+exchange to the chat history only then. Otherwise the speculation is cancelled (a request
+that has not started is not sent; an answer already on its way is discarded and its
+tokens counted as wasted).
+"""
+
+import difflib
+import logging
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+STABLE_PARTIAL_SECONDS = 0.6     # Partial text unchanged this long is taken as settled
+DEFAULT_MATCH_TOLERANCE = 0.9    # Minimum word-level similarity for a speculation to be committed
+CHARACTERS_PER_TOKEN = 4         # Estimate when a response has no usage metadata
+
+_WORD_PATTERN = re.compile(r"[\w']+")
+
+
+def text_similarity(first: str, second: str) -> float:
+    """Similarity of two texts in [0, 1], by their words (case and punctuation ignored)."""
+    first_words = _WORD_PATTERN.findall(first.lower())
+    second_words = _WORD_PATTERN.findall(second.lower())
+    return difflib.SequenceMatcher(None, first_words, second_words, autojunk=False).ratio()
+
+
+def response_tokens(prompt: str, response: Any) -> int:
+    """Tokens an LLM exchange used: from the response's usage metadata, else estimated from the prompt."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    if total:
+        return int(total)
+    return len(prompt) // CHARACTERS_PER_TOKEN
+
+
+def branch_chat_sender(llm_model: Any, chat_session: Any) -> Callable[[str], Tuple[Any, Callable[[], None]]]:
+    """
+    Sends speculative prompts on a copy of the chat, so the real history is only extended on commit.
+
+    Args:
+        llm_model: Model to start the branch chats on.
+        chat_session: The session's chat; its history at send time seeds the branch.
+
+    Returns:
+        Callable[[str], Tuple[Any, Callable[[], None]]]: prompt -> (response, commit); commit()
+            appends the prompt and answer to the chat's history.
+    """
+    def send(prompt: str) -> Tuple[Any, Callable[[], None]]:
+        branch = llm_model.start_chat(history=list(chat_session.history))
+        response = branch.send_message(prompt)
+        exchange = list(branch.history[-2:])
+
+        def commit():
+            chat_session.history = list(chat_session.history) + exchange
+
+        return response, commit
+
+    return send
+
+
+@dataclass
+class Speculation:
+    """Work done ahead of time for one predicted chunk."""
+
+    chunk: str
+    started_at: float
+    prepared: Optional[Future] = None           # -> (prompt fields, entity names)
+    prompt: Optional[str] = None                # Set once prepared
+    answer: Optional[Future] = None             # -> (response, commit), when LLM requests are speculative
+    ready_at: Optional[float] = None
+    cancelled: bool = False
+
+
+class SpeculativePreparer:
+    """Prepares the prompt of the chunk being spoken before the transcript completes it."""
+
+    def __init__(self, prepare_fields: Callable[[str], Tuple[Dict[str, str], List[str]]],
+                 format_prompt: Callable[[Dict[str, str]], str],
+                 send_speculative: Optional[Callable[[str], Tuple[Any, Callable[[], None]]]] = None,
+                 tolerance: float = DEFAULT_MATCH_TOLERANCE, stable_seconds: float = STABLE_PARTIAL_SECONDS):
+        """
+        Args:
+            prepare_fields (Callable[[str], Tuple[Dict[str, str], List[str]]]): chunk -> (prompt
+                fields, referenced entity names); the retrieval step.
+            format_prompt (Callable[[Dict[str, str]], str]): Assembles the prompt from the fields.
+            send_speculative (Callable, optional): Sends a prompt ahead of time (see
+                `branch_chat_sender`); None prepares prompts only.
+            tolerance (float): Minimum `text_similarity` between prediction and chunk to commit.
+            stable_seconds (float): How long partial text must stay unchanged before speculating.
+        """
+        self.prepare_fields = prepare_fields
+        self.format_prompt = format_prompt
+        self.send_speculative = send_speculative
+        self.tolerance = tolerance
+        self.stable_seconds = stable_seconds
+        self.current: Optional[Speculation] = None
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.superseded = 0
+        self.chunks = 0
+        self.llm_requests = 0
+        self.llm_requests_cancelled = 0
+        self.wasted_tokens = 0
+        self.lead_seconds: List[float] = [] # Prepared this long before the chunk was emitted
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculate")
+
+    def observe(self, accumulator: Any):
+        """
+        Starts (or replaces) a speculation if the accumulator's partial text is stable.
+
+        Call after every `add_segments` that did not emit a chunk.
+        """
+        partial_text = accumulator.stable_partial_text(self.stable_seconds)
+        if not partial_text:
+            return
+        predicted = accumulator.speculative_chunk(partial_text)
+        if not predicted:
+            return
+        current = self.current
+        if current and text_similarity(current.chunk, predicted) >= self.tolerance:
+            return
+        if current:
+            self._discard(current)
+            self.superseded += 1
+        speculation = Speculation(chunk=predicted, started_at=time.monotonic())
+        speculation.prepared = self._executor.submit(self._prepare, speculation)
+        self.current = speculation
+        self.started += 1
+        logging.debug(f"Speculating on chunk: {predicted[:80]}...")
+
+    def _prepare(self, speculation: Speculation) -> Tuple[Dict[str, str], List[str]]:
+        fields, entity_names = self.prepare_fields(speculation.chunk)
+        speculation.prompt = self.format_prompt(fields)
+        with self._lock:
+            if self.send_speculative and not speculation.cancelled:
+                speculation.answer = self._executor.submit(self.send_speculative, speculation.prompt)
+                self.llm_requests += 1
+        speculation.ready_at = time.monotonic()
+        return fields, entity_names
+
+    def resolve(self, chunk: str) -> Optional[Speculation]:
+        """
+        Settles the current speculation against the emitted chunk.
+
+        Args:
+            chunk (str): The chunk the accumulator emitted.
+
+        Returns:
+            Optional[Speculation]: The committed speculation (its `prepared` result and `answer`
+                are for the caller to use), or None if there was none or it did not match.
+        """
+        self.chunks += 1
+        speculation, self.current = self.current, None
+        if speculation is None:
+            return None
+        if text_similarity(speculation.chunk, chunk) < self.tolerance:
+            self.misses += 1
+            self._discard(speculation)
+            return None
+        self.hits += 1
+        # Waiting here is still faster than retrieving from scratch, which is the alternative
+        speculation.prepared.result()
+        self.lead_seconds.append(max(0.0, time.monotonic() - speculation.ready_at))
+        return speculation
+
+    def _discard(self, speculation: Speculation):
+        with self._lock:
+            speculation.cancelled = True
+            answer = speculation.answer
+        if answer is None:
+            return
+        if answer.cancel():
+            self.llm_requests_cancelled += 1
+        else:
+            prompt = speculation.prompt
+            answer.add_done_callback(lambda future: self._count_waste(prompt, future))
+
+    def _count_waste(self, prompt: str, answer: Future):
+        if answer.exception() is not None:
+            return
+        response, _ = answer.result()
+        with self._lock:
+            self.wasted_tokens += response_tokens(prompt, response)
+
+    def close(self):
+        """Cancels the open speculation and stops the background thread."""
+        if self.current:
+            self._discard(self.current)
+            self.current = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Share of speculations that were committed."""
+        return self.hits / self.started if self.started else None
+
+    def statistics(self) -> Dict[str, Any]:
+        """Hits, misses, hit rate, median lead time and the LLM tokens spent on discarded answers."""
+        return {
+            "chunks": self.chunks,
+            "speculations": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "superseded": self.superseded,
+            "hit_rate": round(self.hit_rate, 3) if self.hit_rate is not None else None,
+            "chunk_coverage": round(self.hits / self.chunks, 3) if self.chunks else None,
+            "median_lead_seconds": round(statistics.median(self.lead_seconds), 2) if self.lead_seconds else None,
+            "llm_requests": self.llm_requests,
+            "llm_requests_cancelled": self.llm_requests_cancelled,
+            "wasted_tokens": self.wasted_tokens,
+        }
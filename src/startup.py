@@ -0,0 +1,69 @@
+"""
+Concurrent startup: independent initialization steps run on a thread pool, each timed.
+
+Most startup work is I/O or import bound (reading context files, importing the LLM SDK,
+loading tokenizer data, opening the websocket), so running the steps side by side makes
+startup take about as long as the slowest step instead of the sum of all of them.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+STARTUP_WORKERS = 6
+
+
+class StartupTimer:
+    """Wall-clock duration of each startup phase."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times the enclosed block as phase `name`."""
+        started_at = time.perf_counter()
+        yield
+        self.phases[name] = time.perf_counter() - started_at
+
+    def run_concurrently(self, tasks: Dict[str, Callable[[], Any]],
+                         workers: int = STARTUP_WORKERS) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+        """
+        Runs independent startup tasks in parallel, timing each one as a phase.
+
+        A task that raises doesn't stop the others, so the caller can clean up what did start.
+
+        Args:
+            tasks (Dict[str, Callable[[], Any]]): Phase name -> zero-argument callable.
+            workers (int): Thread pool size.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, BaseException]]: Phase name -> the callable's return
+                value (None if it raised), and phase name -> exception for the tasks that raised.
+        """
+        def timed(name: str, task: Callable[[], Any]) -> Any:
+            with self.phase(name):
+                return task()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup") as executor:
+            futures = {name: executor.submit(timed, name, task) for name, task in tasks.items()}
+            failures = {name: future.exception() for name, future in futures.items() if future.exception() is not None}
+            results = {name: None if name in failures else future.result() for name, future in futures.items()}
+        for name, error in failures.items():
+            logging.error(f"Startup step '{name}' failed: {error!r}", exc_info=error)
+        return results, failures
+
+    def summary(self) -> Dict[str, float]:
+        """Phase durations in milliseconds, plus the total elapsed since the timer was created."""
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        timings["total"] = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return timings
+
+    def log(self):
+        timings = self.summary()
+        slowest = sorted((name for name in timings if name != "total"), key=timings.get, reverse=True)
+        logging.info(f"Startup took {timings['total']:.0f} ms: "
+                     + ", ".join(f"{name} {timings[name]:.0f} ms" for name in slowest))
@@ -0,0 +1,193 @@
+"""
+Multi-table host: several independent game tables in one process on shared assets.
+
+Tables are `TableSession`s sharing one `SharedAssets`. The host records resident memory
+before and after each table starts (the marginal cost of one more table) and sums the
+tables' throughput. `measure_scaling` replays a recorded transcript (the JSONL written by
+the transcript exporter) through 1, 2, 4, ... tables without a server or LLM:
+
+    python src/table_host.py logs/transcript_<timestamp>.jsonl --tables 1 2 4 8
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dms_assistant import ACCUMULATOR_POLL_INTERVAL_SECONDS, LOG_DIRECTORY, shutdown_requested, sigint_handler
+from session_journal import setup_session_journal
+from table_session import POLL, SharedAssets, TableSession
+
+DEFAULT_TABLE_COUNTS = (1, 2, 4, 8)
+DEFAULT_CAMPAIGN_CONFIG = "source_materials/ceres_group/ceres_odyssey.json"
+
+
+def resident_memory_mb() -> Optional[float]:
+    """Resident set size of this process in MiB (peak RSS where /proc is unavailable; None on Windows)."""
+    statm = Path("/proc/self/statm")
+    if statm.is_file():
+        return int(statm.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    if sys.platform == "win32":
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class TableHost:
+    """Runs several tables in one process and measures what each additional table costs."""
+
+    def __init__(self, assets: Optional[SharedAssets] = None, llm_model: Optional[Any] = None):
+        """
+        Args:
+            assets (SharedAssets, optional): Assets to share; pass one instance to several hosts
+                to keep them warm across runs.
+            llm_model (optional): Model every table starts its own chat session on; None runs without LLM.
+        """
+        self.assets = assets or SharedAssets()
+        self.llm_model = llm_model
+        self.tables: List[TableSession] = []
+        self.baseline_memory_mb = resident_memory_mb()
+        self._polling_stopped = threading.Event()
+        self._poller = threading.Thread(target=self._poll_loop, name="table-poll", daemon=True)
+
+    def add_table(self, table: TableSession) -> bool:
+        """Starts a table, recording the resident memory it added. Returns False if it failed to start."""
+        memory_before = resident_memory_mb()
+        if not table.start(self.assets, self.llm_model):
+            return False
+        memory_after = resident_memory_mb()
+        if memory_before is not None and memory_after is not None:
+            table.memory_added_mb = memory_after - memory_before
+        self.tables.append(table)
+        logging.info(f"Table {table.name} started ({len(self.tables)} running, "
+                     f"+{table.memory_added_mb or 0.0:.1f} MiB resident)")
+        if not self._poller.is_alive():
+            self._poller.start()
+        return True
+
+    def _poll_loop(self):
+        # One thread wakes all idle tables instead of each table polling its queue with a timeout
+        while not self._polling_stopped.wait(ACCUMULATOR_POLL_INTERVAL_SECONDS):
+            for table in self.tables:
+                if table.running and table.transcript_queue.empty():
+                    table.transcript_queue.put(POLL)
+
+    def run(self) -> Dict[str, Any]:
+        """Waits until every table has finished (or shutdown was requested) and returns `statistics`."""
+        for table in self.tables:
+            while table.running:
+                time.sleep(0.2) # Short sleeps rather than join() so Ctrl+C is handled promptly
+        self._polling_stopped.set()
+        statistics = self.statistics()
+        logging.info(f"Host statistics: {statistics}")
+        return statistics
+
+    def statistics(self) -> Dict[str, Any]:
+        """Memory per table and aggregate throughput of all tables."""
+        tables = [table.statistics() for table in self.tables]
+        added = [table["memory_added_mb"] for table in tables if table["memory_added_mb"] is not None]
+        wall_seconds = max((table["wall_seconds"] for table in tables), default=0.0)
+        busy_seconds = sum(table["busy_seconds"] for table in tables)
+        segments = sum(table["segments"] for table in tables)
+        memory_mb = resident_memory_mb()
+        return {
+            "tables": len(tables),
+            "baseline_memory_mb": round(self.baseline_memory_mb, 1) if self.baseline_memory_mb is not None else None,
+            "memory_mb": round(memory_mb, 1) if memory_mb is not None else None,
+            "first_table_memory_mb": round(added[0], 1) if added else None,
+            # The first table also pays for the shared assets; later ones show the marginal cost
+            "additional_table_memory_mb": round(sum(added[1:]) / len(added[1:]), 1) if len(added) > 1 else None,
+            "segments": segments,
+            "segments_per_second": round(segments / wall_seconds, 1) if wall_seconds else None,
+            "segments_per_busy_second": round(segments / busy_seconds, 1) if busy_seconds else None,
+            "audio_seconds": round(sum(table["audio_seconds"] for table in tables), 1),
+            "per_table": tables,
+            "shared_assets": self.assets.statistics(),
+        }
+
+
+def run_tables(table_specs: Sequence[Tuple[str, Optional[str]]]) -> Optional[Dict[str, Any]]:
+    """
+    Hosts one live session per table spec until all of them end (or Ctrl+C).
+
+    Args:
+        table_specs (Sequence[Tuple[str, Optional[str]]]): (campaign config, input audio file
+            or None for live capture) per table.
+
+    Returns:
+        Optional[Dict[str, Any]]: Host statistics, or None if the LLM could not be initialized.
+    """
+    signal.signal(signal.SIGINT, sigint_handler)
+    run_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    journal = setup_session_journal(LOG_DIRECTORY, f"{run_timestamp}_host")
+    assets = SharedAssets()
+    llm_model = assets.llm_model()
+    if not llm_model:
+        journal.close()
+        return None
+    host = TableHost(assets, llm_model)
+    for index, (campaign_config_path, input_audio_file) in enumerate(table_specs, start=1):
+        audio_path = str(Path(input_audio_file).resolve()) if input_audio_file else None
+        if not host.add_table(TableSession(f"table{index}", str(Path(campaign_config_path).resolve()), audio_path)):
+            journal.log("TABLE_START_FAILED", logging.ERROR, campaign=campaign_config_path, input_audio_file=input_audio_file)
+    statistics = host.run()
+    journal.log("HOST_STATS", **statistics)
+    journal.close()
+    return statistics
+
+
+def measure_scaling(transcript_path: str, campaign_config_paths: Sequence[str],
+                    table_counts: Sequence[int] = DEFAULT_TABLE_COUNTS) -> List[Dict[str, Any]]:
+    """
+    Replays a recorded transcript through increasing numbers of tables in one process.
+
+    Tables are assigned the campaign configs round-robin. One `SharedAssets` is used for
+    all runs, so from the second run on only the per-table cost is measured.
+
+    Args:
+        transcript_path (str): JSONL transcript written by the transcript exporter.
+        campaign_config_paths (Sequence[str]): Campaign configs for the tables.
+        table_counts (Sequence[int]): Numbers of concurrent tables to measure.
+
+    Returns:
+        List[Dict[str, Any]]: Host statistics for each table count.
+    """
+    from whisper_live_client.transcript_export import read_jsonl_segments
+    segments = [dict(segment, completed=True) for segment in read_jsonl_segments(transcript_path)]
+    assets = SharedAssets()
+    results = []
+    for count in table_counts:
+        host = TableHost(assets)
+        for index in range(count):
+            config_path = str(Path(campaign_config_paths[index % len(campaign_config_paths)]).resolve())
+            host.add_table(TableSession(f"bench{count}x{index + 1}", config_path, replay_segments=segments))
+        results.append(host.run())
+        if shutdown_requested.is_set():
+            break
+    for result in results:
+        logging.info(f"{result['tables']} tables: {result['segments_per_second']} segments/s in total, "
+                     f"{result['segments_per_busy_second']} per busy second, "
+                     f"+{result['additional_table_memory_mb']} MiB per additional table")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory and throughput of several tables in one process.")
+    parser.add_argument("transcript", help="JSONL transcript to replay (logs/transcript_<timestamp>.jsonl)")
+    parser.add_argument("--campaign", action="append", default=None,
+                        help=f"Campaign config; repeat to mix campaigns (default {DEFAULT_CAMPAIGN_CONFIG})")
+    parser.add_argument("--tables", type=int, nargs="+", default=list(DEFAULT_TABLE_COUNTS), help="Table counts to measure")
+    args = parser.parse_args()
+    signal.signal(signal.SIGINT, sigint_handler)
+    measure_scaling(args.transcript, args.campaign or [DEFAULT_CAMPAIGN_CONFIG], args.tables)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Per-table pipeline and the assets tables share, for hosting several tables in one process.
+
+Each table has its own campaign config, transcript stream, accumulator, journal and chat
+session. Everything immutable is built once and shared read-only: the prompt template,
+combined context texts (deduplicated by content, so tables of one campaign hold a single
+copy), entity gazetteers, ASR lexicons, the sentence tokenizer and the LLM model object.
+"""
+
+import datetime
+import hashlib
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from asr_corrector import build_asr_corrector
+from chunk_size_controller import ChunkSizeController
+from chunk_processing import display_llm_response, process_accumulated_chunk
+from context_loader import load_and_combine_context
+from dms_assistant import (LLM_CALLS_ENABLED, LOG_DIRECTORY, PROMPT_TEMPLATE_FILE,
+                           TRACING_ENABLED, TRANSCRIPT_EXPORT_ENABLED, TRANSCRIPT_STORE_ENABLED, TRANSCRIPT_STORE_FILE,
+                           initialize_llm_from_env, initialize_transcription_client,
+                           load_prompt_template, shutdown_requested)
+from entity_gazetteer import build_gazetteer
+from llm_worker import LLMRequestWorker
+from pipeline_tracing import PipelineTracer
+from segment_filter import HallucinationFilter
+from session_checkpoint import context_fingerprint
+from session_journal import setup_session_journal
+from transcript_accumulator import TranscriptAccumulator, ensure_sentence_tokenizer
+from transcript_store import TranscriptStore
+
+POLL = object() # Queued to an idle table so its time-based chunk flushes fire (like a queue.get timeout)
+
+
+class SharedAssets:
+    """Immutable assets, built once per key and shared read-only by all tables."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._assets: Dict[Tuple[str, str], Any] = {}
+        self._texts: Dict[str, str] = {}
+        self.builds = 0
+        self.reuses = 0
+        self.deduplicated_chars = 0
+
+    def get(self, kind: str, key: str, build: Callable[[], Any]) -> Any:
+        """Returns asset `kind` for `key`, building it on first use; concurrent first users wait for one build."""
+        with self._lock:
+            key_lock = self._key_locks.setdefault((kind, key), threading.Lock())
+        with key_lock:
+            if (kind, key) in self._assets:
+                self.reuses += 1
+            else:
+                self._assets[(kind, key)] = build()
+                self.builds += 1
+            return self._assets[(kind, key)]
+
+    def intern_text(self, text: str) -> str:
+        """Returns the shared copy of `text`, so equal texts loaded for different keys are stored once."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            shared = self._texts.setdefault(digest, text)
+        if shared is not text:
+            self.deduplicated_chars += len(text)
+        return shared
+
+    @staticmethod
+    def _campaign_key(campaign_config_path: str) -> str:
+        # Rebuilt (for tables started later) if the campaign files change while the host runs
+        return f"{campaign_config_path}:{context_fingerprint(campaign_config_path)}"
+
+    def prompt_template(self) -> Optional[str]:
+        return self.get("prompt_template", str(PROMPT_TEMPLATE_FILE), lambda: load_prompt_template(PROMPT_TEMPLATE_FILE))
+
+    def context(self, campaign_config_path: str) -> Optional[str]:
+        def build() -> Optional[str]:
+            text = load_and_combine_context(campaign_config_path)
+            return self.intern_text(text) if text else None
+        return self.get("context", self._campaign_key(campaign_config_path), build)
+
+    def gazetteer(self, campaign_config_path: str) -> Any:
+        return self.get("gazetteer", self._campaign_key(campaign_config_path), lambda: build_gazetteer(campaign_config_path))
+
+    def asr_corrector(self, campaign_config_path: str) -> Any:
+        # Its correction cache is only ever extended with deterministic results, so tables can share it
+        return self.get("asr_corrector", self._campaign_key(campaign_config_path),
+                        lambda: build_asr_corrector(campaign_config_path))
+
+    def llm_model(self) -> Optional[Any]:
+        return self.get("llm", "model", initialize_llm_from_env)
+
+    def statistics(self) -> Dict[str, Any]:
+        return {"assets": len(self._assets), "builds": self.builds, "reuses": self.reuses,
+                "distinct_texts": len(self._texts), "deduplicated_chars": self.deduplicated_chars}
+
+
+class TableSession:
+    """One table's pipeline: transcript stream -> filters -> accumulator -> prompt -> LLM."""
+
+    def __init__(self, name: str, campaign_config_path: str, input_audio_file: Optional[str] = None,
+                 replay_segments: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            name (str): Table label, used in logs and file names.
+            campaign_config_path (str): The table's campaign config.
+            input_audio_file (str, optional): Recording to play; None captures live audio.
+            replay_segments (List[Dict[str, Any]], optional): Completed segments fed to the
+                pipeline instead of connecting to a transcription server (benchmarks).
+        """
+        self.name = name
+        self.campaign_config_path = campaign_config_path
+        self.input_audio_file = input_audio_file
+        self.replay_segments = replay_segments
+        self.session_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}"
+        self.transcript_queue: queue.Queue = queue.Queue()
+        self.tracer = PipelineTracer(enabled=TRACING_ENABLED)
+        self.client = None
+        self.llm_worker = None
+        self.transcript_store = None
+        self.memory_added_mb: Optional[float] = None
+        self.segments_received = 0
+        self.chunks_emitted = 0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self, assets: SharedAssets, llm_model: Optional[Any] = None) -> bool:
+        """
+        Builds the table's pipeline on the shared assets and starts its threads.
+
+        Returns:
+            bool: False if the table could not start (errors are logged).
+        """
+        self.prompt_template = assets.prompt_template()
+        context = assets.context(self.campaign_config_path)
+        if not self.prompt_template or not context:
+            logging.error(f"Table {self.name}: failed to load the prompt template or context.")
+            return False
+        self.gazetteer = assets.gazetteer(self.campaign_config_path)
+        self.asr_corrector = assets.asr_corrector(self.campaign_config_path)
+        ensure_sentence_tokenizer()
+        self.journal = setup_session_journal(LOG_DIRECTORY, self.session_id)
+        self.journal.log("TABLE_STARTED", table=self.name, campaign=self.campaign_config_path,
+                         input_audio_file=self.input_audio_file, replay=self.replay_segments is not None)
+        self.journal.log("INITIAL_CONTEXT_LOADED", blobs={"context": context}, chars=len(context))
+        self.accumulator = TranscriptAccumulator()
+        self.hallucination_filter = HallucinationFilter()
+        self.chunk_controller = ChunkSizeController(self.accumulator)
+        if llm_model:
+            chat_session = llm_model.start_chat(history=[
+                {'role': 'user', 'parts': [context]},
+                {'role': 'model', 'parts': ["Okay, I have loaded the context. I am ready to assist based on the DM's narration."]},
+            ])
+            if LLM_CALLS_ENABLED:
+                self.llm_worker = LLMRequestWorker(
+                    chat_session.send_message, on_response=self._display_response,
+                    on_latency=self.chunk_controller.observe_latency, tracer=self.tracer,
+                    on_failure=lambda failures, queued, error: self.journal.log("LLM_REQUEST_FAILED", logging.ERROR,
+                                                                                failures=failures, queued_prompts=queued, error=repr(error)))
+                self.llm_worker.start()
+
+        if self.replay_segments is not None:
+            self._source_thread = threading.Thread(target=self._replay, name=f"replay-{self.name}", daemon=True)
+        else:
+            if TRANSCRIPT_STORE_ENABLED:
+                self.transcript_store = TranscriptStore(TRANSCRIPT_STORE_FILE, self.campaign_config_path,
+                                                        self.session_id, self.input_audio_file)
+            self.client = initialize_transcription_client(
+                output_queue=self.transcript_queue, input_audio_path=self.input_audio_file, tracer=self.tracer,
+                transcript_export_path=LOG_DIRECTORY / f"transcript_{self.session_id}.srt" if TRANSCRIPT_EXPORT_ENABLED else None)
+            if not self.client:
+                self._close()
+                return False
+            self._source_thread = threading.Thread(
+                target=self.client, args=(self.input_audio_file,) if self.input_audio_file else (),
+                name=f"transcription-{self.name}", daemon=True)
+        self._loop_thread = threading.Thread(target=self._run, name=f"table-{self.name}", daemon=True)
+        self.started_at = time.monotonic()
+        self._source_thread.start()
+        self._loop_thread.start()
+        return True
+
+    def _display_response(self, prompt: str, response: Any, latency: float):
+        logging.info(f"Table {self.name}: assistant response")
+        display_llm_response(response, latency, self.journal)
+
+    def _replay(self):
+        for segment in self.replay_segments:
+            self.transcript_queue.put([dict(segment)])
+        self.transcript_queue.put(None)
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None and self._loop_thread.is_alive()
+
+    def _process_chunk(self, chunk: str, segment_received_at: Optional[float]):
+        self.chunks_emitted += 1
+        process_accumulated_chunk(chunk, self.prompt_template, self.gazetteer, self.journal, self.llm_worker,
+                                  self.chunk_controller, self.tracer, segment_received_at, self.transcript_store)
+
+    def _run(self):
+        segment_received_at = None
+        while not shutdown_requested.is_set():
+            segment = self.transcript_queue.get()
+            if segment is None:
+                self.journal.log("TRANSCRIPT_SENTINEL_RECEIVED")
+                break
+            handling_started_at = time.perf_counter()
+            if segment is POLL:
+                timed_chunk = self.accumulator.check_timeouts()
+                if timed_chunk:
+                    self._process_chunk(timed_chunk, segment_received_at)
+                self.busy_seconds += time.perf_counter() - handling_started_at
+                if not self._source_thread.is_alive() and self.transcript_queue.empty():
+                    self.journal.log("TRANSCRIPTION_THREAD_DONE_QUEUE_EMPTY")
+                    break
+                continue
+
+            self.segments_received += 1
+            self.journal.log("TRANSCRIPT_SEGMENT", logging.DEBUG, segments=segment)
+            stamped_at = self.tracer.take_stamp(segment)
+            if stamped_at is not None:
+                segment_received_at = stamped_at
+            segment = self.hallucination_filter.filter_segments(segment, self.accumulator.min_words)
+            if self.asr_corrector:
+                segment = self.asr_corrector.correct_segments(segment)
+            if self.transcript_store:
+                self.transcript_store.add_segments(segment)
+            accumulated_chunk = self.accumulator.add_segments(segment)
+            self.audio_seconds = max(self.audio_seconds, self.accumulator.last_processed_end_time)
+            if accumulated_chunk:
+                self._process_chunk(accumulated_chunk, segment_received_at)
+            self.busy_seconds += time.perf_counter() - handling_started_at
+
+        if not shutdown_requested.is_set():
+            final_chunk = self.accumulator.flush()
+            if final_chunk:
+                self._process_chunk(final_chunk, segment_received_at)
+        self._close()
+
+    def _close(self):
+        self.finished_at = time.monotonic()
+        self.journal.log("HALLUCINATION_FILTER", dropped=dict(self.hallucination_filter.dropped_by_reason),
+                         prevented_llm_calls=self.hallucination_filter.prevented_llm_calls)
+        if self.llm_worker:
+            self.llm_worker.stop()
+        if self.client:
+            if not self.input_audio_file:
+                self.client.stop_live()
+            if self._source_thread.is_alive():
+                self._source_thread.join(timeout=5.0)
+            if self.client.exporter:
+                self.client.finish_export()
+                self.journal.log("TRANSCRIPT_EXPORTED", segments=self.client.exporter.segments_written,
+                                 **self.client.exporter.paths)
+            self.client.close_all_clients()
+        if self.transcript_store:
+            self.transcript_store.close()
+            self.journal.log("TRANSCRIPT_STORE_CLOSED", rows_written=self.transcript_store.rows_written)
+        self.tracer.dump(LOG_DIRECTORY / f"trace_{self.session_id}.json")
+        self.journal.log("TABLE_STATS", **self.statistics())
+        self.journal.close()
+
+    def statistics(self) -> Dict[str, Any]:
+        """Throughput of the table: segments and audio handled, wall time and time spent processing."""
+        wall_seconds = ((self.finished_at or time.monotonic()) - self.started_at) if self.started_at else 0.0
+        return {
+            "table": self.name,
+            "segments": self.segments_received,
+            "chunks": self.chunks_emitted,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "wall_seconds": round(wall_seconds, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "segments_per_busy_second": round(self.segments_received / self.busy_seconds, 1) if self.busy_seconds else None,
+            "memory_added_mb": round(self.memory_added_mb, 1) if self.memory_added_mb is not None else None,
+        }
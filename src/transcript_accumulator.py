@@ -1,18 +1,30 @@
 import re
+import time
 import logging
-import nltk # Added for sentence tokenization
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional, List, Dict, Any, Callable
 
 # Constants moved here as they are specific to the accumulator logic
 MIN_SENTENCES_PER_CHUNK = 3
 # MAX_SENTENCES_PER_CHUNK = 10 # Keep this commented for now, focus on min
 MIN_WORDS_PER_CHUNK = 50 # Minimum word count
+# Time-based flush policy: emit whatever is buffered once the DM pauses or the buffer gets old,
+# so a short line ("The door creaks open. A dragon!") doesn't wait for the count thresholds.
+MAX_SILENCE_SECONDS = 4.0 # Pause (audio gap or no new speech) that ends a chunk
+MAX_BUFFER_AGE_SECONDS = 30.0 # Upper bound on how long text may sit in the buffer
 
-class TranscriptAccumulator:
-    """Accumulates completed transcript segments and yields chunks based on sentence/word count using NLTK."""
-    def __init__(self, min_sentences=MIN_SENTENCES_PER_CHUNK,
-                 # max_sentences=MAX_SENTENCES_PER_CHUNK, # Keep commented
-                 min_words=MIN_WORDS_PER_CHUNK):
+# NLTK is imported (and its punkt data checked/downloaded and loaded) on first use rather than at
+# module import, so startup can warm it up concurrently with other work
+_sent_tokenize: Optional[Callable[[str], List[str]]] = None
+_tokenizer_lock = threading.Lock()
+
+def ensure_sentence_tokenizer() -> Callable[[str], List[str]]:
+    """Imports NLTK, makes sure the punkt data is available and loads it. Safe to call repeatedly."""
+    global _sent_tokenize
+    with _tokenizer_lock:
+        if _sent_tokenize is not None:
+            return _sent_tokenize
+        import nltk # Added for sentence tokenization
         # Download NLTK data if needed (ensure 'punkt' and 'punkt_tab' are available)
         try:
             # Check for both resources needed by sent_tokenize
@@ -32,22 +44,78 @@ class TranscriptAccumulator:
             # Catch any other unexpected errors during the find operation
             logging.error(f"An unexpected error occurred checking for NLTK data: {e}", exc_info=True)
             raise RuntimeError("Failed checking for NLTK data.") from e
+        nltk.sent_tokenize("Warm up. The punkt model loads on first use.")
+        _sent_tokenize = nltk.sent_tokenize
+        return _sent_tokenize
 
+class TranscriptAccumulator:
+    """
+    Accumulates completed transcript segments and yields chunks based on sentence/word count using NLTK.
+
+    Chunks are also emitted on a pause in speech or when buffered text exceeds a maximum age.
+    The time-based checks run on segment arrival and whenever `check_timeouts` is called, so
+    callers should call it periodically (e.g. each time their queue read times out).
+    """
+    def __init__(self, min_sentences=MIN_SENTENCES_PER_CHUNK,
+                 # max_sentences=MAX_SENTENCES_PER_CHUNK, # Keep commented
+                 min_words=MIN_WORDS_PER_CHUNK,
+                 max_silence_seconds: Optional[float] = MAX_SILENCE_SECONDS,
+                 max_buffer_age_seconds: Optional[float] = MAX_BUFFER_AGE_SECONDS):
+        self.sent_tokenize = ensure_sentence_tokenizer() # Instant if already warmed up
         self.buffer = "" # Buffer for accumulating *completed* text
         self.last_processed_end_time = 0.0 # Track end time of last committed segment
         self.min_sentences = min_sentences
         # self.max_sentences = max_sentences # Keep commented
         self.min_words = min_words
+        self.max_silence_seconds = max_silence_seconds # None disables the pause trigger
+        self.max_buffer_age_seconds = max_buffer_age_seconds # None disables the age trigger
+        self.buffer_started_at: Optional[float] = None # Monotonic time the buffer became non-empty
+        self.last_speech_at = time.monotonic() # Monotonic time any new (partial or completed) text arrived
+        self.last_partial_text = ""
+        self.partial_changed_at = time.monotonic() # Monotonic time the partial text last changed
         # Removed complex sentence split pattern, will use nltk.sent_tokenize
-        logging.info(f"TranscriptAccumulator initialized (NLTK, MinSentences: {self.min_sentences}, MinWords: {self.min_words}).")
+        logging.info(f"TranscriptAccumulator initialized (NLTK, MinSentences: {self.min_sentences}, MinWords: {self.min_words}, "
+                     f"MaxSilence: {self.max_silence_seconds}s, MaxBufferAge: {self.max_buffer_age_seconds}s).")
 
     def _get_word_count(self, text: str) -> int:
         """Helper to count words in a string."""
         return len(text.split())
 
+    def _take_buffer(self, reason: str) -> Optional[str]:
+        """Emits the whole buffer as a chunk (without resetting the time tracker, unlike flush)."""
+        chunk = self.buffer.strip()
+        self.buffer = ""
+        self.buffer_started_at = None
+        if not chunk:
+            return None
+        logging.debug(f"Accumulator: Emitting buffer on {reason} ({self._get_word_count(chunk)} words): '{chunk[:50]}...'")
+        return chunk
+
+    def check_timeouts(self, now: Optional[float] = None) -> Optional[str]:
+        """
+        Emits the buffered text if the DM has paused or the buffer has grown too old.
+
+        Args:
+            now (float, optional): Current `time.monotonic()` value. Defaults to the current time.
+
+        Returns:
+            Optional[str]: The emitted chunk, or None if no time limit was reached.
+        """
+        if not self.buffer:
+            return None
+        now = time.monotonic() if now is None else now
+        if self.max_silence_seconds is not None and now - self.last_speech_at >= self.max_silence_seconds:
+            return self._take_buffer("silence")
+        if (self.max_buffer_age_seconds is not None and self.buffer_started_at is not None
+                and now - self.buffer_started_at >= self.max_buffer_age_seconds):
+            return self._take_buffer("max buffer age")
+        return None
+
     def add_segments(self, segments: List[Dict[str, Any]]) -> Optional[str]:
         """Adds completed segments from the list and returns a chunk if criteria met."""
         newly_completed_text = ""
+        gap_chunk = None # Buffer emitted because the new audio starts after a long pause
+        now = time.monotonic()
 
         # Only process completed segments
         for seg in segments:
@@ -57,28 +125,45 @@ class TranscriptAccumulator:
 
             # Process if completed, has text, and ends after the last processed segment
             if is_completed and segment_text and end_time > self.last_processed_end_time:
+                start_time = float(seg.get("start", end_time))
+                if (self.max_silence_seconds is not None and self.buffer and not newly_completed_text
+                        and gap_chunk is None and start_time - self.last_processed_end_time >= self.max_silence_seconds):
+                    gap_chunk = self._take_buffer("silence gap in segment timestamps")
+                self.last_speech_at = now
                 logging.debug(f"Accumulator: Adding completed segment ending at {end_time:.2f}: '{segment_text[:50]}...'")
                 if newly_completed_text:
                     newly_completed_text += " "
                 newly_completed_text += segment_text
                 self.last_processed_end_time = end_time
+                self.last_partial_text = "" # The partial that preceded this segment is settled
             elif not is_completed and segment_text:
                  # Log skipped non-completed segments if desired, but don't add to buffer
                  logging.debug(f"Accumulator: Skipping non-completed segment: '{segment_text[:50]}...'")
+                 # A changing partial segment means the DM is still talking, so it isn't silence
+                 if segment_text != self.last_partial_text:
+                     self.last_partial_text = segment_text
+                     self.last_speech_at = now
+                     self.partial_changed_at = now
 
         # Append the aggregated completed text to the buffer
         if newly_completed_text:
              if self.buffer and not newly_completed_text.startswith(' '):
                  self.buffer += " "
+             elif not self.buffer:
+                 self.buffer_started_at = now
              self.buffer += newly_completed_text
              logging.debug(f"Accumulator: Buffer updated with completed text. Current length: {len(self.buffer)}, Word count: {self._get_word_count(self.buffer)}")
         else:
             # No new completed segments were added
-            return None
+            return gap_chunk or self.check_timeouts(now)
+
+        # The text before a pause goes out on its own; the new text starts the next chunk
+        if gap_chunk:
+            return gap_chunk
 
         # --- Use NLTK for Sentence Tokenization on the updated buffer ---
         try:
-            sentences = nltk.sent_tokenize(self.buffer)
+            sentences = self.sent_tokenize(self.buffer)
         except Exception as e:
             logging.error(f"NLTK sent_tokenize failed: {e}. Buffer: '{self.buffer[:100]}...'", exc_info=True)
             # Fallback or error handling needed? For now, just log and return None.
@@ -100,18 +185,62 @@ class TranscriptAccumulator:
             # Update buffer with remaining sentences
             remaining_sentences = sentences[num_sentences_in_chunk:]
             self.buffer = " ".join(remaining_sentences).strip() # Join remaining and strip leading/trailing space
+            self.buffer_started_at = now if self.buffer else None
 
             logging.debug(f"Accumulator: Yielding chunk ({num_sentences_in_chunk} sentences, {self._get_word_count(chunk)} words): '{chunk[:50]}...'")
             logging.debug(f"Accumulator: Remaining buffer ({len(remaining_sentences)} sentences): '{self.buffer[:50]}...'")
             return chunk
 
-        # Criteria not met, return None
-        return None
+        # Count criteria not met; the age limit may still apply
+        return self.check_timeouts(now)
+
+    def stable_partial_text(self, stable_seconds: float, now: Optional[float] = None) -> str:
+        """The current partial (not yet completed) text if it hasn't changed for `stable_seconds`, else ""."""
+        now = time.monotonic() if now is None else now
+        if self.last_partial_text and now - self.partial_changed_at >= stable_seconds:
+            return self.last_partial_text
+        return ""
+
+    def speculative_chunk(self, partial_text: str) -> Optional[str]:
+        """
+        Predicts the chunk the count criteria would emit if `partial_text` were completed as is.
+
+        Args:
+            partial_text (str): Text of the current partial segment.
+
+        Returns:
+            Optional[str]: The predicted chunk, or None if the criteria would not be met yet.
+        """
+        text = f"{self.buffer} {partial_text}".strip()
+        if self._get_word_count(text) < self.min_words:
+            return None
+        sentences = self.sent_tokenize(text)
+        if len(sentences) < self.min_sentences:
+            return None
+        return " ".join(sentences[:self.min_sentences])
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """State needed to resume accumulation after a restart (see `restore_state`)."""
+        return {
+            "buffer": self.buffer,
+            "last_processed_end_time": self.last_processed_end_time,
+            "min_sentences": self.min_sentences,
+            "min_words": self.min_words,
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Restores a state saved by `checkpoint_state`; restored text counts as newly buffered."""
+        self.buffer = state["buffer"]
+        self.last_processed_end_time = state["last_processed_end_time"]
+        self.min_sentences = state["min_sentences"]
+        self.min_words = state["min_words"]
+        self.buffer_started_at = time.monotonic() if self.buffer else None
 
     def flush(self) -> Optional[str]:
         """Returns any remaining text in the buffer and clears it."""
         remaining_text = self.buffer.strip()
         self.buffer = ""
+        self.buffer_started_at = None
         self.last_processed_end_time = 0.0 # Reset time tracker on flush
         if remaining_text:
             logging.info(f"Accumulator: Flushing remaining buffer ({self._get_word_count(remaining_text)} words): '{remaining_text[:50]}...'")
@@ -0,0 +1,198 @@
+"""
+Searchable multi-session transcript store (SQLite + FTS5).
+
+Completed transcript segments and accumulated chunks are ingested as they are produced,
+tagged with the campaign config and session they came from. Inserts are queued and
+written in batches by a background thread, so the processing loop never waits on disk.
+The database runs in WAL mode, so searches from the main thread don't block the writer.
+
+Queries:
+    search("Captain Vex")                       full-text (FTS5 syntax, ranked by bm25)
+    time_range(session_id, 600, 900)            segments in a time window of a session
+    past_mentions(["Captain Vex"])              snippets from earlier sessions, for prompts
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+STORE_BATCH_SIZE = 200        # Rows written per transaction at most
+SNIPPET_TOKENS = 16           # Words of context around a match in search snippets
+MAX_PAST_MENTIONS = 3         # Snippets from past sessions added to a prompt
+SEGMENT = "segment"
+CHUNK = "chunk"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    campaign TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    audio_source TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    kind TEXT NOT NULL,
+    start REAL,
+    end REAL,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_session_start ON entries(session_id, start);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, content='entries', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def quote_terms(terms: Iterable[str]) -> str:
+    """Builds an FTS5 query matching any of the phrases in `terms`."""
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms if term.strip())
+
+
+class TranscriptStore:
+    """One session's writer into the shared store, plus read queries across all sessions."""
+
+    def __init__(self, path: Path, campaign: str, session_id: str, audio_source: Optional[str] = None):
+        """
+        Args:
+            path (Path): SQLite database file, shared by all sessions.
+            campaign (str): Campaign config the session belongs to (e.g. its path).
+            session_id (str): Unique id of this session (the run timestamp).
+            audio_source (str, optional): Input file, or None for live audio.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.campaign = campaign
+        self.session_id = session_id
+        self.rows_written = 0
+        self._last_segment_end = -1.0
+        self._queue: queue.Queue = queue.Queue()
+        self._read_connection = _connect(path)
+        self._read_connection.executescript(SCHEMA)
+        self._read_connection.execute(
+            "INSERT OR IGNORE INTO sessions (id, campaign, started_at, audio_source) VALUES (?, ?, ?, ?)",
+            (session_id, campaign, time.time(), audio_source))
+        self._read_connection.commit()
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="transcript-store", daemon=True)
+        self._writer.start()
+
+    def _write_loop(self):
+        connection = _connect(self.path)
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < STORE_BATCH_SIZE and not self._queue.empty():
+                rows.append(self._queue.get())
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            with connection:
+                connection.executemany(
+                    "INSERT INTO entries (session_id, kind, start, end, created_at, text) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.rows_written += len(rows)
+            for _ in range(len(rows) + stop):
+                self._queue.task_done()
+            if stop:
+                break
+        connection.close()
+
+    def add_segments(self, segments: List[Dict[str, Any]]):
+        """Queues the completed segments of a server segment list that haven't been stored yet."""
+        now = time.time()
+        for segment in segments:
+            end = float(segment["end"])
+            if segment.get("completed", False) and end > self._last_segment_end:
+                self._last_segment_end = end
+                self._queue.put((self.session_id, SEGMENT, float(segment["start"]), end, now, segment["text"].strip()))
+
+    def add_chunk(self, text: str):
+        """Queues an accumulated chunk."""
+        self._queue.put((self.session_id, CHUNK, None, None, time.time(), text))
+
+    def flush(self):
+        """Blocks until everything queued so far is written."""
+        self._queue.join()
+
+    def close(self):
+        """Writes the remaining rows and stops the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+        self._read_connection.close()
+
+    def _query(self, sql: str, parameters: tuple) -> List[Dict[str, Any]]:
+        with self._read_lock:
+            return [dict(row) for row in self._read_connection.execute(sql, parameters)]
+
+    def search(self, query: str, limit: int = 20, kind: str = SEGMENT, campaign: Optional[str] = None,
+               exclude_session: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Full-text search, best matches first.
+
+        Args:
+            query (str): FTS5 query (words, "phrases", OR, NEAR, prefix*).
+            limit (int): Maximum results.
+            kind (str): SEGMENT or CHUNK entries.
+            campaign (str, optional): Restrict to one campaign; None searches all.
+            exclude_session (str, optional): Leave out one session (e.g. the current one).
+
+        Returns:
+            List[Dict[str, Any]]: session_id, started_at, start, end, text and a highlighted snippet.
+        """
+        return self._query(
+            f"""SELECT e.session_id, s.started_at, e.start, e.end, e.text,
+                       snippet(entries_fts, 0, '**', '**', '...', {SNIPPET_TOKENS}) AS snippet
+                FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid JOIN sessions s ON s.id = e.session_id
+                WHERE entries_fts MATCH ? AND e.kind = ? AND (? IS NULL OR s.campaign = ?) AND (? IS NULL OR e.session_id != ?)
+                ORDER BY bm25(entries_fts) LIMIT ?""",
+            (query, kind, campaign, campaign, exclude_session, exclude_session, limit))
+
+    def time_range(self, session_id: str, start: float, end: float) -> List[Dict[str, Any]]:
+        """Segments of a session overlapping [start, end] seconds, in order."""
+        return self._query(
+            "SELECT start, end, text FROM entries WHERE session_id = ? AND kind = ? AND end >= ? AND start <= ? ORDER BY start",
+            (session_id, SEGMENT, start, end))
+
+    def sessions(self, campaign: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Stored sessions, newest first."""
+        return self._query(
+            "SELECT id, campaign, started_at, audio_source FROM sessions WHERE ? IS NULL OR campaign = ? ORDER BY started_at DESC",
+            (campaign, campaign))
+
+    def past_mentions(self, terms: List[str], limit: int = MAX_PAST_MENTIONS) -> List[Dict[str, Any]]:
+        """Most relevant segments from earlier sessions of this campaign mentioning any of `terms`."""
+        query = quote_terms(terms)
+        if not query:
+            return []
+        return self.search(query, limit=limit, campaign=self.campaign, exclude_session=self.session_id)
+
+    def format_past_mentions(self, terms: List[str]) -> str:
+        """
+        Formats `past_mentions` as a Markdown block for the prompt.
+
+        Returns:
+            str: The block, or an empty string if nothing matched.
+        """
+        mentions = self.past_mentions(terms)
+        if not mentions:
+            return ""
+        lines = ["**From Earlier Sessions:**"]
+        for mention in mentions:
+            session_date = time.strftime("%Y-%m-%d", time.localtime(mention["started_at"]))
+            lines.append(f"*   {session_date} at {mention['start'] / 60:.0f} min: {mention['snippet']}")
+        logging.debug(f"Added {len(mentions)} past-session snippets for {terms}")
+        return "\n".join(lines) + "\n"
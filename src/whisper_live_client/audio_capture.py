@@ -0,0 +1,240 @@
+"""
+Low-latency live audio capture: PyAudio callback input feeding a ring buffer that a
+dedicated sender thread drains in small packets.
+
+The PortAudio callback only copies bytes into the ring buffer, so it never blocks on
+the network. The sender thread wakes as soon as a full packet is buffered, which keeps
+added latency to about one packet (20-60 ms) instead of the 256 ms of a blocking
+`stream.read(4096)`.
+"""
+
+import logging
+import threading
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+INPUT_BYTES_PER_SAMPLE = 2 # Microphone delivers int16 PCM
+DEFAULT_PACKET_MS = 30
+MIN_PACKET_MS = 10
+MAX_PACKET_MS = 100
+RING_BUFFER_SECONDS = 5.0
+UNDERFLOW_TIMEOUT_PACKETS = 4 # No full packet within this many packet durations counts as an underflow
+
+
+def packet_bytes_for(packet_ms, rate=SAMPLE_RATE):
+    """Bytes of int16 mono audio in one packet of `packet_ms` milliseconds."""
+    if not MIN_PACKET_MS <= packet_ms <= MAX_PACKET_MS:
+        raise ValueError(f"packet_ms must be between {MIN_PACKET_MS} and {MAX_PACKET_MS}, got {packet_ms}")
+    return int(rate * packet_ms / 1000) * INPUT_BYTES_PER_SAMPLE
+
+
+class AudioRingBuffer:
+    """
+    Single-producer / single-consumer byte ring buffer.
+
+    The producer (audio callback) only advances `write_total` and the consumer (sender
+    thread) only advances `read_total`; each index has exactly one writer, so no lock is
+    needed. When the buffer is full, incoming audio is dropped and counted as an overflow
+    rather than blocking the audio callback.
+    """
+
+    def __init__(self, capacity_bytes):
+        self.capacity = capacity_bytes
+        self._buffer = bytearray(capacity_bytes)
+        self.write_total = 0 # Bytes ever written (producer-owned)
+        self.read_total = 0  # Bytes ever read (consumer-owned)
+        self.overflow_bytes = 0
+        self.overflows = 0
+        self.data_ready = threading.Event()
+
+    @property
+    def available(self):
+        return self.write_total - self.read_total
+
+    def write(self, data):
+        """Appends data from the producer; returns False (and counts an overflow) if it doesn't fit."""
+        size = len(data)
+        if size > self.capacity - self.available:
+            self.overflows += 1
+            self.overflow_bytes += size
+            return False
+        start = self.write_total % self.capacity
+        first = min(size, self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        self._buffer[:size - first] = data[first:]
+        self.write_total += size
+        self.data_ready.set()
+        return True
+
+    def read(self, size):
+        """Removes and returns exactly `size` bytes for the consumer, or None if fewer are buffered."""
+        if self.available < size:
+            return None
+        start = self.read_total % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._buffer[start:start + first]) + bytes(self._buffer[:size - first])
+        self.read_total += size
+        return data
+
+    def read_all(self):
+        """Removes and returns everything buffered (used to flush the tail at shutdown)."""
+        return self.read(self.available) or b""
+
+    def publish_statistics(self, input_overflows, underflows, packets_sent):
+        """Called periodically during capture; rings observed from another process record the counters."""
+
+
+class CallbackInputDevice:
+    """Microphone input through a PyAudio callback-mode stream."""
+
+    def __init__(self, pyaudio_instance, ring, rate=SAMPLE_RATE, frames_per_buffer=480, device_index=None):
+        """
+        Args:
+            pyaudio_instance (pyaudio.PyAudio): Shared PyAudio instance.
+            ring (AudioRingBuffer): Buffer the callback writes into.
+            rate (int): Sample rate in Hz.
+            frames_per_buffer (int): Frames per callback; small values lower latency.
+            device_index (int, optional): Input device; None uses the default.
+        """
+        import pyaudio
+        self._pyaudio = pyaudio
+        self.ring = ring
+        self.input_overflows = 0 # PortAudio-reported overruns (audio lost before reaching us)
+        self.stream = pyaudio_instance.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=self._callback,
+            start=False,
+        )
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        if status_flags & self._pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self.ring.write(in_data)
+        return (None, self._pyaudio.paContinue)
+
+    def start(self):
+        self.stream.start_stream()
+
+    def is_active(self):
+        return self.stream.is_active()
+
+    def stop(self):
+        self.stream.stop_stream()
+        self.stream.close()
+
+
+class FileInputDevice:
+    """
+    Fake input device that plays a 16 kHz mono int16 WAV file into the ring buffer in real time,
+    the same way the PyAudio callback would. Used to test live mode without a microphone.
+    """
+
+    def __init__(self, path, ring, frames_per_buffer=480, realtime=True):
+        self.path = path
+        self.ring = ring
+        self.frames_per_buffer = frames_per_buffer
+        self.realtime = realtime
+        self.input_overflows = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fake-input-device", daemon=True)
+
+    def _run(self):
+        with wave.open(self.path, "rb") as wav_file:
+            if wav_file.getframerate() != SAMPLE_RATE or wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                logging.error(f"FileInputDevice needs 16 kHz mono 16-bit audio: {self.path}")
+                return
+            period = self.frames_per_buffer / SAMPLE_RATE
+            next_callback_at = time.monotonic()
+            while not self._stop.is_set():
+                data = wav_file.readframes(self.frames_per_buffer)
+                if not data:
+                    break
+                if self.realtime:
+                    next_callback_at += period
+                    time.sleep(max(0.0, next_callback_at - time.monotonic()))
+                self.ring.write(data)
+        self.ring.data_ready.set()
+
+    def start(self):
+        self._thread.start()
+
+    def is_active(self):
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class LiveAudioSender:
+    """Sender thread: takes fixed-size packets from the ring buffer and sends them as float32 samples."""
+
+    def __init__(self, ring, send_fn, packet_ms=DEFAULT_PACKET_MS, rate=SAMPLE_RATE):
+        """
+        Args:
+            ring (AudioRingBuffer): Buffer filled by the input device.
+            send_fn (Callable[[np.ndarray], None]): Sends one packet of float32 samples (e.g. `send_audio`).
+            packet_ms (int): Packet duration in milliseconds.
+            rate (int): Sample rate in Hz.
+        """
+        self.ring = ring
+        self.send_fn = send_fn
+        self.packet_bytes = packet_bytes_for(packet_ms, rate)
+        self.packet_seconds = packet_ms / 1000
+        self.packets_sent = 0
+        self.underflows = 0
+        self.started_at = None
+        self.first_packet_latency = None # Seconds from start until the first packet was sent
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-audio-sender", daemon=True)
+
+    def _send(self, data):
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        self.send_fn(samples)
+        self.packets_sent += 1
+        if self.first_packet_latency is None:
+            self.first_packet_latency = time.monotonic() - self.started_at
+
+    def _run(self):
+        wait_timeout = self.packet_seconds * UNDERFLOW_TIMEOUT_PACKETS
+        while not self._stop.is_set():
+            data = self.ring.read(self.packet_bytes)
+            if data is not None:
+                self._send(data)
+                continue
+            self.ring.data_ready.clear()
+            if self.ring.available >= self.packet_bytes:
+                continue # Producer wrote between the read and the clear
+            if not self.ring.data_ready.wait(wait_timeout) and not self._stop.is_set():
+                self.underflows += 1
+        tail = self.ring.read_all()
+        if tail:
+            self._send(tail)
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread.start()
+
+    def stop(self):
+        """Sends whatever is still buffered, then stops the thread."""
+        self._stop.set()
+        self.ring.data_ready.set()
+        self._thread.join()
+
+    def statistics(self):
+        return {
+            "packets_sent": self.packets_sent,
+            "packet_ms": round(self.packet_seconds * 1000),
+            "ring_overflows": self.ring.overflows,
+            "ring_overflow_bytes": self.ring.overflow_bytes,
+            "underflows": self.underflows,
+            "first_packet_latency_ms": None if self.first_packet_latency is None else round(self.first_packet_latency * 1000, 1),
+        }
@@ -0,0 +1,263 @@
+"""
+Batch transcription of recorded sessions.
+
+Streaming a recording through one websocket takes as long as the recording. For
+after-the-fact transcripts the recording is instead split offline on silence boundaries
+(vectorized energy VAD), the spans are sent as fast as the servers accept them over
+several concurrent connections, and the returned segments are shifted back onto the
+recording's timeline and written as one SRT or JSONL file.
+
+    python -m whisper_live_client.batch session.wav --workers 4 --output session.srt
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+from . import utils
+from .client import Client
+from .transcript_export import JsonlWriter
+from .vad_gate import MAX_SPEECH_DBFS_FLOOR, MIN_SPEECH_DBFS
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+SPEECH_MARGIN_DB = 10.0     # Frames this far above the recording's noise floor count as speech
+NOISE_FLOOR_PERCENTILE = 10
+MIN_SILENCE_SECONDS = 0.3   # Shortest pause that may be used as a cut point
+MIN_SPAN_SECONDS = 10.0     # Spans are cut at the first pause after this long...
+MAX_SPAN_SECONDS = 30.0     # ...and at the quietest frame if there is no pause before this
+SEND_CHUNK_SECONDS = 1.0
+SERVER_READY_TIMEOUT_SECONDS = 30.0
+SPAN_IDLE_SECONDS = 2.0     # A span is done once its segments reach the end and nothing new arrived for this long
+SPAN_STALL_SECONDS = 15.0   # ...or once nothing at all has arrived for this long (e.g. trailing silence)
+SPAN_TIMEOUT_SECONDS = 300.0
+WAIT_RETRY_SECONDS = 5.0    # Back off when a server reports it is full
+MAX_SPAN_ATTEMPTS = 3
+DEFAULT_WORKERS = 4
+
+
+def load_audio(path):
+    """Decodes any audio file to 16 kHz mono float32 samples."""
+    resampled_path = utils.resample(path)
+    with wave.open(resampled_path, "rb") as wav_file:
+        pcm = wav_file.readframes(wav_file.getnframes())
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def frame_levels_db(samples, frame_samples):
+    """RMS level in dBFS of each whole frame."""
+    frame_count = len(samples) // frame_samples
+    frames = samples[:frame_count * frame_samples].reshape(frame_count, frame_samples)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def split_on_silence(samples, rate=SAMPLE_RATE, min_span=MIN_SPAN_SECONDS, max_span=MAX_SPAN_SECONDS,
+                     min_silence=MIN_SILENCE_SECONDS):
+    """
+    Splits a recording into spans for independent transcription, cutting in pauses.
+
+    Args:
+        samples (np.ndarray): float32 mono samples.
+        rate (int): Sample rate in Hz.
+        min_span (float): Seconds before a pause may end a span.
+        max_span (float): Longest span in seconds.
+        min_silence (float): Shortest pause (seconds) used as a cut point.
+
+    Returns:
+        list: (start_sample, end_sample) spans containing speech, in order.
+    """
+    frame_samples = int(rate * FRAME_MS / 1000)
+    levels = frame_levels_db(samples, frame_samples)
+    if not len(levels):
+        return [(0, len(samples))] if len(samples) else []
+    threshold = np.percentile(levels, NOISE_FLOOR_PERCENTILE) + SPEECH_MARGIN_DB
+    speech = levels >= min(max(threshold, MIN_SPEECH_DBFS), MAX_SPEECH_DBFS_FLOOR)
+
+    # Centres of silent runs at least `min_silence` long, in samples
+    edges = np.diff(np.concatenate(([0], (~speech).astype(np.int8), [0])))
+    run_starts, run_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    long_runs = run_ends - run_starts >= int(min_silence * 1000 / FRAME_MS)
+    cuts = ((run_starts[long_runs] + run_ends[long_runs]) // 2) * frame_samples
+
+    spans = []
+    start = 0
+    total = len(samples)
+    while total - start > max_span * rate:
+        low, high = start + int(min_span * rate), start + int(max_span * rate)
+        index = np.searchsorted(cuts, low)
+        if index < len(cuts) and cuts[index] <= high:
+            end = int(cuts[index])
+        else:
+            quietest = np.argmin(levels[low // frame_samples:high // frame_samples])
+            end = (low // frame_samples + int(quietest)) * frame_samples
+        spans.append((start, end))
+        start = end
+    spans.append((start, total))
+    # Spans without a single speech frame are not worth a server round trip
+    return [(s, e) for s, e in spans if speech[s // frame_samples:max(e // frame_samples, s // frame_samples + 1)].any()]
+
+
+def write_transcript(segments, path):
+    """Writes segments as JSONL if `path` ends in .jsonl, otherwise as SRT."""
+    if str(path).endswith(".jsonl"):
+        writer = JsonlWriter(path)
+        for segment in segments:
+            writer.write(segment)
+        writer.file.close()
+    else:
+        utils.create_srt_file(segments, path)
+
+
+class BatchTranscriber:
+    """Transcribes a recording by fanning silence-delimited spans out over concurrent connections."""
+
+    def __init__(self, servers, workers=DEFAULT_WORKERS, **client_args):
+        """
+        Args:
+            servers (list): (host, port) pairs; workers are spread over them round-robin.
+            workers (int): Concurrent server connections.
+            **client_args: Passed to each `Client` (lang, model, use_vad, ...).
+        """
+        self.servers = servers
+        self.workers = workers
+        self.client_args = client_args
+        self.retries = 0
+        self.failed_spans = 0
+        self.statistics = None
+        self._lock = threading.Lock() # Guards the counters updated by the worker threads
+
+    def _transcribe_span(self, server, samples, start_seconds):
+        """
+        Sends one span over a fresh connection.
+
+        Returns:
+            list or None: Segments on the recording's timeline, or None if the server was
+                full or failed (the span should be retried).
+        """
+        client = Client(*server, log_transcription=False, **self.client_args)
+        client.session_offset = start_seconds
+        ready_deadline = time.monotonic() + SERVER_READY_TIMEOUT_SECONDS
+        while not client.recording:
+            if client.waiting or client.server_error or time.monotonic() > ready_deadline:
+                client.close_websocket()
+                return None
+            time.sleep(0.01)
+
+        chunk = int(SEND_CHUNK_SECONDS * SAMPLE_RATE)
+        for offset in range(0, len(samples), chunk):
+            client.send_audio(samples[offset:offset + chunk])
+        client.send_packet_to_server(Client.END_OF_AUDIO.encode("utf-8"))
+
+        span_deadline = time.monotonic() + SPAN_TIMEOUT_SECONDS
+        while client.recording and not client.server_error and time.monotonic() < span_deadline:
+            idle = time.time() - (client.last_response_received or time.time())
+            caught_up = client.last_segment_end >= client.audio_seconds_sent - 1.0
+            if (caught_up and idle >= SPAN_IDLE_SECONDS) or idle >= SPAN_STALL_SECONDS:
+                break
+            time.sleep(0.1)
+        failed = client.server_error
+        client.close_websocket()
+        if failed:
+            return None
+
+        segments = list(client.transcript)
+        last = client.last_segment
+        if last is not None and (not segments or float(last["start"]) >= float(segments[-1]["end"])):
+            segments.append(last)
+        return segments
+
+    def _worker(self, server, jobs, results):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            index, samples, start_seconds, attempt = job
+            segments = self._transcribe_span(server, samples, start_seconds)
+            if segments is not None:
+                results[index] = segments
+            elif attempt < MAX_SPAN_ATTEMPTS:
+                with self._lock:
+                    self.retries += 1
+                time.sleep(WAIT_RETRY_SECONDS)
+                jobs.put((index, samples, start_seconds, attempt + 1))
+            else:
+                with self._lock:
+                    self.failed_spans += 1
+                logging.error(f"Span {index} at {start_seconds:.1f}s failed after {attempt} attempts on {server}")
+            jobs.task_done()
+
+    def transcribe(self, audio_path):
+        """
+        Transcribes a recording.
+
+        Args:
+            audio_path (str): Any audio file PyAV can decode.
+
+        Returns:
+            list: Segment dicts (start, end, text) on the recording's timeline, in order.
+        """
+        started_at = time.monotonic()
+        samples = load_audio(audio_path)
+        spans = split_on_silence(samples)
+        logging.info(f"Split {len(samples) / SAMPLE_RATE:.0f}s of audio into {len(spans)} spans")
+
+        jobs = queue.Queue()
+        results = {}
+        for index, (start, end) in enumerate(spans):
+            jobs.put((index, samples[start:end], start / SAMPLE_RATE, 1))
+        threads = [
+            threading.Thread(target=self._worker, args=(self.servers[i % len(self.servers)], jobs, results),
+                             name=f"batch-worker-{i}", daemon=True)
+            for i in range(min(self.workers, len(spans)))
+        ]
+        for thread in threads:
+            thread.start()
+        jobs.join()
+        for _ in threads:
+            jobs.put(None)
+        for thread in threads:
+            thread.join()
+
+        segments = [segment for index in sorted(results) for segment in results[index]]
+        audio_seconds = len(samples) / SAMPLE_RATE
+        wall_seconds = time.monotonic() - started_at
+        self.statistics = {
+            "audio_seconds": round(audio_seconds, 1),
+            "wall_seconds": round(wall_seconds, 1),
+            "speedup": round(audio_seconds / wall_seconds, 2) if wall_seconds else None,
+            "spans": len(spans),
+            "speech_seconds": round(sum(end - start for start, end in spans) / SAMPLE_RATE, 1),
+            "retries": self.retries,
+            "failed_spans": self.failed_spans,
+        }
+        logging.info(f"Batch transcription: {self.statistics}")
+        return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a recording in parallel over WhisperLive servers.")
+    parser.add_argument("audio", help="Recording to transcribe")
+    parser.add_argument("--output", default="output.srt", help="Output file (.srt or .jsonl)")
+    parser.add_argument("--server", action="append", default=None,
+                        help="host:port of a server; repeat for several (default localhost:9090)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent connections")
+    parser.add_argument("--model", default="large-v3")
+    parser.add_argument("--lang", default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    servers = [(host, int(port)) for host, port in (s.rsplit(":", 1) for s in args.server or ["localhost:9090"])]
+    transcriber = BatchTranscriber(servers, workers=args.workers, lang=args.lang, model=args.model)
+    segments = transcriber.transcribe(args.audio)
+    write_transcript(segments, args.output)
+    logging.info(f"Wrote {len(segments)} segments to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Live capture and sending in a dedicated process, isolated from the main interpreter's GIL.
+
+In the default live mode the PortAudio callback, the sender thread and the websocket
+callbacks share one interpreter with accumulation, logging and LLM response handling,
+so a slow step in the main process can delay capture and send. `CaptureProcess` runs
+the capture device, the sender and the websocket client(s) in a child process instead:
+
+    * PCM goes from the capture callback to the sender through a `SharedAudioRing`, an
+      `AudioRingBuffer` over `multiprocessing.shared_memory`. The parent owns the block and
+      reads its counters (captured and sent audio, ring/input overflows, underflows) live,
+      without a round trip to the child.
+    * Transcript deltas (segments that are new or changed since the last update) come
+      back over a `multiprocessing.Pipe`, as do the child's final statistics. The parent
+      only forwards them to its output queue.
+"""
+
+import logging
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .audio_capture import INPUT_BYTES_PER_SAMPLE, RING_BUFFER_SECONDS, SAMPLE_RATE, AudioRingBuffer
+
+COUNTERS = ("capacity", "write_total", "read_total", "overflows", "overflow_bytes",
+            "input_overflows", "underflows", "packets_sent")
+HEADER_BYTES = 8 * len(COUNTERS)
+START, STOP = "start", "stop"                        # Parent -> child
+SEGMENTS, END, STATISTICS = "segments", "end", "statistics" # Child -> parent
+CHILD_READY_POLL_SECONDS = 0.1
+
+
+def _counter(index):
+    return property(lambda self: int(self._counters[index]),
+                    lambda self, value: self._counters.__setitem__(index, value))
+
+
+class SharedAudioRing(AudioRingBuffer):
+    """
+    `AudioRingBuffer` whose bytes and counters live in a shared memory block.
+
+    Producer and consumer are both in the capture process; the parent creates the block
+    and reads the counters. Each counter still has a single writer, so no lock is needed.
+    """
+
+    write_total = _counter(COUNTERS.index("write_total"))
+    read_total = _counter(COUNTERS.index("read_total"))
+    overflows = _counter(COUNTERS.index("overflows"))
+    overflow_bytes = _counter(COUNTERS.index("overflow_bytes"))
+
+    def __init__(self, capacity_bytes=0, name=None):
+        """
+        Args:
+            capacity_bytes (int): Ring size when creating the block.
+            name (str, optional): Name of an existing block to attach to (in the child); None creates one.
+        """
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=HEADER_BYTES + capacity_bytes if self.owner else 0)
+        self._counters = np.ndarray((len(COUNTERS),), dtype=np.int64, buffer=self.shm.buf)
+        if self.owner:
+            self._counters[:] = 0
+            self._counters[0] = capacity_bytes
+        self.capacity = int(self._counters[0])
+        self._buffer = self.shm.buf[HEADER_BYTES:HEADER_BYTES + self.capacity]
+        self.data_ready = threading.Event() # Process-local: producer and consumer share the capture process
+        self.final_statistics = None
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish_statistics(self, input_overflows, underflows, packets_sent):
+        self._counters[COUNTERS.index("input_overflows")] = input_overflows
+        self._counters[COUNTERS.index("underflows")] = underflows
+        self._counters[COUNTERS.index("packets_sent")] = packets_sent
+
+    def statistics(self):
+        """Counter snapshot, with the byte totals converted to seconds of audio (the last one once closed)."""
+        if self._counters is None:
+            return self.final_statistics
+        counters = dict(zip(COUNTERS, (int(value) for value in self._counters)))
+        bytes_per_second = SAMPLE_RATE * INPUT_BYTES_PER_SAMPLE
+        return {
+            "captured_seconds": round(counters["write_total"] / bytes_per_second, 2),
+            "buffered_seconds": round((counters["write_total"] - counters["read_total"]) / bytes_per_second, 3),
+            "ring_overflows": counters["overflows"],
+            "ring_overflow_seconds": round(counters["overflow_bytes"] / bytes_per_second, 3),
+            "input_overflows": counters["input_overflows"],
+            "underflows": counters["underflows"],
+            "packets_sent": counters["packets_sent"],
+        }
+
+    def close(self):
+        """Detaches from the block; the owner also frees it."""
+        self.final_statistics = self.statistics()
+        self._counters = None
+        self._buffer.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class PipeOutputQueue:
+    """Stands in for a client's output queue in the child: sends only new or changed segments to the parent."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._sent = {} # Segment start -> (end, text, completed) as last sent
+        self._lock = threading.Lock() # Several websocket threads may put (server pools)
+
+    def put(self, segments):
+        with self._lock:
+            if segments is None:
+                self.connection.send((END, None))
+                return
+            delta = []
+            for segment in segments:
+                key = (segment["end"], segment["text"], segment.get("completed", False))
+                if self._sent.get(segment["start"]) != key:
+                    self._sent[segment["start"]] = key
+                    delta.append(segment)
+            # Segments before the server's window can't change any more
+            oldest = min(segment["start"] for segment in segments)
+            self._sent = {start: key for start, key in self._sent.items() if float(start) >= float(oldest)}
+            if delta:
+                self.connection.send((SEGMENTS, delta))
+
+
+def _client_statistics(transcription_client):
+    statistics = {"live": transcription_client.live_statistics,
+                  "clients": {client.uid: client.send_statistics() for client in transcription_client.clients}}
+    if transcription_client.vad_gate:
+        statistics["vad_gate"] = transcription_client.vad_gate.statistics()
+    if transcription_client.router:
+        statistics["routing"] = transcription_client.router.statistics()
+    for client in transcription_client.clients:
+        if client.reconnect:
+            statistics.setdefault("reconnect", {})[client.uid] = client.reconnect_stats.summary(client.replay_buffer)
+    if transcription_client.exporter:
+        statistics["exported"] = dict(transcription_client.exporter.paths,
+                                      segments=transcription_client.exporter.segments_written)
+    return statistics
+
+
+def _listen_for_stop(connection, transcription_client):
+    if connection.recv() == STOP:
+        transcription_client.stop_live()
+
+
+def _capture_main(ring_name, connection, host, port, client_args):
+    """Child process: connects, waits for START, captures and sends until the session or a STOP ends it."""
+    from .client import TranscriptionClient # pyaudio and the websocket stack only load in the child
+
+    ring = SharedAudioRing(name=ring_name)
+    transcription_client = TranscriptionClient(host, port, output_queue=PipeOutputQueue(connection),
+                                               live_ring=ring, **client_args)
+    if connection.recv() == START:
+        # STOP arrives while record_live runs
+        threading.Thread(target=_listen_for_stop, args=(connection, transcription_client),
+                         name="capture-control", daemon=True).start()
+        transcription_client()
+    connection.send((STATISTICS, _client_statistics(transcription_client)))
+    transcription_client.close_all_clients()
+    ring.close()
+    connection.close()
+
+
+class CaptureProcess:
+    """
+    Live transcription with capture and sending in a child process.
+
+    Used like a `TranscriptionClient` in live mode: call it (on a thread) to stream until
+    the session ends, and `stop_live()` to end it. Segments arrive on `output_queue`.
+    """
+
+    def __init__(self, host, port, output_queue, ring_seconds=RING_BUFFER_SECONDS, **client_args):
+        """
+        Args:
+            host (str): Transcription server host.
+            port (int): Transcription server port.
+            output_queue (queue.Queue): Receives segment lists, then None at the end.
+            ring_seconds (float): Audio the shared ring holds before it overflows.
+            **client_args: Picklable `TranscriptionClient` arguments (live_packet_ms is required).
+        """
+        self.output_queue = output_queue
+        self.ring = SharedAudioRing(int(SAMPLE_RATE * ring_seconds) * INPUT_BYTES_PER_SAMPLE)
+        self.connection, child_connection = multiprocessing.Pipe()
+        # spawn: forking a parent that already runs threads can deadlock the child
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_capture_main, args=(self.ring.name, child_connection, host, port, client_args),
+            name="audio-capture", daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.clients = []     # The websocket clients live in the child
+        self.vad_gate = None  # ...and so does the gate; its statistics come back in child_statistics
+        self.router = None
+        self.exporter = None  # ...and the transcript export (see child_statistics["exported"])
+        self.playback_statistics = None
+        self.live_statistics = None
+        self.child_statistics = None
+        self.segment_updates = 0
+        self._ring_closed = False
+
+    def capture_statistics(self):
+        """Live counters read from the shared ring (no round trip to the child)."""
+        return self.ring.statistics()
+
+    def __call__(self):
+        """Starts streaming and forwards transcript deltas until the child reports the end."""
+        self.connection.send(START)
+        while True:
+            if not self.connection.poll(CHILD_READY_POLL_SECONDS):
+                if not self.process.is_alive():
+                    logging.error(f"Capture process exited unexpectedly (exit code {self.process.exitcode}).")
+                    self.output_queue.put(None)
+                    break
+                continue
+            kind, payload = self.connection.recv()
+            if kind == SEGMENTS:
+                self.segment_updates += 1
+                self.output_queue.put(payload)
+            elif kind == END:
+                self.output_queue.put(None)
+            elif kind == STATISTICS:
+                self.child_statistics = payload
+                break
+        self.process.join(timeout=5.0)
+        child_live_statistics = (self.child_statistics or {}).get("live") or {}
+        self.live_statistics = dict(child_live_statistics, **self.capture_statistics(),
+                                    segment_updates=self.segment_updates)
+        logging.info(f"Capture process finished: {self.live_statistics}")
+        self._close_ring()
+
+    def stop_live(self):
+        """Asks the child to stop capturing and flush."""
+        if self.process.is_alive():
+            self.connection.send(STOP)
+
+    def close_all_clients(self):
+        """Stops the child if it is still running and frees the shared ring."""
+        if self.process.is_alive():
+            self.stop_live()
+            self.process.join(timeout=5.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._close_ring()
+
+    def _close_ring(self):
+        if not self._ring_closed:
+            self._ring_closed = True
+            self.ring.close()
@@ -9,10 +9,24 @@ import threading
 import json
 import websocket
 import uuid
+from collections import deque
 import time
+import bisect
 import av
 # Adjusted import path assuming utils.py is in the same directory
 from . import utils
+from . import wire_format
+from .monitor_playback import JitterStats, MonitorPlayback
+from .reconnect import MAX_RECONNECT_ATTEMPTS, ReconnectStats, ReplayBuffer, backoff_delays
+from .routing import LeastLatencyRouter
+from .transcript_export import TRANSCRIPT_WINDOW_SEGMENTS, IncrementalTranscriptExporter
+from .audio_capture import (AudioRingBuffer, CallbackInputDevice, FileInputDevice, LiveAudioSender,
+                            RING_BUFFER_SECONDS, INPUT_BYTES_PER_SAMPLE)
+
+SAMPLE_RATE = 16000
+MAX_TRACKED_PACKETS = 4096 # Sent-packet timestamps kept for server latency tracing
+RECONNECT_READY_TIMEOUT_SECONDS = 15.0 # Wait for SERVER_READY on each reconnection attempt
+SERVER_LATENCY_EWMA_ALPHA = 0.2 # Weight of the newest sample in the per-server segment latency estimate
 
 
 class Client:
@@ -35,6 +49,9 @@ class Client:
         max_clients=4,
         max_connection_time=600,
         output_queue=None,
+        tracer=None,
+        allow_compressed_audio=False,
+        reconnect=False,
     ):
         """
         Initializes a Client instance for audio recording and streaming to a server.
@@ -55,6 +72,9 @@ class Client:
             max_clients (int, optional): Maximum number of client connections allowed. Default is 4.
             max_connection_time (int, optional): Maximum allowed connection time in seconds. Default is 600.
             output_queue (queue.Queue, optional): Queue to put received transcript segments onto. Default is None.
+            tracer (PipelineTracer, optional): Records send, server and decode latencies. Default is None.
+            allow_compressed_audio (bool, optional): Also offer Opus to the server (for remote servers on slow links). Default is False.
+            reconnect (bool, optional): Reconnect with backoff if the websocket drops, replaying unacknowledged audio. Default is False.
         """
         self.recording = False
         self.task = "transcribe"
@@ -73,37 +93,78 @@ class Client:
         self.max_clients = max_clients
         self.max_connection_time = max_connection_time
         self.output_queue = output_queue
+        self.tracer = tracer
+        # Send counters and audio offsets, read by the metrics endpoint
+        self.server_url = f"{host}:{port}"
+        self.bytes_sent = 0
+        self.send_errors = 0
+        self.last_segment_end = 0.0
+        self.first_send_at = None
+        # Sample format on the wire: float32 until the server confirms one of the offered formats
+        self.offered_audio_formats = wire_format.offered_formats(allow_compressed_audio)
+        self.audio_format = wire_format.DEFAULT_FORMAT
+        self._opus_encoder = None
+        # Cumulative audio seconds at the end of each sent packet, and when it was sent
+        self.audio_seconds_sent = 0.0
+        self._sent_audio_ends = []
+        self._sent_times = []
+        self._last_traced_end = 0.0
+        # Server speed, used to rank servers when routing: handshake time and segment latency EWMA
+        self.ready_latency = None
+        self.server_latency = None
+        self._connect_started_at = None
+        # Reconnection: audio not yet covered by a completed segment is kept for replay
+        self.reconnect = reconnect
+        self.replay_buffer = ReplayBuffer()
+        self.reconnect_stats = ReconnectStats()
+        self.connected = False
+        self.reconnecting = False
+        self.closing = False
+        self.end_of_audio_sent = False # The server closes the socket after END_OF_AUDIO; that is not a drop
+        self.time_offset = 0.0 # Offset in this client's sent audio of the current connection's t=0
+        self.session_offset = 0.0 # This client's sent audio -> session timeline (set when routing)
+        self.time_map = None # Session timeline -> real audio time, when a VAD gate removes silence before sending
+        self.resume_offset = 0.0 # Real audio already transcribed before this session (resuming); added last
+        self.forward_segments = True # False while a router sends this client's pool another server's audio
+        self._server_ready = threading.Event()
+        self._send_lock = threading.Lock()
+        self._disconnected_at = None
 
         if translate:
             self.task = "translate"
 
         self.audio_bytes = None
+        self.transcript = []
+        self.exporter = None # The session's IncrementalTranscriptExporter, set by a TranscriptionTeeClient
 
-        if host is not None and port is not None:
-            socket_url = f"ws://{host}:{port}"
-            self.client_socket = websocket.WebSocketApp(
-                socket_url,
-                on_open=lambda ws: self.on_open(ws),
-                on_message=lambda ws, message: self.on_message(ws, message),
-                on_error=lambda ws, error: self.on_error(ws, error),
-                on_close=lambda ws, close_status_code, close_msg: self.on_close(
-                    ws, close_status_code, close_msg
-                ),
-            )
-        else:
+        if host is None or port is None:
             print("[ERROR]: No host or port specified.")
             return
+        self.socket_url = f"ws://{host}:{port}"
 
         Client.INSTANCES[self.uid] = self
 
+        self._connect()
+        print("[INFO]: * recording")
+
+    def _connect(self):
+        """Creates the websocket and runs it on a background thread."""
+        self._connect_started_at = time.monotonic()
+        self.client_socket = websocket.WebSocketApp(
+            self.socket_url,
+            on_open=lambda ws: self.on_open(ws),
+            on_message=lambda ws, message: self.on_message(ws, message),
+            on_error=lambda ws, error: self.on_error(ws, error),
+            on_close=lambda ws, close_status_code, close_msg: self.on_close(
+                ws, close_status_code, close_msg
+            ),
+        )
+
         # start websocket client in a thread
-        self.ws_thread = threading.Thread(target=self.client_socket.run_forever)
+        self.ws_thread = threading.Thread(target=self.client_socket.run_forever, name=f"websocket-{self.uid[:8]}")
         self.ws_thread.setDaemon(True)
         self.ws_thread.start()
 
-        self.transcript = []
-        print("[INFO]: * recording")
-
     def handle_status_messages(self, message_data):
         """Handles server status messages."""
         status = message_data["status"]
@@ -116,8 +177,49 @@ class Client:
         elif status == "WARNING":
             print(f"Message from Server: {message_data['message']}")
 
+    def _measure_server_latency(self, end_time):
+        """Measures the time from sending the audio at `end_time` (sent-audio seconds) to receiving its segment."""
+        if end_time <= self._last_traced_end or not self._sent_audio_ends:
+            return
+        self._last_traced_end = end_time
+        index = bisect.bisect_left(self._sent_audio_ends, end_time)
+        if index >= len(self._sent_times):
+            return
+        latency = time.perf_counter() - self._sent_times[index]
+        if self.server_latency is None:
+            self.server_latency = latency
+        else:
+            self.server_latency += SERVER_LATENCY_EWMA_ALPHA * (latency - self.server_latency)
+        if self.tracer:
+            self.tracer.record_since("server", self._sent_times[index])
+
+    def _shift_segments(self, segments, offset):
+        """Moves segment times by `offset` seconds (reconnected or routed sessions)."""
+        return [
+            dict(seg, start=f"{float(seg['start']) + offset:.3f}", end=f"{float(seg['end']) + offset:.3f}")
+            for seg in segments
+        ]
+
     def process_segments(self, segments):
         """Processes transcript segments."""
+        if segments:
+            sent_end = float(segments[-1].get("end", 0.0)) + self.time_offset
+            self.last_segment_end = max(self.last_segment_end, sent_end)
+            self._measure_server_latency(sent_end)
+        if self.reconnect:
+            completed_ends = [float(seg["end"]) for seg in segments if seg.get("completed", False)]
+            if completed_ends:
+                self.replay_buffer.acknowledge(max(completed_ends) + self.time_offset)
+        if self.time_offset + self.session_offset:
+            segments = self._shift_segments(segments, self.time_offset + self.session_offset)
+        if self.time_map:
+            segments = [
+                dict(seg, start=f"{self.time_map(float(seg['start'])):.3f}",
+                     end=f"{self.time_map(float(seg['end']), is_end=True):.3f}")
+                for seg in segments
+            ]
+        if self.resume_offset:
+            segments = self._shift_segments(segments, self.resume_offset)
         text = []
         for i, seg in enumerate(segments):
             if not text or text[-1] != seg["text"]:
@@ -128,16 +230,20 @@ class Client:
                       (not self.transcript or
                         float(seg['start']) >= float(self.transcript[-1]['end']))):
                     self.transcript.append(seg)
+                    if self.exporter and self.forward_segments:
+                        self.exporter.append(seg)
         # update last received segment and last valid response time
         if self.last_received_segment is None or self.last_received_segment != segments[-1]["text"]:
             self.last_response_received = time.time()
             self.last_received_segment = segments[-1]["text"]
 
         # Put the latest segment list onto the output queue if it exists
-        if self.output_queue and segments:
+        if self.output_queue and segments and self.forward_segments:
             # Send the full segment list for potential context/reconstruction
             # The receiver (accumulator) will need to handle this list
             # and figure out which parts are new/completed.
+            if self.tracer:
+                self.tracer.stamp(segments)
             self.output_queue.put(segments) # Put the list of dicts
 
         # Original logging is now disabled if queue is used, handled externally
@@ -160,7 +266,12 @@ class Client:
             message (str): The received message from the server.
 
         """
-        message = json.loads(message)
+        if self.tracer:
+            decode_started_at = self.tracer.now()
+            message = json.loads(message)
+            self.tracer.record_since("decode", decode_started_at)
+        else:
+            message = json.loads(message)
 
         if self.uid != message.get("uid"):
             print("[ERROR]: invalid client uid")
@@ -172,13 +283,21 @@ class Client:
 
         if "message" in message.keys() and message["message"] == "DISCONNECT":
             print("[INFO]: Server disconnected due to overtime.")
-            self.recording = False
+            if not self.reconnect:
+                self.recording = False
 
         if "message" in message.keys() and message["message"] == "SERVER_READY":
             self.last_response_received = time.time()
+            self.ready_latency = time.monotonic() - self._connect_started_at
+            self.audio_format = wire_format.negotiated_format(message, self.offered_audio_formats)
+            if self.audio_format == wire_format.OPUS:
+                self._opus_encoder = wire_format.OpusStreamEncoder()
             self.recording = True
+            if not self.reconnecting:
+                self.connected = True
+            self._server_ready.set()
             self.server_backend = message["backend"]
-            print(f"[INFO]: Server Running with backend {self.server_backend}")
+            print(f"[INFO]: Server Running with backend {self.server_backend}, audio format {self.audio_format}")
             return
 
         if "language" in message.keys():
@@ -198,16 +317,81 @@ class Client:
         self.error_message = error
 
     def on_close(self, ws, close_status_code, close_msg):
+        if ws is not self.client_socket:
+            return # A socket replaced by a reconnection
         print(f"[INFO]: Websocket connection closed: {close_status_code}: {close_msg}")
-        self.recording = False
+        self.connected = False
         self.waiting = False
+        if self.reconnect and self.recording and not self.closing and not self.end_of_audio_sent:
+            self._start_reconnect()
+            return
+        self.recording = False
+
+    def _start_reconnect(self):
+        """Starts the reconnection thread; audio keeps being buffered while it runs."""
+        if self.reconnecting:
+            return
+        self.reconnecting = True
+        self.reconnect_stats.disconnects += 1
+        self._disconnected_at = time.monotonic()
+        threading.Thread(target=self._reconnect_loop, name=f"reconnect-{self.uid[:8]}", daemon=True).start()
+
+    def _reconnect_loop(self):
+        """Reconnects with exponential backoff, then replays unacknowledged audio."""
+        for attempt, delay in enumerate(backoff_delays(), start=1):
+            if self.closing or self.end_of_audio_sent or attempt > MAX_RECONNECT_ATTEMPTS:
+                break
+            time.sleep(delay)
+            print(f"[INFO]: Reconnecting to {self.socket_url} (attempt {attempt}, {self.replay_buffer.seconds:.1f}s buffered)...")
+            self._server_ready.clear()
+            self.server_error = False
+            self._connect()
+            if self._server_ready.wait(RECONNECT_READY_TIMEOUT_SECONDS):
+                replayed_seconds = self._replay_buffered_audio()
+                self.reconnect_stats.record_reconnect(time.monotonic() - self._disconnected_at, replayed_seconds)
+                self.reconnecting = False
+                print(f"[INFO]: Reconnected after {attempt} attempt(s); replayed {replayed_seconds:.1f}s of audio.")
+                return
+            self.reconnect_stats.failed_attempts += 1
+            self.client_socket.close()
+        print("[ERROR]: Could not reconnect to the server; stopping.")
+        self.reconnecting = False
+        self.recording = False
+
+    def _replay_buffered_audio(self):
+        """Sends the replay buffer on the new connection and resumes live sending. Returns seconds replayed."""
+        with self._send_lock:
+            self.time_offset = self.replay_buffer.start_offset(default=self.audio_seconds_sent)
+            replayed_samples = 0
+            for samples in self.replay_buffer.packets():
+                for packet in self._encode_audio(samples, {}):
+                    self._send_binary(packet)
+                replayed_samples += len(samples)
+            self.connected = True
+        return replayed_samples / SAMPLE_RATE
+
+    def take_unacknowledged(self):
+        """
+        Removes the audio buffered for replay so another server can transcribe it (failover).
+
+        Returns:
+            tuple: (session offset of the first packet, list of float32 sample arrays), or
+                (None, []) if nothing is buffered.
+        """
+        with self._send_lock:
+            if not self.replay_buffer.seconds:
+                return None, []
+            start = self.replay_buffer.start_offset(default=self.audio_seconds_sent) + self.session_offset
+            packets = self.replay_buffer.packets()
+            self.replay_buffer.clear()
+        return start, packets
 
     def on_open(self, ws):
         """
         Callback function called when the WebSocket connection is successfully opened.
 
         Sends an initial configuration message to the server, including client UID,
-        language selection, and task type.
+        language selection, task type, and the audio formats the client can send.
 
         Args:
             ws (websocket.WebSocketApp): The WebSocket client instance.
@@ -224,6 +408,7 @@ class Client:
                     "use_vad": self.use_vad,
                     "max_clients": self.max_clients,
                     "max_connection_time": self.max_connection_time,
+                    "audio_formats": self.offered_audio_formats,
                 }
             )
         )
@@ -236,19 +421,91 @@ class Client:
             message (bytes): The audio data packet in bytes to be sent to the server.
 
         """
+        if message == Client.END_OF_AUDIO.encode('utf-8'):
+            self.end_of_audio_sent = True # Set before sending: the server may close right after receiving it
+            self._send_binary(message)
+            return
+        self.send_audio(np.frombuffer(message, dtype=np.float32))
+
+    def send_audio(self, samples, encoded_cache=None):
+        """
+        Encodes float32 samples in the negotiated wire format and sends them.
+
+        Args:
+            samples (np.ndarray): float32 mono samples.
+            encoded_cache (dict, optional): format -> encoded bytes, shared across clients sending
+                the same samples so each stateless format is encoded once.
+        """
+        if encoded_cache is None:
+            encoded_cache = {}
+        with self._send_lock:
+            if self.reconnect:
+                self.replay_buffer.append(self.audio_seconds_sent, samples)
+            # While reconnecting, audio is only buffered; it is replayed once the server is ready
+            if self.connected or not self.reconnect:
+                for packet in self._encode_audio(samples, encoded_cache):
+                    self._send_binary(packet)
+            self._track_sent_audio(len(samples))
+
+    def _encode_audio(self, samples, encoded_cache):
+        """Encodes samples in the negotiated wire format; returns the packets to send."""
+        if self.audio_format == wire_format.OPUS:
+            return self._opus_encoder.encode(samples)
+        if self.audio_format not in encoded_cache:
+            if self.audio_format == wire_format.INT16:
+                encoded_cache[self.audio_format] = wire_format.encode_int16(samples)
+            else:
+                encoded_cache[self.audio_format] = samples.astype(np.float32, copy=False).tobytes()
+        return [encoded_cache[self.audio_format]]
+
+    def _send_binary(self, message):
         try:
             self.client_socket.send(message, websocket.ABNF.OPCODE_BINARY)
+            self.bytes_sent += len(message)
+            if self.first_send_at is None:
+                self.first_send_at = time.monotonic()
         except Exception as e:
+            self.send_errors += 1
             print(e)
 
+    @property
+    def send_bytes_per_second(self):
+        """Average bytes sent per second since the first packet."""
+        if self.first_send_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.first_send_at
+        return self.bytes_sent / elapsed if elapsed > 0 else 0.0
+
+    def send_statistics(self):
+        """Wire format and send volume, for logging at shutdown."""
+        audio_bytes_per_second = self.bytes_sent / self.audio_seconds_sent if self.audio_seconds_sent else 0.0
+        return {
+            "audio_format": self.audio_format,
+            "bytes_sent": self.bytes_sent,
+            "bytes_per_second": round(self.send_bytes_per_second),
+            "bytes_per_audio_second": round(audio_bytes_per_second),
+            "send_errors": self.send_errors,
+        }
+
+    def _track_sent_audio(self, num_samples):
+        """Advances the sent audio offset and remembers when that audio was sent (for latency)."""
+        self.audio_seconds_sent += num_samples / SAMPLE_RATE
+        self._sent_audio_ends.append(self.audio_seconds_sent)
+        self._sent_times.append(time.perf_counter())
+        if len(self._sent_audio_ends) > MAX_TRACKED_PACKETS:
+            del self._sent_audio_ends[:MAX_TRACKED_PACKETS // 2]
+            del self._sent_times[:MAX_TRACKED_PACKETS // 2]
+
     def close_websocket(self):
         """
         Close the WebSocket connection and join the WebSocket thread.
 
         First attempts to close the WebSocket connection using `self.client_socket.close()`. After
         closing the connection, it joins the WebSocket thread to ensure proper termination.
+        An intentional close never triggers a reconnection.
 
         """
+        self.closing = True
         try:
             self.client_socket.close()
         except Exception as e:
@@ -275,7 +532,10 @@ class Client:
 
         Args:
             output_path (str): The file path to save the output SRT file. Default is "output.srt".
+                Ignored when exporting incrementally: the TranscriptionTeeClient finishes the session's files.
         """
+        if self.exporter:
+            return
         if not self.transcript:
             print("[INFO]: No transcript data to write (maybe it was empty?).")
             return
@@ -312,12 +572,49 @@ class TranscriptionTeeClient:
     to send audio data for transcription to one or more servers, and receive transcribed text segments.
     Args:
         clients (list): one or more previously initialized Client instances
+        live_packet_ms (int, optional): packet duration for low-latency callback capture in live mode
+        live_input_file (str, optional): WAV file played through a fake input device in live mode
+        vad_gate (VoiceActivityGate, optional): drops silent audio before it is sent
+        routing (bool, optional): treat the clients as a server pool and send audio only to the fastest
+            healthy one, failing over on error, instead of teeing it to all of them
+        start_offset (float, optional): seconds already transcribed (resuming a session); file input skips
+            them and segment times continue from there
+        live_ring (AudioRingBuffer, optional): ring for live capture, e.g. a SharedAudioRing another process
+            observes; a private one is created if None
+        exporter (IncrementalTranscriptExporter, optional): writes the session's completed segments, on the
+            session timeline, as they arrive: from the routed client when routing, else the first client
 
     Attributes:
         clients (list): the underlying Client instances responsible for handling WebSocket connections.
+        router (LeastLatencyRouter): picks the client that receives audio when routing, else None.
+        exporter (IncrementalTranscriptExporter): the session's incremental transcript export, or None.
     """
-    def __init__(self, clients, save_output_recording=False, output_recording_filename="./output_recording.wav", mute_audio_playback=False):
+    def __init__(self, clients, save_output_recording=False, output_recording_filename="./output_recording.wav", mute_audio_playback=False, tracer=None,
+                 live_packet_ms=None, live_input_file=None, vad_gate=None, routing=False, start_offset=0.0,
+                 live_ring=None, exporter=None):
         self.clients = clients
+        self.router = LeastLatencyRouter(clients) if routing else None
+        self.exporter = exporter
+        if exporter is not None:
+            # One set of files for the session: when routing, whichever client forwards segments writes them
+            for client in (self.clients if self.router else self.clients[:1]):
+                client.exporter = exporter
+                client.transcript = deque(maxlen=TRANSCRIPT_WINDOW_SEGMENTS)
+        self.start_offset = start_offset
+        for client in self.clients:
+            # Real time, so it applies after the VAD gate's sent -> real map
+            client.resume_offset = start_offset
+        self.tracer = tracer
+        self.vad_gate = vad_gate
+        if vad_gate is not None:
+            for client in self.clients:
+                client.time_map = vad_gate.to_real_seconds
+        self.live_packet_ms = live_packet_ms
+        self.live_input_file = live_input_file
+        self.live_ring = live_ring
+        self.live_stop = threading.Event()
+        self.live_statistics = None
+        self.playback_statistics = None
         if not self.clients:
             raise Exception("At least one client is required.")
         self.chunk = 4096
@@ -359,11 +656,19 @@ class TranscriptionTeeClient:
         ) <= 1, 'You must provide only one selected source'
 
         print("[INFO]: Waiting for server ready ...")
-        for client in self.clients:
-            while not client.recording:
-                if client.waiting or client.server_error:
+        if self.router:
+            # One ready server is enough; full or failing servers are skipped by the router
+            while self.router.select() is None:
+                if all(client.waiting or client.server_error for client in self.clients):
                     self.close_all_clients()
                     return
+                time.sleep(0.01)
+        else:
+            for client in self.clients:
+                while not client.recording:
+                    if client.waiting or client.server_error:
+                        self.close_all_clients()
+                        return
 
         print("[INFO]: Server Ready!")
         if hls_url is not None:
@@ -373,6 +678,8 @@ class TranscriptionTeeClient:
             self.play_file(resampled_file)
         elif rtsp_url is not None:
             self.process_rtsp_stream(rtsp_url)
+        elif self.live_packet_ms:
+            self.record_live()
         else:
             self.record()
 
@@ -382,29 +689,73 @@ class TranscriptionTeeClient:
             client.close_websocket()
 
     def write_all_clients_srt(self):
-        """Writes out .srt files for all clients."""
+        """Writes out .srt files for all clients (and finishes the incremental export)."""
+        if self.exporter:
+            self.finish_export()
         for client in self.clients:
             client.write_srt_file(client.srt_file_path)
 
+    def finish_export(self):
+        """Appends the exporting client's final, uncompleted segment to the incremental export and closes its files."""
+        if self.exporter.closed:
+            return
+        client = self.router.active if self.router else self.clients[0]
+        if client is not None and client.last_segment is not None:
+            self.exporter.append(client.last_segment)
+        self.exporter.close()
+        print(f"[INFO]: Transcript saved to {', '.join(self.exporter.paths.values())}")
+
     def multicast_packet(self, packet, unconditional=False):
         """
-        Sends an identical packet via all clients.
+        Sends an identical packet via all clients (audio goes to the routed client only when routing).
 
         Args:
             packet (bytes): The audio data packet in bytes to be sent.
             unconditional (bool, optional): If true, send regardless of whether clients are recording.  Default is False.
         """
+        if self.router and packet != Client.END_OF_AUDIO.encode('utf-8'):
+            self.send_audio(np.frombuffer(packet, dtype=np.float32))
+            return
+        if self.tracer:
+            send_started_at = self.tracer.now()
         for client in self.clients:
             if (unconditional or client.recording):
                 client.send_packet_to_server(packet)
+        if self.tracer:
+            self.tracer.record_since("audio_send", send_started_at)
+
+    def send_audio(self, audio_array):
+        """
+        Sends float32 audio to all recording clients (or the routed one), each in its negotiated
+        wire format, through the voice activity gate if one is configured.
+
+        Args:
+            audio_array (np.ndarray): float32 mono samples.
+        """
+        if self.vad_gate is not None:
+            audio_array = self.vad_gate.process(audio_array)
+            if not len(audio_array):
+                return
+        if self.tracer:
+            send_started_at = self.tracer.now()
+        encoded_cache = {}
+        if self.router:
+            self.router.send(audio_array, encoded_cache)
+        else:
+            for client in self.clients:
+                if client.recording:
+                    client.send_audio(audio_array, encoded_cache)
+        if self.tracer:
+            self.tracer.record_since("audio_send", send_started_at)
 
     def play_file(self, filename):
         """
         Play an audio file and send it to the server for processing.
 
         Reads an audio file, plays it through the audio output, and simultaneously sends
-        the audio data to the server for processing. It uses PyAudio to create an audio
-        stream for playback. The audio data is read from the file in chunks, converted to
+        the audio data to the server for processing. Sends are paced to real time by a fixed
+        schedule; playback runs on a separate thread (`MonitorPlayback`) so the output device
+        never delays a send. The audio data is read from the file in chunks, converted to
         floating-point format, and sent to the server using WebSocket communication.
         This method is typically used when you want to process pre-recorded audio and send it
         to the server in real-time.
@@ -413,48 +764,55 @@ class TranscriptionTeeClient:
             filename (str): The path to the audio file to be played and sent to the server.
         """
 
-        # read audio and create pyaudio stream
+        # read audio; monitor playback (if not muted) runs on its own thread so it can't pace the sends
         with wave.open(filename, "rb") as wavfile:
-            self.stream = self.p.open(
-                format=self.p.get_format_from_width(wavfile.getsampwidth()),
-                channels=wavfile.getnchannels(),
-                rate=wavfile.getframerate(),
-                input=True,
-                output=True,
-                frames_per_buffer=self.chunk,
-            )
+            monitor = None
+            if not self.mute_audio_playback:
+                monitor = MonitorPlayback(self.p, wavfile.getsampwidth(), wavfile.getnchannels(),
+                                          wavfile.getframerate(), self.chunk)
             chunk_duration = self.chunk / float(wavfile.getframerate())
+            if self.start_offset:
+                wavfile.setpos(min(int(self.start_offset * wavfile.getframerate()), wavfile.getnframes()))
+            send_jitter = JitterStats()
             try:
+                next_send_at = time.monotonic()
                 while any(client.recording for client in self.clients):
                     data = wavfile.readframes(self.chunk)
                     if data == b"":
                         break
 
+                    send_jitter.record(time.monotonic() - next_send_at)
                     audio_array = self.bytes_to_float_array(data)
-                    self.multicast_packet(audio_array.tobytes())
-                    if self.mute_audio_playback:
-                        time.sleep(chunk_duration)
-                    else:
-                        self.stream.write(data)
-    
+                    self.send_audio(audio_array)
+                    if monitor:
+                        monitor.feed(data)
+                    # Pace sends to real time against a fixed schedule so delays don't accumulate
+                    next_send_at += chunk_duration
+                    time.sleep(max(0.0, next_send_at - time.monotonic()))
+
                 wavfile.close()
 
                 for client in self.clients:
                     client.wait_before_disconnect()
                 self.multicast_packet(Client.END_OF_AUDIO.encode('utf-8'), True)
                 self.write_all_clients_srt()
-                self.stream.close()
+                if monitor:
+                    monitor.stop()
                 self.close_all_clients()
 
             except KeyboardInterrupt:
                 wavfile.close()
-                self.stream.stop_stream()
-                self.stream.close()
+                if monitor:
+                    monitor.stop()
                 self.p.terminate()
                 self.close_all_clients()
                 self.write_all_clients_srt()
                 print("[INFO]: Keyboard interrupt.")
             finally:
+                self.playback_statistics = {"send_jitter": send_jitter.summary()}
+                if monitor:
+                    self.playback_statistics["monitor"] = monitor.statistics()
+                logging.info(f"File playback timing: {self.playback_statistics}")
                 # Ensure sentinel is placed even if loop exits unexpectedly (except KeyboardInterrupt)
                 logging.debug("play_file finished loop or encountered issue, putting sentinel.")
                 for client in self.clients:
@@ -522,11 +880,13 @@ class TranscriptionTeeClient:
             output_container = av.open(save_file, mode="w")
             output_audio_stream = output_container.add_stream(codec_name="pcm_s16le", rate=self.rate)
 
+        # Decoded stream frames are resampled to 16 kHz mono float32 so they can be sent in any wire format
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=self.rate)
         try:
             for packet in container.demux(audio_stream):
                 for frame in packet.decode():
-                    audio_data = frame.to_ndarray().tobytes()
-                    self.multicast_packet(audio_data)
+                    for resampled_frame in resampler.resample(frame):
+                        self.send_audio(resampled_frame.to_ndarray().reshape(-1))
 
                     if save_file:
                         output_container.mux(frame)
@@ -603,7 +963,7 @@ class TranscriptionTeeClient:
 
                 audio_array = self.bytes_to_float_array(data)
 
-                self.multicast_packet(audio_array.tobytes())
+                self.send_audio(audio_array)
 
                 # save frames if more than a minute
                 if len(self.frames) > 60 * self.rate:
@@ -616,6 +976,46 @@ class TranscriptionTeeClient:
         except KeyboardInterrupt:
             self.finalize_recording(n_audio_file)
 
+    def record_live(self):
+        """
+        Stream live audio with low latency until the server stops recording or `stop_live()` is called.
+
+        Audio is captured by a PyAudio callback stream (or, if `live_input_file` is set, a file-backed
+        fake device) into a ring buffer, and a sender thread multicasts `live_packet_ms` packets as soon
+        as each is buffered. Overflow/underflow counters are kept in `live_statistics`.
+        """
+        packet_frames = int(self.rate * self.live_packet_ms / 1000)
+        ring = self.live_ring or AudioRingBuffer(int(self.rate * RING_BUFFER_SECONDS) * INPUT_BYTES_PER_SAMPLE)
+        if self.live_input_file:
+            device = FileInputDevice(self.live_input_file, ring, frames_per_buffer=packet_frames)
+        else:
+            if self.stream is not None:
+                self.stream.close() # The blocking-mode stream opened in __init__ is not used here
+                self.stream = None
+            device = CallbackInputDevice(self.p, ring, rate=self.rate, frames_per_buffer=packet_frames)
+        sender = LiveAudioSender(ring, self.send_audio, packet_ms=self.live_packet_ms, rate=self.rate)
+
+        sender.start()
+        device.start()
+        logging.info(f"Live capture started ({self.live_packet_ms} ms packets).")
+        while (any(client.recording for client in self.clients) and device.is_active()
+               and not self.live_stop.wait(0.1)):
+            ring.publish_statistics(device.input_overflows, sender.underflows, sender.packets_sent)
+        device.stop()
+        sender.stop()
+        ring.publish_statistics(device.input_overflows, sender.underflows, sender.packets_sent)
+
+        self.live_statistics = dict(sender.statistics(), input_overflows=device.input_overflows)
+        logging.info(f"Live capture stopped: {self.live_statistics}")
+        self.multicast_packet(Client.END_OF_AUDIO.encode('utf-8'), True)
+        self.write_all_clients_srt()
+        for client in self.clients:
+            client._put_sentinel_on_queue()
+
+    def stop_live(self):
+        """Asks `record_live` to stop capturing and flush."""
+        self.live_stop.set()
+
     def write_audio_frames_to_file(self, frames, file_name):
         """
         Write audio frames to a WAV file.
@@ -713,6 +1113,20 @@ class TranscriptionClient(TranscriptionTeeClient):
         max_connection_time (int, optional): Maximum allowed connection time in seconds. Default is 600.
         mute_audio_playback (bool, optional): If True, mutes audio playback during file playback. Default is False.
         output_queue (queue.Queue, optional): Queue to put received transcript segments onto. Default is None.
+        tracer (PipelineTracer, optional): Records per-stage latencies for send/receive paths. Default is None.
+        live_packet_ms (int, optional): If set, live microphone input uses low-latency callback capture with
+            packets of this many milliseconds (20-60 recommended) instead of blocking 4096-frame reads. Default is None.
+        live_input_file (str, optional): 16 kHz mono WAV played through a fake input device in live mode, for testing. Default is None.
+        vad_gate (VoiceActivityGate, optional): Client-side voice activity gate; silence is not sent to the server. Default is None.
+        allow_compressed_audio (bool, optional): Offer Opus as well as int16 when negotiating the wire format. Default is False.
+        reconnect (bool, optional): Reconnect automatically if the connection drops and replay unacknowledged audio. Default is False.
+        fallback_servers (list, optional): (host, port) pairs of further servers. If given, all servers form a pool and
+            audio is routed to the fastest healthy one, failing over on error. Default is None.
+        export_transcript (bool, optional): Write SRT, VTT and JSONL incrementally next to output_transcription_path
+            while the session runs, instead of one SRT at the end; one set of files across all servers. Default is False.
+        start_offset (float, optional): Seconds already transcribed when resuming a session; file playback starts
+            there and segment times continue from it. Default is 0.
+        live_ring (AudioRingBuffer, optional): Ring buffer for live capture (see capture_process). Default is None.
 
     Attributes:
         client (Client): An instance of the underlying Client class responsible for handling the WebSocket connection.
@@ -740,13 +1154,32 @@ class TranscriptionClient(TranscriptionTeeClient):
         max_connection_time=600,
         mute_audio_playback=False,
         output_queue=None,
+        tracer=None,
+        live_packet_ms=None,
+        live_input_file=None,
+        vad_gate=None,
+        allow_compressed_audio=False,
+        reconnect=False,
+        fallback_servers=None,
+        export_transcript=False,
+        start_offset=0.0,
+        live_ring=None,
     ):
-        self.client = Client(
-            host, port, lang, translate, model, srt_file_path=output_transcription_path,
-            use_vad=use_vad, log_transcription=log_transcription, max_clients=max_clients,
-            max_connection_time=max_connection_time,
-            output_queue=output_queue
-        )
+        clients = []
+        for server_host, server_port in [(host, port)] + list(fallback_servers or []):
+            srt_file_path = output_transcription_path
+            if clients:
+                srt_file_path = output_transcription_path.replace(".srt", f".{server_host}_{server_port}.srt")
+            clients.append(Client(
+                server_host, server_port, lang, translate, model, srt_file_path=srt_file_path,
+                use_vad=use_vad, log_transcription=log_transcription, max_clients=max_clients,
+                max_connection_time=max_connection_time,
+                output_queue=output_queue,
+                tracer=tracer,
+                allow_compressed_audio=allow_compressed_audio,
+                reconnect=reconnect,
+            ))
+        self.client = clients[0]
 
         if save_output_recording and not output_recording_filename.endswith(".wav"):
             raise ValueError(f"Please provide a valid `output_recording_filename`: {output_recording_filename}")
@@ -754,10 +1187,18 @@ class TranscriptionClient(TranscriptionTeeClient):
             raise ValueError(f"Please provide a valid `output_transcription_path`: {output_transcription_path}. The file extension should be `.srt`.")
         TranscriptionTeeClient.__init__(
             self,
-            [self.client],
+            clients,
             save_output_recording=save_output_recording,
             output_recording_filename=output_recording_filename,
-            mute_audio_playback=mute_audio_playback
+            mute_audio_playback=mute_audio_playback,
+            tracer=tracer,
+            live_packet_ms=live_packet_ms,
+            live_input_file=live_input_file,
+            vad_gate=vad_gate,
+            routing=len(clients) > 1,
+            start_offset=start_offset,
+            live_ring=live_ring,
+            exporter=IncrementalTranscriptExporter(output_transcription_path) if export_transcript else None,
         )
 
         logging.info("Transcription client initialized for file playback.")
@@ -0,0 +1,116 @@
+"""
+Local monitor playback on its own thread, so the audio device never paces network sends.
+
+The sender hands each chunk to `MonitorPlayback.feed`, which only copies it into a small
+ring buffer. A playback thread drains the buffer into a blocking PyAudio output stream.
+If the device stalls, the buffer fills and monitor audio is dropped; if the sender
+stalls, the device underruns. Either way only the monitor is affected.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .audio_capture import AudioRingBuffer
+
+MONITOR_BUFFER_SECONDS = 0.5
+JITTER_WINDOW = 2000 # Recent deviations kept for percentiles
+
+
+class JitterStats:
+    """Deviation of event times from their schedule, in seconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.max = 0.0
+        self._recent = deque(maxlen=JITTER_WINDOW)
+
+    def record(self, deviation_seconds):
+        deviation = abs(deviation_seconds)
+        self.count += 1
+        self.max = max(self.max, deviation)
+        self._recent.append(deviation)
+
+    def summary(self):
+        if not self._recent:
+            return {"count": 0}
+        recent = sorted(self._recent)
+        return {
+            "count": self.count,
+            "mean_ms": round(sum(recent) / len(recent) * 1000, 2),
+            "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class MonitorPlayback:
+    """Plays audio fed by the sender through a PyAudio output stream on a separate thread."""
+
+    def __init__(self, pyaudio_instance, sample_width, channels, rate, chunk_frames,
+                 buffer_seconds=MONITOR_BUFFER_SECONDS):
+        """
+        Args:
+            pyaudio_instance (pyaudio.PyAudio): Shared PyAudio instance.
+            sample_width (int): Bytes per sample of the fed audio.
+            channels (int): Channel count of the fed audio.
+            rate (int): Sample rate in Hz.
+            chunk_frames (int): Frames written to the device per write.
+            buffer_seconds (float): Ring buffer size; audio beyond it is dropped.
+        """
+        bytes_per_second = rate * channels * sample_width
+        self.chunk_bytes = chunk_frames * channels * sample_width
+        self.chunk_seconds = chunk_frames / rate
+        self.ring = AudioRingBuffer(max(int(bytes_per_second * buffer_seconds), 2 * self.chunk_bytes))
+        self.stream = pyaudio_instance.open(
+            format=pyaudio_instance.get_format_from_width(sample_width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=chunk_frames,
+        )
+        self.underruns = 0
+        self.jitter = JitterStats()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="monitor-playback", daemon=True)
+        self._thread.start()
+
+    def feed(self, data):
+        """Queues audio for playback without blocking; drops it if the monitor has fallen behind."""
+        self.ring.write(data)
+
+    def _run(self):
+        last_write_at = None
+        while True:
+            data = self.ring.read(self.chunk_bytes)
+            if data is None:
+                if self._stop.is_set():
+                    break
+                self.ring.data_ready.clear()
+                if self.ring.available >= self.chunk_bytes:
+                    continue
+                if not self.ring.data_ready.wait(self.chunk_seconds) and last_write_at is not None:
+                    self.underruns += 1
+                continue
+            now = time.monotonic()
+            if last_write_at is not None:
+                self.jitter.record(now - last_write_at - self.chunk_seconds)
+            last_write_at = now
+            self.stream.write(data)
+        tail = self.ring.read_all()
+        if tail:
+            self.stream.write(tail)
+
+    def stop(self):
+        """Plays what is buffered, then closes the output stream."""
+        self._stop.set()
+        self.ring.data_ready.set()
+        self._thread.join()
+        self.stream.stop_stream()
+        self.stream.close()
+
+    def statistics(self):
+        return {
+            "jitter": self.jitter.summary(),
+            "dropped_chunks": self.ring.overflows,
+            "underruns": self.underruns,
+        }
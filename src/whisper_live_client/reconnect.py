@@ -0,0 +1,96 @@
+"""
+Support for resuming a transcription session after the websocket drops.
+
+Audio the server has not yet acknowledged (covered by a completed segment) is kept in a
+bounded `ReplayBuffer`. After reconnecting, the client replays it and shifts the new
+connection's timestamps by the session offset where the replay starts, so segment times
+stay monotonic across connections.
+"""
+
+import random
+from collections import deque
+
+SAMPLE_RATE = 16000
+REPLAY_BUFFER_SECONDS = 30.0
+RECONNECT_BASE_DELAY_SECONDS = 0.5
+RECONNECT_MAX_DELAY_SECONDS = 30.0
+MAX_RECONNECT_ATTEMPTS = 20
+
+
+def backoff_delays(base=RECONNECT_BASE_DELAY_SECONDS, maximum=RECONNECT_MAX_DELAY_SECONDS):
+    """Exponential backoff with full jitter: 0..base, 0..2*base, ... capped at `maximum`."""
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(maximum, base * 2 ** attempt))
+        attempt += 1
+
+
+class ReplayBuffer:
+    """Unacknowledged float32 audio, keyed by its start offset in session audio seconds."""
+
+    def __init__(self, max_seconds=REPLAY_BUFFER_SECONDS, rate=SAMPLE_RATE):
+        self.max_samples = int(max_seconds * rate)
+        self.rate = rate
+        self._packets = deque() # (start_offset_seconds, samples)
+        self._samples = 0
+        self.dropped_seconds = 0.0 # Unacknowledged audio discarded because the buffer was full
+
+    def append(self, start_offset, samples):
+        self._packets.append((start_offset, samples))
+        self._samples += len(samples)
+        while self._samples > self.max_samples and len(self._packets) > 1:
+            _, dropped = self._packets.popleft()
+            self._samples -= len(dropped)
+            self.dropped_seconds += len(dropped) / self.rate
+
+    def acknowledge(self, end_offset):
+        """Discards packets that end at or before `end_offset` (audio the server has transcribed)."""
+        while self._packets:
+            start, samples = self._packets[0]
+            if start + len(samples) / self.rate > end_offset:
+                break
+            self._packets.popleft()
+            self._samples -= len(samples)
+
+    def start_offset(self, default):
+        """Session offset of the oldest buffered audio, or `default` if nothing is buffered."""
+        return self._packets[0][0] if self._packets else default
+
+    def packets(self):
+        return [samples for _, samples in self._packets]
+
+    def clear(self):
+        self._packets.clear()
+        self._samples = 0
+
+    @property
+    def seconds(self):
+        return self._samples / self.rate
+
+
+class ReconnectStats:
+    """Counters describing a client's reconnections."""
+
+    def __init__(self):
+        self.disconnects = 0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.downtime_seconds = 0.0
+        self.last_downtime_seconds = None
+        self.replayed_seconds = 0.0
+
+    def record_reconnect(self, downtime_seconds, replayed_seconds):
+        self.reconnects += 1
+        self.downtime_seconds += downtime_seconds
+        self.last_downtime_seconds = downtime_seconds
+        self.replayed_seconds += replayed_seconds
+
+    def summary(self, replay_buffer):
+        return {
+            "disconnects": self.disconnects,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "downtime_seconds": round(self.downtime_seconds, 2),
+            "replayed_seconds": round(self.replayed_seconds, 2),
+            "replay_dropped_seconds": round(replay_buffer.dropped_seconds, 2),
+        }
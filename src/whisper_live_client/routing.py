@@ -0,0 +1,135 @@
+"""
+Least-latency routing across a pool of WhisperLive servers.
+
+In tee mode every client receives the same audio, so N servers do the same work N times.
+`LeastLatencyRouter` instead treats the clients as a pool and sends the session's audio to
+one of them: the healthiest, fastest server. Servers are ranked by measured segment latency
+(an EWMA kept by each `Client`), or by their connection handshake time until segments have
+been measured. Servers that report WAIT (full), reported an error, or are disconnected are
+skipped.
+
+If the active server fails mid-session, or stays too slow, audio moves to the next best
+server. Audio the previous server had not yet acknowledged (kept when reconnection is
+enabled) is replayed to the new server first, and each client's `session_offset` keeps
+segment times on a single session timeline. Only the active client forwards segments to
+the output queue, so a previous server's late (and now replayed) segments can't interleave
+with the new server's.
+"""
+
+import time
+
+SAMPLE_RATE = 16000
+DEGRADED_LATENCY_SECONDS = 5.0 # Move off a healthy server whose segment latency exceeds this...
+MIN_ACTIVE_SECONDS = 30.0      # ...but only after it has been active this long (avoids flapping)
+
+
+def is_available(client):
+    """Whether a client can take audio right now."""
+    return (client.recording and client.connected and not client.reconnecting
+            and not client.waiting and not client.server_error and not client.closing)
+
+
+def latency_score(client):
+    """Lower is better: measured segment latency, else handshake time, else unknown (last)."""
+    if client.server_latency is not None:
+        return client.server_latency
+    if client.ready_latency is not None:
+        return client.ready_latency
+    return float("inf")
+
+
+class LeastLatencyRouter:
+    """Sends each packet to the best available client and fails over when it becomes unavailable."""
+
+    def __init__(self, clients, degraded_latency=DEGRADED_LATENCY_SECONDS, min_active_seconds=MIN_ACTIVE_SECONDS):
+        """
+        Args:
+            clients (list): Connected `Client` instances forming the pool.
+            degraded_latency (float): Segment latency above which a healthy active server is replaced
+                by a faster available one.
+            min_active_seconds (float): Minimum time on a server before a latency-based switch.
+        """
+        self.clients = clients
+        self.degraded_latency = degraded_latency
+        self.min_active_seconds = min_active_seconds
+        self.active = None
+        self.activated_at = None
+        self.session_seconds = 0.0 # Session audio routed so far (including dropped audio)
+        self.dropped_seconds = 0.0 # Audio sent while no server was available
+        self.failovers = 0
+        self.latency_switches = 0
+        for client in clients:
+            client.forward_segments = False
+
+    def select(self, exclude=None):
+        """Best available client, or None if the pool has none."""
+        candidates = [client for client in self.clients if client is not exclude and is_available(client)]
+        return min(candidates, key=latency_score) if candidates else None
+
+    def _is_degraded(self, client):
+        return (client.server_latency is not None and client.server_latency > self.degraded_latency
+                and time.monotonic() - self.activated_at >= self.min_active_seconds)
+
+    def route(self):
+        """
+        Client that should receive the next packet, switching servers if needed.
+
+        Returns:
+            Client or None: None only if no server can take audio (not even by buffering it).
+        """
+        active = self.active
+        if active is not None and is_available(active):
+            if not self._is_degraded(active):
+                return active
+            faster = self.select(exclude=active)
+            if faster is None or latency_score(faster) >= active.server_latency:
+                return active
+            # The slow server never completes its last segment once its audio stops, so its backlog moves too
+            self.latency_switches += 1
+            print(f"[INFO]: {active.server_url} is slow ({active.server_latency:.2f}s); routing to {faster.server_url}")
+            self._activate(faster, replay_from=active)
+            return faster
+        replacement = self.select()
+        if replacement is None:
+            # Keep feeding a reconnecting server: it buffers the audio and replays it once back
+            return active if active is not None and active.reconnecting else None
+        if active is not None:
+            self.failovers += 1
+            print(f"[INFO]: {active.server_url} unavailable; failing over to {replacement.server_url}")
+        self._activate(replacement, replay_from=active)
+        return replacement
+
+    def _activate(self, client, replay_from):
+        start, packets = replay_from.take_unacknowledged() if replay_from is not None else (None, [])
+        if start is None:
+            start = self.session_seconds
+        # The client's next audio (the replay, if any) begins at `start` on the session timeline
+        client.session_offset = start - client.audio_seconds_sent
+        for samples in packets:
+            client.send_audio(samples)
+        if self.active is not None:
+            self.active.forward_segments = False
+        client.forward_segments = True
+        self.active = client
+        self.activated_at = time.monotonic()
+
+    def send(self, samples, encoded_cache=None):
+        """Sends float32 samples to the routed client."""
+        client = self.route()
+        if client is not None:
+            client.send_audio(samples, encoded_cache)
+        else:
+            self.dropped_seconds += len(samples) / SAMPLE_RATE
+        self.session_seconds += len(samples) / SAMPLE_RATE
+
+    def statistics(self):
+        return {
+            "active_server": self.active.server_url if self.active is not None else None,
+            "failovers": self.failovers,
+            "latency_switches": self.latency_switches,
+            "dropped_seconds": round(self.dropped_seconds, 2),
+            "server_latency": {
+                client.server_url: None if client.server_latency is None else round(client.server_latency, 3)
+                for client in self.clients
+            },
+        }
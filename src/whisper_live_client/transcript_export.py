@@ -0,0 +1,125 @@
+"""
+Incremental transcript export: each completed segment is appended to SRT, WebVTT and
+JSONL files as it arrives, instead of building one SRT when the stream ends.
+
+Files are flushed after every segment and fsynced periodically, so a crash loses at most
+the last few seconds of transcript. Because the files hold the full transcript, the
+client only needs a bounded window of recent segments in memory; `read_jsonl_segments`
+loads the whole transcript back from disk when it is needed.
+
+A session has one exporter, fed on the session timeline by whichever client forwards
+segments, so a failover to another server continues the same files. Segments starting
+before the end of the last one written (a replay to the new server) are skipped.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .utils import format_time
+
+FSYNC_INTERVAL_SECONDS = 5.0
+TRANSCRIPT_WINDOW_SEGMENTS = 200 # Completed segments kept in memory when exporting
+EXPORT_FORMATS = ("srt", "vtt", "jsonl")
+
+
+class SrtWriter:
+    """Appends segments to one transcript file; subclasses change the format."""
+
+    suffix = ".srt"
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, segment):
+        self.count += 1
+        start, end = format_time(float(segment["start"])), format_time(float(segment["end"]))
+        self.file.write(f"{self.count}\n{start} --> {end}\n{segment['text']}\n\n")
+
+
+class VttWriter(SrtWriter):
+    suffix = ".vtt"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file.write("WEBVTT\n\n")
+
+    def write(self, segment):
+        start = format_time(float(segment["start"])).replace(",", ".")
+        end = format_time(float(segment["end"])).replace(",", ".")
+        self.file.write(f"{start} --> {end}\n{segment['text'].strip()}\n\n")
+
+
+class JsonlWriter(SrtWriter):
+    suffix = ".jsonl"
+
+    def write(self, segment):
+        self.file.write(json.dumps({
+            "start": round(float(segment["start"]), 3),
+            "end": round(float(segment["end"]), 3),
+            "text": segment["text"].strip(),
+        }) + "\n")
+
+
+WRITERS = {"srt": SrtWriter, "vtt": VttWriter, "jsonl": JsonlWriter}
+
+
+def read_jsonl_segments(path):
+    """Loads a JSONL transcript written by `IncrementalTranscriptExporter`."""
+    with open(path, encoding="utf-8") as jsonl_file:
+        return [json.loads(line) for line in jsonl_file if line.strip()]
+
+
+class IncrementalTranscriptExporter:
+    """Appends completed segments to one file per format, sharing the SRT path's stem."""
+
+    def __init__(self, srt_path, formats=EXPORT_FORMATS, fsync_interval=FSYNC_INTERVAL_SECONDS):
+        """
+        Args:
+            srt_path (str): Path of the SRT output; other formats use the same stem.
+            formats (tuple): Any of "srt", "vtt" and "jsonl".
+            fsync_interval (float): Seconds between fsyncs (files are flushed on every segment).
+        """
+        base = Path(srt_path).with_suffix("")
+        base.parent.mkdir(parents=True, exist_ok=True)
+        self.writers = [WRITERS[name](f"{base}{WRITERS[name].suffix}") for name in formats]
+        self.paths = {name: f"{base}{WRITERS[name].suffix}" for name in formats}
+        self.fsync_interval = fsync_interval
+        self.segments_written = 0
+        self.last_end = None
+        self.closed = False
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, segment):
+        """Writes one completed segment to every format, unless it starts before the last one ended."""
+        with self._lock:
+            if self.closed or (self.last_end is not None and float(segment["start"]) < self.last_end):
+                return
+            self.last_end = float(segment["end"])
+            for writer in self.writers:
+                writer.write(segment)
+                writer.file.flush()
+            self.segments_written += 1
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+
+    def _fsync(self):
+        for writer in self.writers:
+            os.fsync(writer.file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        """Flushes, fsyncs and closes the files; later appends are ignored."""
+        with self._lock:
+            if self.closed:
+                return
+            for writer in self.writers:
+                writer.file.flush()
+            self._fsync()
+            for writer in self.writers:
+                writer.file.close()
+            self.closed = True
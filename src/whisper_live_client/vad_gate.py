@@ -0,0 +1,171 @@
+"""
+Client-side voice activity gate: drops silent audio before it is sent to the server.
+
+Energy based and vectorized with NumPy. Each packet is split into short frames whose
+RMS level is compared to an adaptive noise floor: the minimum frame level over the last
+`NOISE_FLOOR_WINDOW_MS` (minimum statistics). Every frame feeds the estimate, speech
+included; pauses between words keep the minimum at the room's level, while steady room
+noise becomes the floor within one window however loud it is. A pre-roll buffer keeps the audio just
+before speech so word onsets aren't clipped, and a hangover keeps the gate open briefly
+after speech so word endings and short pauses are kept.
+
+Dropping silence shortens the audio the server sees, so its segment times run ahead of
+real time. The gate records where each stretch of passed audio came from, and
+`to_real_seconds` maps a time in the sent audio back to the input audio.
+"""
+
+import bisect
+from collections import deque
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 10
+SPEECH_MARGIN_DB = 12.0     # Frame must be this far above the noise floor to count as speech
+MIN_SPEECH_DBFS = -55.0     # ...and at least this loud in absolute terms
+MAX_SPEECH_DBFS_FLOOR = -30.0 # The speech threshold never rises above this, even in a noisy room
+NOISE_FLOOR_WINDOW_MS = 2000 # The noise floor is the quietest frame in this window
+HANGOVER_MS = 400
+PREROLL_MS = 300
+
+
+class VoiceActivityGate:
+    """Passes speech (plus pre-roll and hangover) and suppresses silence in float32 audio."""
+
+    def __init__(self, rate=SAMPLE_RATE, frame_ms=FRAME_MS, speech_margin_db=SPEECH_MARGIN_DB,
+                 hangover_ms=HANGOVER_MS, preroll_ms=PREROLL_MS, noise_floor_window_ms=NOISE_FLOOR_WINDOW_MS):
+        """
+        Args:
+            rate (int): Sample rate in Hz.
+            frame_ms (int): Analysis frame length in milliseconds.
+            speech_margin_db (float): dB above the noise floor that counts as speech.
+            hangover_ms (int): How long the gate stays open after the last speech frame.
+            preroll_ms (int): Audio kept from before speech starts and sent when the gate opens.
+            noise_floor_window_ms (int): Window over which the quietest frame sets the noise floor.
+        """
+        self.frame_samples = int(rate * frame_ms / 1000)
+        self.frame_seconds = self.frame_samples / rate
+        self.speech_margin_db = speech_margin_db
+        self.hangover_frames = int(hangover_ms / frame_ms)
+        self.preroll_frames = int(preroll_ms / frame_ms)
+        self.noise_floor_db = None
+        self.noise_floor_window_frames = max(int(noise_floor_window_ms / frame_ms), 1)
+        self._recent_minima = deque() # (frame number, level) with increasing levels: sliding window minimum
+        self._frames_seen = 0
+        self.is_open = False
+        self._hangover_left = 0
+        self._preroll = deque(maxlen=max(self.preroll_frames, 1))
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self.samples_in = 0
+        self.samples_passed = 0
+        self.openings = 0
+        # Sent -> real time map: from each sent time on (seconds), real time is this much later
+        self._frames_passed = 0
+        self._offset_frames = 0
+        self._breakpoint_offsets = []
+        self._breakpoint_sent = []
+
+    def _frame_levels_db(self, frames):
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+    def _update_noise_floor(self, level_db):
+        """Adds a frame's level to the window and sets the floor to the window's minimum."""
+        while self._recent_minima and self._recent_minima[-1][1] >= level_db:
+            self._recent_minima.pop()
+        self._recent_minima.append((self._frames_seen, level_db))
+        if self._recent_minima[0][0] <= self._frames_seen - self.noise_floor_window_frames:
+            self._recent_minima.popleft()
+        self._frames_seen += 1
+        self.noise_floor_db = self._recent_minima[0][1]
+
+    def process(self, samples):
+        """
+        Gates one packet of audio.
+
+        Args:
+            samples (np.ndarray): float32 mono samples in [-1, 1].
+
+        Returns:
+            np.ndarray: The samples to send (possibly empty). Whole frames only; a trailing
+                partial frame is held until the next packet.
+        """
+        self.samples_in += len(samples)
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+        frame_count = len(samples) // self.frame_samples
+        self._remainder = samples[frame_count * self.frame_samples:]
+        if frame_count == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = samples[:frame_count * self.frame_samples].reshape(frame_count, self.frame_samples)
+        levels = self._frame_levels_db(frames)
+
+        kept = []
+        for frame, level in zip(frames, levels):
+            frame_number = self._frames_seen
+            self._update_noise_floor(float(level))
+            threshold = min(max(self.noise_floor_db + self.speech_margin_db, MIN_SPEECH_DBFS), MAX_SPEECH_DBFS_FLOOR)
+            if level >= threshold:
+                if not self.is_open:
+                    self.is_open = True
+                    self.openings += 1
+                    kept.extend(self._preroll)
+                    self._preroll.clear()
+                self._hangover_left = self.hangover_frames
+                kept.append((frame_number, frame))
+                continue
+            if self.is_open and self._hangover_left > 0:
+                self._hangover_left -= 1
+                kept.append((frame_number, frame))
+                continue
+            self.is_open = False
+            if self.preroll_frames:
+                self._preroll.append((frame_number, frame))
+
+        if not kept:
+            return np.zeros(0, dtype=np.float32)
+        for frame_number, _ in kept:
+            self._record_passed_frame(frame_number)
+        passed = np.concatenate([frame for _, frame in kept])
+        self.samples_passed += len(passed)
+        return passed
+
+    def _record_passed_frame(self, frame_number):
+        offset_frames = frame_number - self._frames_passed
+        if offset_frames != self._offset_frames:
+            self._offset_frames = offset_frames
+            # Offset first: readers on other threads only look as far as the sent list goes
+            self._breakpoint_offsets.append(offset_frames * self.frame_seconds)
+            self._breakpoint_sent.append(self._frames_passed * self.frame_seconds)
+        self._frames_passed += 1
+
+    def to_real_seconds(self, sent_seconds, is_end=False):
+        """
+        Maps a time in the audio passed by the gate to the same moment in the input audio.
+
+        Args:
+            sent_seconds (float): Seconds into the passed (sent) audio.
+            is_end (bool): The time ends a span; at the exact joint of two passed stretches it
+                then belongs to the earlier one, before the removed silence.
+
+        Returns:
+            float: Seconds into the input audio.
+        """
+        count = len(self._breakpoint_sent)
+        search = bisect.bisect_left if is_end else bisect.bisect_right
+        index = search(self._breakpoint_sent, sent_seconds, 0, count) - 1
+        if index < 0 and count and sent_seconds >= self._breakpoint_sent[0]:
+            index = 0 # The joint at 0: the gate was closed when the input started
+        return sent_seconds + (self._breakpoint_offsets[index] if index >= 0 else 0.0)
+
+    @property
+    def suppressed_fraction(self):
+        """Fraction of input audio that was not sent."""
+        return 1.0 - self.samples_passed / self.samples_in if self.samples_in else 0.0
+
+    def statistics(self):
+        return {
+            "suppressed_fraction": round(self.suppressed_fraction, 3),
+            "speech_openings": self.openings,
+            "noise_floor_dbfs": round(self.noise_floor_db, 1) if self.noise_floor_db is not None else None,
+        }
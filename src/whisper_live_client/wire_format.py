@@ -0,0 +1,79 @@
+"""
+Audio sample formats for the client -> server websocket stream.
+
+WhisperLive servers expect float32 samples. A server that understands the
+`audio_formats` field of the client's opening config may confirm a more compact
+format in its SERVER_READY message:
+
+    int16    16-bit little-endian PCM, half the bytes of float32, no quality loss for mic audio
+    opus     Opus packets (20 ms each) for remote servers over slow links; needs libopus in PyAV
+
+Servers that don't confirm a format get float32, as before.
+"""
+
+import av
+import numpy as np
+
+FLOAT32 = "float32"
+INT16 = "int16"
+OPUS = "opus"
+DEFAULT_FORMAT = FLOAT32
+BYTES_PER_SAMPLE = {FLOAT32: 4, INT16: 2}
+OPUS_BITRATE = 24000
+SAMPLE_RATE = 16000
+
+
+def opus_available():
+    """Whether PyAV was built with the libopus encoder."""
+    return "libopus" in av.codecs_available
+
+
+def offered_formats(allow_compressed=False):
+    """Formats proposed to the server, most compact first; float32 is always the fallback."""
+    formats = [INT16, FLOAT32]
+    if allow_compressed and opus_available():
+        formats.insert(0, OPUS)
+    return formats
+
+
+def negotiated_format(server_ready_message, offered):
+    """The format confirmed in SERVER_READY, or float32 if the server didn't confirm one we offered."""
+    confirmed = server_ready_message.get("audio_format")
+    return confirmed if confirmed in offered else DEFAULT_FORMAT
+
+
+def encode_int16(samples):
+    """float32 samples in [-1, 1] -> little-endian int16 PCM bytes."""
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+class OpusStreamEncoder:
+    """Stateful Opus encoder that buffers samples into whole 20 ms frames."""
+
+    def __init__(self, rate=SAMPLE_RATE, bitrate=OPUS_BITRATE):
+        self.rate = rate
+        self.context = av.CodecContext.create("libopus", "w")
+        self.context.sample_rate = rate
+        self.context.layout = "mono"
+        self.context.format = "s16"
+        self.context.bit_rate = bitrate
+        self.context.open()
+        self.frame_size = self.context.frame_size
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._pts = 0
+
+    def encode(self, samples):
+        """
+        Encodes float32 samples; returns the Opus packets completed so far (possibly none).
+        """
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+        self._pending = np.concatenate((self._pending, pcm))
+        packets = []
+        while len(self._pending) >= self.frame_size:
+            frame = av.AudioFrame.from_ndarray(self._pending[:self.frame_size].reshape(1, -1), format="s16", layout="mono")
+            frame.sample_rate = self.rate
+            frame.pts = self._pts
+            self._pts += self.frame_size
+            self._pending = self._pending[self.frame_size:]
+            packets.extend(bytes(packet) for packet in self.context.encode(frame))
+        return packets